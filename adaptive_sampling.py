@@ -0,0 +1,63 @@
+# adaptive_sampling.py
+import math
+
+# Two-sided 95% normal quantile
+Z_95 = 1.959963984540054
+
+
+def wilson_interval(wins: int, n: int, z: float = Z_95) -> tuple[float, float]:
+    """Wilson score interval for a win rate of wins/n; (0, 1) when n is 0."""
+    if n == 0:
+        return 0.0, 1.0
+    p = wins / n
+    denominator = 1.0 + z * z / n
+    centre = (p + z * z / (2 * n)) / denominator
+    spread = z * math.sqrt(p * (1.0 - p) / n + z * z / (4 * n * n)) / denominator
+    return max(0.0, centre - spread), min(1.0, centre + spread)
+
+
+class SequentialEstimate:
+    """Win-rate estimate for one pairing that is fed matches in chunks until it is precise enough.
+
+    done() once the Wilson interval's half-width is at most target_half_width (checked only after
+    min_matches, so lopsided pairings can't stop on a lucky first chunk) or max_matches is reached.
+    A target of 0 always runs to max_matches, i.e. a fixed sample size. Stopping on a look at the
+    data makes the interval slightly optimistic; checking only at chunk boundaries keeps that small.
+    """
+
+    def __init__(self, target_half_width: float, min_matches: int, max_matches: int, z: float = Z_95):
+        self.target_half_width = target_half_width
+        self.min_matches = min(min_matches, max_matches)
+        self.max_matches = max_matches
+        self.z = z
+        self.wins = 0
+        self.matches = 0
+
+    def add(self, wins: int, matches: int):
+        self.wins += wins
+        self.matches += matches
+
+    def next_chunk(self, chunk_size: int) -> int:
+        """Matches to play next: chunk_size, or fewer at the max_matches limit."""
+        return min(chunk_size, self.max_matches - self.matches)
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.matches if self.matches else 0.0
+
+    def interval(self) -> tuple[float, float]:
+        return wilson_interval(self.wins, self.matches, self.z)
+
+    def half_width(self) -> float:
+        low, high = self.interval()
+        return (high - low) / 2.0
+
+    def done(self) -> bool:
+        if self.matches >= self.max_matches:
+            return True
+        return self.matches >= self.min_matches and self.half_width() <= self.target_half_width
+
+    def describe(self) -> str:
+        """e.g. '55.2% [53.3%, 57.1%] over 2750 matches'."""
+        low, high = self.interval()
+        return f"{self.win_rate * 100:.1f}% [{low * 100:.1f}%, {high * 100:.1f}%] over {self.matches} matches"
@@ -0,0 +1,270 @@
+# batch_engine.py
+import numpy as np
+
+from players import Player
+from roster import SKILL_COLUMNS
+from sim_params import SimParams, DEFAULT_PARAMS
+from configs.simulation_config import MAX_RALLY_LENGTH
+
+# Point outcome codes (mirrors the 'outcome' strings returned by simulation.simulate_point)
+OUTCOME_ACE = 0
+OUTCOME_DOUBLE_FAULT = 1
+OUTCOME_FORCED_ERROR = 2
+
+
+class BatchResult:
+    """Per-match winners, set scores and the StatsTracker counters for a batch of matches.
+
+    Per-player arrays have shape (n_matches, 2); column 0 is player1 and column 1 is player2.
+    rally_histogram covers the whole batch.
+    """
+
+    def __init__(self, n: int):
+        self.n_matches = n
+        self.winner = np.zeros(n, dtype=np.int8)
+        self.sets_won = np.zeros((n, 2), dtype=np.int16)
+
+        self.total_points = np.zeros(n, dtype=np.int32)
+        self.points_won = np.zeros((n, 2), dtype=np.int32)
+        self.aces = np.zeros(n, dtype=np.int32)
+        self.double_faults = np.zeros(n, dtype=np.int32)
+        self.forced_errors = np.zeros(n, dtype=np.int32)
+
+        self.serves_attempted = np.zeros((n, 2), dtype=np.int32)
+        self.first_serve_faults = np.zeros((n, 2), dtype=np.int32)
+        self.second_serve_points_faced = np.zeros((n, 2), dtype=np.int32)
+        self.first_serve_points_won = np.zeros((n, 2), dtype=np.int32)
+        self.second_serve_points_won = np.zeros((n, 2), dtype=np.int32)
+
+        self.service_games_played = np.zeros((n, 2), dtype=np.int32)
+        self.service_games_won = np.zeros((n, 2), dtype=np.int32)
+
+        self.sets_played = np.zeros(n, dtype=np.int16)
+        self.total_games = np.zeros(n, dtype=np.int32)
+        self.tiebreaks_played = np.zeros(n, dtype=np.int16)
+        self.longest_rally = np.zeros(n, dtype=np.int16)
+        self.sum_rally_lengths = np.zeros(n, dtype=np.int64)
+        self.total_rallies = np.zeros(n, dtype=np.int32)
+        self.rally_histogram = np.zeros(MAX_RALLY_LENGTH + 1, dtype=np.int64)  # Batch-wide: rallies of each length
+
+    def final_score(self, i: int) -> str:
+        """Returns the set score of match i from the winner's perspective, e.g. '2-1'."""
+        w = int(self.winner[i])
+        return f"{self.sets_won[i, w]}-{self.sets_won[i, 1 - w]}"
+
+
+def skill_matrix(players: list[Player]) -> np.ndarray:
+    """Stacks the base skills of the given players into an (n, 7) float array in SKILL_COLUMNS order."""
+    return np.array([[getattr(p, col) for col in SKILL_COLUMNS] for p in players], dtype=float)
+
+
+# ----------------------------------------------------------------------
+# Vectorized Point Logic (one lane per match)
+# ----------------------------------------------------------------------
+
+def _effective(base: np.ndarray, fatigue: np.ndarray, stamina: np.ndarray, p: SimParams) -> np.ndarray:
+    """Vectorized Player.get_skill for the fatigue-affected skills."""
+    penalty = np.minimum(0.4, fatigue / (stamina * p.match_stamina_scalar))
+    return np.maximum(1.0, base * (1.0 - penalty))
+
+
+def _simulate_points(rng: np.random.Generator, srv: np.ndarray, rcv: np.ndarray,
+                     srv_fatigue: np.ndarray, rcv_fatigue: np.ndarray, p: SimParams):
+    """Plays one point in every lane under SimParams p. srv/rcv are (k, 7) skill rows of the server and receiver.
+
+    Returns (server_won, outcome, rally_length, first_serve_fault) arrays of length k.
+    """
+    k = srv.shape[0]
+    s_sp = _effective(srv[:, 0], srv_fatigue, srv[:, 4], p)
+    s_sa = srv[:, 1]
+    s_gs = _effective(srv[:, 2], srv_fatigue, srv[:, 4], p)
+    s_ref = _effective(srv[:, 3], srv_fatigue, srv[:, 4], p)
+    r_gs = _effective(rcv[:, 2], rcv_fatigue, rcv[:, 4], p)
+    r_ref = _effective(rcv[:, 3], rcv_fatigue, rcv[:, 4], p)
+
+    server_won = np.zeros(k, dtype=bool)
+    outcome = np.full(k, OUTCOME_FORCED_ERROR, dtype=np.int8)
+    rally_length = np.zeros(k, dtype=np.int16)
+    first_serve_fault = np.zeros(k, dtype=bool)
+
+    # --- Serve phase ---
+    ace_chance = ((s_sp + s_sa) / 200.0) ** 2 * 100 * np.maximum(p.min_def_floor, (100.0 - r_ref) / 100.0) \
+        * p.ace_ceiling_factor
+    first_ace = rng.random(k) * 100 < np.maximum(0.001, ace_chance)
+
+    fault_base = p.fssr_baseline_floor + s_sa * p.fssr_sa_weight - (s_sp - p.power_threshold) * p.power_penalty_rate
+    fault_base = np.clip(fault_base, 1, 99)
+    serve_in_chance = np.clip(fault_base + rng.standard_normal(k) * p.variance_sigma_fault, 0.0, 100.0)
+    # simulate_point sends the point to the second serve when serve_fault_check() is False
+    faulted = ~first_ace & ~(rng.random(k) * 100 > serve_in_chance)
+
+    df_rate = p.df_rate_array[np.searchsorted(p.df_threshold_array, s_sa, side='left')]
+    df_rate = np.clip(df_rate - (srv[:, 6] - 50) * p.clutch_modifier_rate, p.min_df_rate, 99.0)
+    double_fault = faulted & (rng.random(k) * 100 < df_rate)
+    second_ace = faulted & ~double_fault & (rng.random(k) * 100 < np.maximum(0.001, ace_chance / 5.0))
+
+    first_serve_fault[faulted] = True
+    server_won[first_ace | second_ace] = True
+    outcome[first_ace | second_ace] = OUTCOME_ACE
+    outcome[double_fault] = OUTCOME_DOUBLE_FAULT
+
+    # --- Rally phase ---
+    in_rally = ~(first_ace | faulted) | (faulted & ~double_fault & ~second_ace)
+    lanes = np.flatnonzero(in_rally)
+    serve_bqs = s_sp[lanes] * p.weighting_serve_sp + s_sa[lanes] * p.weighting_serve_sa
+    serve_bqs = np.where(faulted[lanes], serve_bqs * 0.80, serve_bqs)
+    quality = np.clip(serve_bqs + rng.standard_normal(lanes.size) * p.variance_sigma_point, 1.0,
+                      p.shot_quality_ceiling)
+
+    # Per-lane returner skills: index 0 = receiver, 1 = server. As in simulation.simulate_point, the
+    # server plays the first rally shot off its own serve, so the server returns on odd shots.
+    defense = np.stack([r_gs * p.weighting_rally_gs_defense + r_ref * p.weighting_ref_defense,
+                        s_gs * p.weighting_rally_gs_defense + s_ref * p.weighting_ref_defense], axis=1)
+    offense = np.stack([r_gs * p.weighting_rally_gs_offense + rcv[:, 5] * p.weighting_str_offense,
+                        s_gs * p.weighting_rally_gs_offense + srv[:, 5] * p.weighting_str_offense], axis=1)
+    per_shot = np.stack([(p.rally_fatigue_scalar - rcv[:, 4]) / p.rally_fatigue_divisor,
+                         (p.rally_fatigue_scalar - srv[:, 4]) / p.rally_fatigue_divisor], axis=1)
+
+    shot = 0
+    while lanes.size:
+        shot += 1
+        returner = 1 if shot % 2 == 1 else 0
+        chance = p.rally_success_threshold - (quality - defense[lanes, returner]) / p.shot_quality_ceiling
+        success = rng.random(lanes.size) < np.clip(chance, 0.01, 0.99)
+
+        # A failed return goes to the striker, i.e. the other player.
+        failed = lanes[~success]
+        rally_length[failed] = shot
+        server_won[failed] = returner == 0
+
+        lanes, quality = lanes[success], quality[success]
+        if shot >= MAX_RALLY_LENGTH:
+            rally_length[lanes] = shot
+            server_won[lanes] = returner == 1
+            break
+        bqs = offense[lanes, returner] * (1.0 - np.minimum(0.3, shot * per_shot[lanes, returner]))
+        quality = np.clip(bqs + rng.standard_normal(lanes.size) * p.variance_sigma_point, 1.0, p.shot_quality_ceiling)
+
+    return server_won, outcome, rally_length, first_serve_fault
+
+
+# ----------------------------------------------------------------------
+# Lockstep Match Engine
+# ----------------------------------------------------------------------
+
+def simulate_matches(p1_skills: np.ndarray, p2_skills: np.ndarray, num_sets: int = 3,
+                     seed=None, params: SimParams = DEFAULT_PARAMS) -> BatchResult:
+    """Simulates n independent matches in lockstep, one array lane per match, under `params`.
+
+    p1_skills/p2_skills are (n, 7) arrays in SKILL_COLUMNS order (see skill_matrix). The scoring,
+    serve rotation and fatigue rules are those of simulation.simulate_game/_tiebreak/_set/_match;
+    every player starts the match fresh.
+    """
+    p1_skills = np.asarray(p1_skills, dtype=float)
+    p2_skills = np.asarray(p2_skills, dtype=float)
+    n = p1_skills.shape[0]
+    rng = np.random.default_rng(seed)
+    res = BatchResult(n)
+    sets_to_win = (num_sets // 2) + 1
+
+    skills = np.stack([p1_skills, p2_skills], axis=1)  # (n, 2, 7)
+    fatigue = np.zeros((n, 2))
+    games = np.zeros((n, 2), dtype=np.int16)
+    points = np.zeros((n, 2), dtype=np.int16)
+    server = np.zeros(n, dtype=np.int8)  # server of the current game
+    set_server = np.zeros(n, dtype=np.int8)  # first server of the current set
+    in_tiebreak = np.zeros(n, dtype=bool)
+    tb_initial = np.zeros(n, dtype=np.int8)
+    tb_point = np.zeros(n, dtype=np.int16)
+    tb_rally_total = np.zeros(n, dtype=np.int32)
+
+    active = np.arange(n)
+    while active.size:
+        a = active
+        tb = in_tiebreak[a]
+
+        # Tiebreak rotation: point 1 by the initial server, then alternate in pairs
+        tb_srv = np.where(((tb_point[a] - 1) % 4 < 2) & (tb_point[a] > 0), 1 - tb_initial[a], tb_initial[a])
+        srv_idx = np.where(tb, tb_srv, server[a]).astype(np.intp)
+        rcv_idx = 1 - srv_idx
+
+        server_won, outcome, rally, fsf = _simulate_points(
+            rng, skills[a, srv_idx], skills[a, rcv_idx], fatigue[a, srv_idx], fatigue[a, rcv_idx], params)
+        winner_idx = np.where(server_won, srv_idx, rcv_idx)
+
+        # --- StatsTracker.record_point ---
+        res.total_points[a] += 1
+        res.points_won[a, winner_idx] += 1
+        res.aces[a] += outcome == OUTCOME_ACE
+        res.double_faults[a] += outcome == OUTCOME_DOUBLE_FAULT
+        res.forced_errors[a] += outcome == OUTCOME_FORCED_ERROR
+        res.longest_rally[a] = np.maximum(res.longest_rally[a], rally)
+        res.sum_rally_lengths[a] += rally
+        res.total_rallies[a] += rally > 0
+        res.rally_histogram += np.bincount(rally[rally > 0], minlength=MAX_RALLY_LENGTH + 1)
+        served = outcome != OUTCOME_DOUBLE_FAULT
+        res.serves_attempted[a, srv_idx] += served
+        res.first_serve_points_won[a, srv_idx] += served & ~fsf & server_won
+        res.first_serve_faults[a, srv_idx] += served & fsf
+        res.second_serve_points_faced[a, srv_idx] += served & fsf
+        res.second_serve_points_won[a, srv_idx] += served & fsf & server_won
+
+        points[a, winner_idx] += 1
+        p_win, p_lose = points[a, winner_idx], points[a, 1 - winner_idx]
+
+        # --- Regular games: fatigue accrues every point ---
+        reg = ~tb
+        fatigue[a[reg]] += rally[reg, None]
+        game_over = reg & (p_win >= 4) & (p_win >= p_lose + 2)
+        g = a[game_over]
+        g_winner = winner_idx[game_over]
+        res.service_games_played[g, server[g]] += 1
+        res.service_games_won[g, server[g]] += g_winner == server[g]
+        games[g, g_winner] += 1
+        points[g] = 0
+        server[g] = 1 - server[g]
+
+        gw, gl = games[g, g_winner], games[g, 1 - g_winner]
+        set_over = np.zeros(n, dtype=bool)
+        set_over[g[(gw >= 6) & (gw >= gl + 2)]] = True
+        start_tb = g[(games[g, 0] == 6) & (games[g, 1] == 6)]
+        in_tiebreak[start_tb] = True
+        tb_initial[start_tb] = server[start_tb]
+        tb_point[start_tb] = 0
+        tb_rally_total[start_tb] = 0
+        res.tiebreaks_played[start_tb] += 1
+
+        # --- Tiebreaks: fatigue is applied once the tiebreak ends ---
+        t = a[tb]
+        tb_rally_total[t] += rally[tb]
+        tb_point[t] += 1
+        tb_over = tb & (p_win >= 7) & (p_win >= p_lose + 2)
+        t_done = a[tb_over]
+        games[t_done, winner_idx[tb_over]] += 1
+        fatigue[t_done] += tb_rally_total[t_done, None]
+        points[t_done] = 0
+        in_tiebreak[t_done] = False
+        set_over[t_done] = True
+
+        # --- Set completion ---
+        s = np.flatnonzero(set_over)
+        if s.size:
+            s_winner = (games[s, 1] > games[s, 0]).astype(np.intp)
+            res.sets_played[s] += 1
+            res.total_games[s] += games[s, 0] + games[s, 1]
+            res.sets_won[s, s_winner] += 1
+            games[s] = 0
+            set_server[s] = 1 - set_server[s]
+            server[s] = set_server[s]
+            match_over = s[res.sets_won[s, s_winner] >= sets_to_win]
+            res.winner[match_over] = s_winner[res.sets_won[s, s_winner] >= sets_to_win]
+            active = np.setdiff1d(active, match_over, assume_unique=True)
+
+    return res
+
+
+def simulate_player_matches(player1s: list[Player], player2s: list[Player], num_sets: int = 3,
+                            seed=None, params: SimParams = DEFAULT_PARAMS) -> BatchResult:
+    """Convenience wrapper: simulates player1s[i] vs. player2s[i] for every i in one batch."""
+    return simulate_matches(skill_matrix(player1s), skill_matrix(player2s), num_sets=num_sets, seed=seed,
+                            params=params)
@@ -0,0 +1,361 @@
+# benchmark.py
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import results_store
+import roster_loader
+import simulation
+import test_batch
+from game_session import GameSession
+from match_aggregate import MatchAggregate
+from players import Player
+from rng_streams import StreamFactory
+from sim_observers import SimulationObserver
+
+# --- BENCHMARK CONFIGURATION ---
+MICRO_CALLS = 50000  # Calls per timing run of the micro benchmarks
+BENCHMARK_MATCHES = 300  # Matches per timing run of the simulate_match benchmarks
+PAIRING_MATCHES = 200  # Matches of the test_batch pairing benchmark
+PAIRING = ("Pro", "Challenger")
+SCHEDULES = 20  # Annual schedules generated per timing run
+ROSTER_LOADS = 50  # Loads of players.csv per timing run of the roster_loader benchmarks
+RESULTS_ROWS = 50000  # Synthetic match log rows written per results sink
+REPEATS = 5  # Timing runs per benchmark; the fastest is reported
+NUM_SETS = 3
+SEED = 1
+
+BENCHMARK_FOLDER = "sim_stats"  # Every run is saved here as benchmark_<timestamp>.json
+BASELINE_FILE = os.path.join(BENCHMARK_FOLDER, "benchmark_baseline.json")
+REGRESSION_TOLERANCE = 0.10  # Flag a rate that drops, or a peak memory that grows, by more than this
+# --- END CONFIGURATION ---
+
+# Usage:
+#   python benchmark.py                               run the suite, save it and compare against the baseline
+#   python benchmark.py baseline                      run the suite and save it as the new baseline
+#   python benchmark.py compare RESULTS [BASELINE]    compare two saved runs without running anything
+
+# Work counts a benchmark reports, and the rate each becomes in the JSON
+RATES = {'calls': 'calls_per_sec', 'points': 'points_per_sec', 'matches': 'matches_per_sec', 'rows': 'rows_per_sec',
+         'players': 'players_per_sec'}
+
+
+def benchmark_players() -> tuple[Player, Player]:
+    return (Player("Benchmark A", 80, 80, 80, 80, 80, 80, 80),
+            Player("Benchmark B", 75, 75, 75, 75, 75, 75, 75))
+
+
+# ----------------------------------------------------------------------
+# Benchmarks
+# ----------------------------------------------------------------------
+# Each benchmark is a function of its setup's output that runs the timed work once, from fixed seeds, and
+# returns (seconds, work counts). Setup runs once per benchmark, outside the timing.
+
+def bench_serve_fault_check(players) -> tuple[float, dict]:
+    server = players[0]
+    rng = random.Random(SEED)
+    start = time.perf_counter()
+    for _ in range(MICRO_CALLS):
+        simulation.serve_fault_check(server, rng)
+    return time.perf_counter() - start, {'calls': MICRO_CALLS}
+
+
+def rally_check_inputs() -> tuple[Player, list[float]]:
+    """A receiver and MICRO_CALLS seeded incoming shot qualities."""
+    rng = random.Random(SEED)
+    return benchmark_players()[1], [rng.uniform(40, 100) for _ in range(MICRO_CALLS)]
+
+
+def bench_rally_success_check(inputs) -> tuple[float, dict]:
+    receiver, qualities = inputs
+    rng = random.Random(SEED)
+    start = time.perf_counter()
+    for quality in qualities:
+        simulation.rally_success_check(receiver, quality, rng)
+    return time.perf_counter() - start, {'calls': MICRO_CALLS}
+
+
+def bench_simulate_point(players) -> tuple[float, dict]:
+    server, receiver = players
+    rng = random.Random(SEED)
+    start = time.perf_counter()
+    for _ in range(MICRO_CALLS):
+        simulation.simulate_point(server, receiver, rng)
+    return time.perf_counter() - start, {'points': MICRO_CALLS}
+
+
+def run_matches(players, num_sets: int, **match_kwargs) -> tuple[float, dict]:
+    """BENCHMARK_MATCHES seeded simulate_match calls."""
+    player1, player2 = players
+    rng = random.Random(SEED)
+    points = 0
+    start = time.perf_counter()
+    for _ in range(BENCHMARK_MATCHES):
+        points += simulation.simulate_match(player1, player2, num_sets=num_sets, verbose=False, rng=rng,
+                                            **match_kwargs)[1].total_points
+    return time.perf_counter() - start, {'matches': BENCHMARK_MATCHES, 'points': points}
+
+
+def match_result_inputs() -> tuple[tuple[Player, Player], int]:
+    """The benchmark players and the points of their Bo3 run_matches. simulate_match_result plays the same
+    matches without counting points, so they are counted once here rather than inside the timed run."""
+    players = benchmark_players()
+    return players, run_matches(players, 3)[1]['points']
+
+
+def run_match_results(inputs) -> tuple[float, dict]:
+    """The matches of run_matches(players, 3), as seeded simulate_match_result calls."""
+    (player1, player2), points = inputs
+    rng = random.Random(SEED)
+    start = time.perf_counter()
+    for _ in range(BENCHMARK_MATCHES):
+        simulation.simulate_match_result(player1, player2, num_sets=3, rng=rng)
+    return time.perf_counter() - start, {'matches': BENCHMARK_MATCHES, 'points': points}
+
+
+def bench_test_batch_pairing(players_by_tier) -> tuple[float, dict]:
+    """test_batch's serial loop for one tier pairing, aggregate included."""
+    tier1, tier2 = PAIRING
+    streams = StreamFactory(SEED)
+    aggregate = MatchAggregate()
+    start = time.perf_counter()
+    for match_id in range(1, PAIRING_MATCHES + 1):
+        _, p1_obj, _, winner, tracker = test_batch.play_match(players_by_tier, tier1, tier2, match_id, streams)
+        aggregate.add_tracker(tracker, winner is p1_obj)
+    aggregate.summary(tier1, tier2)
+    return time.perf_counter() - start, {'matches': PAIRING_MATCHES, 'points': aggregate.total_points}
+
+
+def bench_annual_schedule(session) -> tuple[float, dict]:
+    random.seed(SEED)
+    start = time.perf_counter()
+    for year in range(2025, 2025 + SCHEDULES):
+        session.generate_annual_schedule(year)
+    return time.perf_counter() - start, {'calls': SCHEDULES}
+
+
+def csv_text() -> str:
+    with open(test_batch.PLAYER_DATA_FILE, encoding='utf-8') as f:
+        return f.read()
+
+
+def bench_parse_players(text: str) -> tuple[float, dict]:
+    """roster_loader's cold path: parsing players.csv."""
+    start = time.perf_counter()
+    for _ in range(ROSTER_LOADS):
+        players = len(roster_loader.parse_csv(text))
+    return time.perf_counter() - start, {'players': players * ROSTER_LOADS}
+
+
+def snapshot_players() -> str:
+    roster_loader.load_players(test_batch.PLAYER_DATA_FILE)  # Writes the snapshot if it isn't current
+    return test_batch.PLAYER_DATA_FILE
+
+
+def bench_load_players(filename: str) -> tuple[float, dict]:
+    """roster_loader's warm path: a PlayerPool of its own from the snapshot, grouped by tier."""
+    start = time.perf_counter()
+    for _ in range(ROSTER_LOADS):
+        pool = roster_loader.load_players(filename, shared=False)
+        pool.by_tier
+    return time.perf_counter() - start, {'players': len(pool) * ROSTER_LOADS}
+
+
+def synthetic_rows(count: int) -> list[dict]:
+    """test_batch-style match log rows with random players and results."""
+    rng = random.Random(SEED)
+    rows = []
+    for match_id in range(1, count + 1):
+        p1_id, p2_id = rng.randrange(1, 201), rng.randrange(1, 201)
+        sets_lost = rng.randrange(NUM_SETS // 2 + 1)
+        rows.append({'match_id': match_id, 'p1_id': p1_id, 'p1_tier': "Elite", 'p2_id': p2_id, 'p2_tier': "Pro",
+                     'winner_id': rng.choice((p1_id, p2_id)), 'final_score': f"{NUM_SETS // 2 + 1}-{sets_lost}",
+                     'num_sets_played': NUM_SETS // 2 + 1 + sets_lost, 'root_seed': SEED, 'stream_index': match_id,
+                     'point_model': "exact"})
+    return rows
+
+
+def path_size(path: str) -> int:
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    return os.path.getsize(path)
+
+
+def write_results(rows: list[dict], results_format: str) -> tuple[float, dict]:
+    """Writes the rows through a results_store sink; also reports the file size and a two-column load time."""
+    with tempfile.TemporaryDirectory() as folder:
+        start = time.perf_counter()
+        with results_store.open_sink(results_format, os.path.join(folder, results_format), list(rows[0])) as sink:
+            for row in rows:
+                sink.write_row(row)
+        seconds = time.perf_counter() - start
+        load_start = time.perf_counter()
+        results_store.load_results(sink.path, ['winner_id', 'num_sets_played'])
+        return seconds, {'rows': len(rows), 'file_kib': path_size(sink.path) / 1024,
+                         'load_ms': (time.perf_counter() - load_start) * 1000}
+
+
+def benchmark_suite() -> list[tuple]:
+    """(name, setup, run) of every benchmark."""
+    def load_players():
+        return roster_loader.load_players(test_batch.PLAYER_DATA_FILE).by_tier
+
+    def new_session():
+        return GameSession.__new__(GameSession)  # generate_annual_schedule needs no loaded session
+
+    suite = [
+        ("serve_fault_check", benchmark_players, bench_serve_fault_check),
+        ("rally_success_check", rally_check_inputs, bench_rally_success_check),
+        ("simulate_point", benchmark_players, bench_simulate_point),
+        ("simulate_match_bo3", benchmark_players, lambda players: run_matches(players, 3)),
+        ("simulate_match_bo5", benchmark_players, lambda players: run_matches(players, 5)),
+        ("simulate_match_bo3_noop_observer", benchmark_players,
+         lambda players: run_matches(players, 3, observer=SimulationObserver())),
+        ("simulate_match_result_bo3", match_result_inputs, run_match_results),
+        ("test_batch_pairing", load_players, bench_test_batch_pairing),
+        ("annual_schedule", new_session, bench_annual_schedule),
+        ("roster_parse_csv", csv_text, bench_parse_players),
+        ("roster_load_snapshot", snapshot_players, bench_load_players),
+    ]
+    formats = [results_store.FORMAT_CSV, results_store.FORMAT_NPZ]
+    if results_store.PARQUET_AVAILABLE:
+        formats.append(results_store.FORMAT_PARQUET)
+    for results_format in formats:
+        suite.append((f"results_store_{results_format}", lambda: synthetic_rows(RESULTS_ROWS),
+                      lambda rows, results_format=results_format: write_results(rows, results_format)))
+    return suite
+
+
+# ----------------------------------------------------------------------
+# Running and comparing
+# ----------------------------------------------------------------------
+
+def run_suite() -> dict:
+    """Runs every benchmark REPEATS times plus once under tracemalloc; returns the JSON report."""
+    suite = benchmark_suite()
+    setups = [setup() for _, setup, _ in suite]
+    best = [None] * len(suite)
+    # Benchmarks take turns within each repeat so machine-load drift hits them all alike
+    for _ in range(REPEATS):
+        for i, ((_, _, run), data) in enumerate(zip(suite, setups)):
+            seconds, counts = run(data)
+            if best[i] is None or seconds < best[i][0]:
+                best[i] = (seconds, counts)
+
+    benchmarks = {}
+    for (name, _, run), data, (seconds, counts) in zip(suite, setups, best):
+        tracemalloc.start()
+        run(data)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        entry = {'seconds': round(seconds, 6)}
+        for count, value in counts.items():
+            if count in RATES:
+                entry[RATES[count]] = round(value / seconds, 1)
+            else:
+                entry[count] = round(value, 1)
+        entry['peak_memory_kib'] = round(peak / 1024, 1)
+        benchmarks[name] = entry
+
+    return {
+        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'config': {'seed': SEED, 'repeats': REPEATS, 'micro_calls': MICRO_CALLS,
+                   'benchmark_matches': BENCHMARK_MATCHES, 'pairing_matches': PAIRING_MATCHES,
+                   'schedules': SCHEDULES, 'roster_loads': ROSTER_LOADS, 'results_rows': RESULTS_ROWS},
+        'benchmarks': benchmarks,
+    }
+
+
+def compare(results: dict, baseline: dict) -> list[str]:
+    """Prints every rate and peak memory of `results` against `baseline`; returns the regressions."""
+    regressions = []
+    print(f"\n--- Against baseline from {baseline.get('timestamp', '?')} (tolerance {REGRESSION_TOLERANCE:.0%}) ---")
+    for name, entry in results['benchmarks'].items():
+        base = baseline['benchmarks'].get(name)
+        if base is None:
+            print(f"- {name:<34}: new")
+            continue
+        changes = []
+        for metric in [*RATES.values(), 'peak_memory_kib']:
+            if metric not in entry or not base.get(metric):
+                continue
+            ratio = entry[metric] / base[metric]
+            if metric == 'peak_memory_kib':
+                regressed = ratio > 1 + REGRESSION_TOLERANCE
+            else:
+                regressed = ratio < 1 - REGRESSION_TOLERANCE
+            if regressed:
+                regressions.append(f"{name} {metric}")
+            changes.append(f"{metric} {ratio - 1:+.1%}{' REGRESSION' if regressed else ''}")
+        print(f"- {name:<34}: {', '.join(changes)}")
+    print(f"{len(regressions)} regression(s)" + (f": {', '.join(regressions)}" if regressions else ""))
+    return regressions
+
+
+def print_results(results: dict):
+    print("=======================================================")
+    print(f"|  BENCHMARK SUITE (BEST OF {REPEATS}, SEED {SEED})  |")
+    print("=======================================================")
+    for name, entry in results['benchmarks'].items():
+        rates = [f"{entry[rate]:,.0f} {rate.replace('_per_sec', '')}/s" for rate in RATES.values() if rate in entry]
+        extras = [f"{key} {value:,}" for key, value in entry.items()
+                  if key not in RATES.values() and key not in ('seconds', 'peak_memory_kib')]
+        print(f"- {name:<34}: {' | '.join(rates + extras)} | peak {entry['peak_memory_kib']:,.0f} KiB")
+    full, result_only = (results['benchmarks'].get(name) for name in ("simulate_match_bo3",
+                                                                      "simulate_match_result_bo3"))
+    if full and result_only:
+        print(f"\nResult-only speedup (simulate_match_result vs. simulate_match, Bo3): "
+              f"{result_only['matches_per_sec'] / full['matches_per_sec']:.2f}x matches/s, "
+              f"{result_only['peak_memory_kib']:,.1f} vs. {full['peak_memory_kib']:,.1f} KiB peak")
+
+
+def load_json(filename: str) -> dict:
+    with open(filename) as f:
+        return json.load(f)
+
+
+def save_json(results: dict, filename: str):
+    with open(filename, 'w') as f:
+        json.dump(results, f, indent=2)
+
+
+def main():
+    """Runs the suite (see Usage above); exits with status 1 when a comparison finds a regression."""
+    command = sys.argv[1] if len(sys.argv) > 1 else "run"
+    if command == "compare":
+        if len(sys.argv) < 3:
+            print("Usage: python benchmark.py compare RESULTS [BASELINE]")
+            return
+        regressions = compare(load_json(sys.argv[2]), load_json(sys.argv[3] if len(sys.argv) > 3 else BASELINE_FILE))
+        sys.exit(1 if regressions else 0)
+    if command not in ("run", "baseline"):
+        print(f"Unknown command '{command}'; use run, baseline or compare.")
+        return
+
+    os.makedirs(BENCHMARK_FOLDER, exist_ok=True)
+    results = run_suite()
+    print_results(results)
+    output_filename = os.path.join(BENCHMARK_FOLDER, f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    save_json(results, output_filename)
+    print(f"\nResults saved to '{output_filename}'")
+
+    if command == "baseline":
+        save_json(results, BASELINE_FILE)
+        print(f"Baseline saved to '{BASELINE_FILE}'")
+    elif os.path.exists(BASELINE_FILE):
+        if compare(results, load_json(BASELINE_FILE)):
+            sys.exit(1)
+    else:
+        print(f"No baseline at '{BASELINE_FILE}'; run 'python benchmark.py baseline' to save one.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,354 @@
+# calibrate.py
+import ast
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+import ovr_matrix
+import roster_loader
+import test_batch
+from configs import simulation_config
+from match_aggregate import MatchAggregate
+from rng_streams import StreamFactory
+from sim_params import SimParams
+
+# --- CALIBRATION CONFIGURATION ---
+PLAYER_DATA_FILE = test_batch.PLAYER_DATA_FILE
+CONFIG_FILE = os.path.join("configs", "simulation_config.py")
+MATCHES_PER_TIER = 300  # Same-tier matches per tier and candidate; every candidate replays the same streams
+ROOT_SEED = 2024
+WORKERS = os.cpu_count() or 1
+
+INITIAL_CANDIDATES = 12  # Space-filling first round, plus the current config
+ROUNDS = 8  # Surrogate-guided rounds after the first
+CANDIDATES_PER_ROUND = 4  # Evaluated in parallel each round
+GRID_STEPS = 100  # Candidates snap to 1/GRID_STEPS of each range, so near-repeats reuse a cached evaluation
+TRUST_RADIUS = 0.5  # Starting search radius around the best candidate, as a fraction of each range
+MIN_TRUST_RADIUS = 0.05
+SURROGATE_SAMPLES = 5000  # Random points the surrogate scores per proposal round
+
+CACHE_FILE = os.path.join("sim_stats", "calibration_cache.json")
+OUTPUT_FOLDER = "sim_stats"
+
+# Constant -> (low, high). DOUBLE_FAULT_TIERS is searched as one factor applied to all of its rates.
+SEARCH_SPACE = {
+    'ACE_CEILING_FACTOR': (0.15, 0.6),
+    'RALLY_SUCCESS_THRESHOLD': (0.55, 0.8),
+    'POWER_PENALTY_RATE': (0.0, 0.3),
+    'FSSR_BASELINE_FLOOR': (25, 65),
+    'FSSR_SA_WEIGHT': (0.2, 0.6),
+    'DOUBLE_FAULT_TIERS': (0.3, 1.5),
+}
+
+# Tier -> target per stat, measured over same-tier test_batch matches. Stats: ace_pct and double_fault_pct
+# (of all points), first_serve_in_pct, hold_pct and avg_rally_length, as in test_batch's report.
+TARGETS = {
+    "Elite": {'ace_pct': 8.0, 'double_fault_pct': 3.0, 'first_serve_in_pct': 62.0, 'hold_pct': 80.0,
+              'avg_rally_length': 4.0},
+    "Pro": {'ace_pct': 6.5, 'double_fault_pct': 3.5, 'first_serve_in_pct': 60.0, 'hold_pct': 76.0,
+            'avg_rally_length': 4.2},
+    "Challenger": {'ace_pct': 5.0, 'double_fault_pct': 4.0, 'first_serve_in_pct': 58.0, 'hold_pct': 72.0,
+                   'avg_rally_length': 4.4},
+    "Futures": {'ace_pct': 3.5, 'double_fault_pct': 5.0, 'first_serve_in_pct': 56.0, 'hold_pct': 68.0,
+                'avg_rally_length': 4.6},
+    "Beginner": {'ace_pct': 2.0, 'double_fault_pct': 7.0, 'first_serve_in_pct': 54.0, 'hold_pct': 62.0,
+                 'avg_rally_length': 4.8},
+}
+# A miss of this size in a stat adds 1 to the loss (the loss is the sum of squared scaled misses)
+STAT_SCALES = {'ace_pct': 1.0, 'double_fault_pct': 0.5, 'first_serve_in_pct': 2.0, 'hold_pct': 3.0,
+               'avg_rally_length': 0.25}
+# --- END CONFIGURATION ---
+
+# Bump when a simulation code change makes cached evaluations stale
+CACHE_VERSION = 1
+
+
+# ----------------------------------------------------------------------
+# Candidates
+# ----------------------------------------------------------------------
+# A candidate is a point u in the unit cube, one coordinate per SEARCH_SPACE constant.
+
+def _param_names() -> list[str]:
+    return list(SEARCH_SPACE)
+
+
+def snap(u: np.ndarray) -> np.ndarray:
+    return np.round(np.clip(u, 0.0, 1.0) * GRID_STEPS) / GRID_STEPS
+
+
+def candidate_values(u: np.ndarray) -> dict:
+    """Constant -> searched value (the DOUBLE_FAULT_TIERS factor stays a number here)."""
+    values = {}
+    for name, x in zip(_param_names(), u):
+        low, high = SEARCH_SPACE[name]
+        value = low + float(x) * (high - low)
+        original = getattr(simulation_config, name)
+        values[name] = int(round(value)) if isinstance(original, int) else round(value, 6)
+    return values
+
+
+def candidate_overrides(u: np.ndarray) -> dict:
+    """The simulation_config overrides of a candidate."""
+    overrides = candidate_values(u)
+    if 'DOUBLE_FAULT_TIERS' in overrides:
+        factor = overrides['DOUBLE_FAULT_TIERS']
+        overrides['DOUBLE_FAULT_TIERS'] = {sa: round(rate * factor, 2)
+                                           for sa, rate in simulation_config.DOUBLE_FAULT_TIERS.items()}
+    return overrides
+
+
+def current_candidate() -> np.ndarray:
+    """The current config's position in the search space (clipped to the ranges, not snapped to the grid).
+
+    calibrate evaluates the config itself (no overrides) there, so the search starts from its exact loss.
+    """
+    u = []
+    for name, (low, high) in SEARCH_SPACE.items():
+        value = 1.0 if name == 'DOUBLE_FAULT_TIERS' else getattr(simulation_config, name)
+        u.append((value - low) / (high - low))
+    return np.clip(np.array(u), 0.0, 1.0)
+
+
+def latin_hypercube(n: int, dims: int, rng: np.random.Generator) -> np.ndarray:
+    """n points spread over the unit cube: each dimension's n strata get one point each."""
+    strata = np.array([rng.permutation(n) for _ in range(dims)]).T
+    return (strata + rng.random((n, dims))) / n
+
+
+# ----------------------------------------------------------------------
+# Evaluation
+# ----------------------------------------------------------------------
+
+def tier_stats(aggregate: MatchAggregate) -> dict:
+    first_serves_in = aggregate.serves_attempted - aggregate.first_serve_faults
+    held = sum(aggregate.side('service_games_won', side) for side in (0, 1))
+    served = sum(aggregate.side('service_games_played', side) for side in (0, 1))
+    return {
+        'ace_pct': aggregate.aces / aggregate.total_points * 100,
+        'double_fault_pct': aggregate.double_faults / aggregate.total_points * 100,
+        'first_serve_in_pct': first_serves_in / aggregate.serves_attempted * 100,
+        'hold_pct': held / served * 100,
+        'avg_rally_length': aggregate.sum_rally_lengths / aggregate.total_rallies,
+    }
+
+
+# Per-process player pool, loaded once by _init_worker
+_players_by_tier = None
+
+
+def _init_worker(player_data_file: str):
+    global _players_by_tier
+    _players_by_tier = roster_loader.load_players(player_data_file).by_tier
+
+
+def evaluate(overrides: dict, tiers: list[str], matches_per_tier: int, root_seed: int) -> dict:
+    """{tier: stats} of matches_per_tier same-tier matches per tier under the overrides (as a SimParams).
+
+    Match ids, and so players and streams, are the same for every candidate (common random numbers),
+    so two nearby candidates differ by their effect rather than by sampling noise.
+    """
+    streams = StreamFactory(root_seed)
+    params = SimParams(overrides)
+    results = {}
+    for tier_index, tier in enumerate(tiers):
+        aggregate = MatchAggregate()
+        first_match_id = tier_index * matches_per_tier + 1
+        for match_id in range(first_match_id, first_match_id + matches_per_tier):
+            _, p1_obj, _, winner, tracker = test_batch.play_match(_players_by_tier, tier, tier, match_id, streams,
+                                                                  params=params)
+            aggregate.add_tracker(tracker, winner is p1_obj)
+        results[tier] = tier_stats(aggregate)
+    return results
+
+
+def evaluation_key(overrides: dict) -> str:
+    """Cache key: the full config under the overrides, the players file and the sampling settings."""
+    with open(PLAYER_DATA_FILE, 'rb') as f:
+        players_digest = hashlib.sha256(f.read()).hexdigest()
+    config = {**ovr_matrix.config_constants(), **overrides}
+    key = [CACHE_VERSION, config, players_digest, list(TARGETS), MATCHES_PER_TIER, ROOT_SEED, test_batch.NUM_SETS]
+    return hashlib.sha256(json.dumps(key, sort_keys=True, default=repr).encode()).hexdigest()[:32]
+
+
+def loss(stats: dict) -> float:
+    return sum(((stats[tier][stat] - target) / STAT_SCALES[stat]) ** 2
+               for tier, targets in TARGETS.items() for stat, target in targets.items())
+
+
+# ----------------------------------------------------------------------
+# Surrogate
+# ----------------------------------------------------------------------
+# Every stat of every tier is modelled as a quadratic in u, fitted by ridge regression over all
+# evaluations so far, weighted by closeness to the best candidate: each fit pools the runs around
+# where the search currently is, and nothing ever has to be simulated twice.
+
+def _features(u: np.ndarray) -> np.ndarray:
+    u = np.atleast_2d(u)
+    i, j = np.triu_indices(u.shape[1])
+    return np.hstack([np.ones((len(u), 1)), u, u[:, i] * u[:, j]])
+
+
+def _outputs(stats: dict) -> list[float]:
+    return [stats[tier][stat] for tier, targets in TARGETS.items() for stat in targets]
+
+
+def fit_surrogate(points: np.ndarray, outputs: np.ndarray, center: np.ndarray, radius: float,
+                  ridge: float = 1e-3) -> np.ndarray:
+    """Quadratic coefficients (features x outputs), Gaussian-weighted by distance from center."""
+    weights = np.exp(-np.sum((points - center) ** 2, axis=1) / (2 * (2 * radius) ** 2))
+    x = _features(points) * np.sqrt(weights)[:, None]
+    y = outputs * np.sqrt(weights)[:, None]
+    return np.linalg.solve(x.T @ x + ridge * np.eye(x.shape[1]), x.T @ y)
+
+
+def predicted_losses(coefficients: np.ndarray, u: np.ndarray) -> np.ndarray:
+    predicted = _features(u) @ coefficients
+    targets = np.array([target for targets in TARGETS.values() for target in targets.values()])
+    scales = np.array([STAT_SCALES[stat] for targets in TARGETS.values() for stat in targets])
+    return np.sum(((predicted - targets) / scales) ** 2, axis=1)
+
+
+def propose(coefficients: np.ndarray, center: np.ndarray, radius: float, evaluated: set, count: int,
+            rng: np.random.Generator) -> list[np.ndarray]:
+    """The `count` best surrogate-scored grid points within radius of center that haven't been run,
+    kept at least a grid step apart."""
+    samples = snap(center + rng.uniform(-radius, radius, (SURROGATE_SAMPLES, len(center))))
+    order = np.argsort(predicted_losses(coefficients, samples))
+    chosen = []
+    for u in samples[order]:
+        if tuple(u) in evaluated or any(np.max(np.abs(u - c)) < 1.5 / GRID_STEPS for c in chosen):
+            continue
+        chosen.append(u)
+        if len(chosen) == count:
+            break
+    return chosen
+
+
+# ----------------------------------------------------------------------
+# Search
+# ----------------------------------------------------------------------
+
+def calibrate(workers: int = WORKERS, seed: int = ROOT_SEED) -> dict:
+    """Runs the search; returns {'best': u, 'overrides', 'stats', 'loss', 'history', 'evaluated', 'cached'}.
+
+    'overrides' is {} when no candidate beat the current config.
+    """
+    rng = np.random.default_rng(seed)
+    cache = ovr_matrix.load_cache(CACHE_FILE)
+    history = []  # (u, stats, loss) per candidate
+    counts = {'evaluated': 0, 'cached': 0}
+
+    def run(candidates, pool, overrides=None):
+        overrides = overrides or [candidate_overrides(u) for u in candidates]
+        keys = [evaluation_key(candidate) for candidate in overrides]
+        missing = {key: candidate for key, candidate in zip(keys, overrides) if key not in cache}
+        futures = {key: pool.submit(evaluate, candidate, list(TARGETS), MATCHES_PER_TIER, ROOT_SEED)
+                   for key, candidate in missing.items()}
+        for key, future in futures.items():
+            cache[key] = future.result()
+        counts['evaluated'] += len(missing)
+        counts['cached'] += len(candidates) - len(missing)
+        if missing:
+            ovr_matrix.save_cache(cache, CACHE_FILE)
+        for key, u in zip(keys, candidates):
+            history.append((u, cache[key], loss(cache[key])))
+            print(f"  loss {history[-1][2]:10.2f} | {candidate_values(u)}")
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(PLAYER_DATA_FILE,)) as pool:
+        print(f"Round 0: current config + {INITIAL_CANDIDATES} space-filling candidates")
+        current_u = current_candidate()
+        run([current_u], pool, [{}])
+        run(list(snap(latin_hypercube(INITIAL_CANDIDATES, len(SEARCH_SPACE), rng))), pool)
+
+        radius = TRUST_RADIUS
+        for round_number in range(1, ROUNDS + 1):
+            best_u, _, best_loss = min(history, key=lambda entry: entry[2])
+            points = np.array([u for u, _, _ in history])
+            outputs = np.array([_outputs(stats) for _, stats, _ in history])
+            coefficients = fit_surrogate(points, outputs, best_u, radius)
+            candidates = propose(coefficients, best_u, radius, {tuple(u) for u in points}, CANDIDATES_PER_ROUND,
+                                 rng)
+            if not candidates:
+                break
+            print(f"Round {round_number}: radius {radius:.2f}, best loss so far {best_loss:.2f}")
+            run(candidates, pool)
+            # Trust region: keep the radius while rounds improve, shrink it when they don't
+            if min(entry[2] for entry in history[-len(candidates):]) >= best_loss:
+                radius = max(MIN_TRUST_RADIUS, radius / 2)
+
+    best_u, best_stats, best_loss = min(history, key=lambda entry: entry[2])
+    overrides = {} if best_u is current_u else candidate_overrides(best_u)
+    return {'best': best_u, 'overrides': overrides, 'stats': best_stats, 'loss': best_loss, 'history': history,
+            **counts}
+
+
+def tuned_config_source(overrides: dict, config_file: str = CONFIG_FILE) -> str:
+    """The config file's text with the overridden constants' assignments replaced."""
+    with open(config_file) as f:
+        source = f.read()
+    for name, value in overrides.items():
+        if isinstance(value, dict):
+            body = "".join(f"    {key!r}: {item!r},\n" for key, item in value.items())
+            source = re.sub(rf"^{name} = \{{.*?^\}}", lambda _: f"{name} = {{\n{body}}}", source,
+                            flags=re.M | re.S)
+        else:
+            source = re.sub(rf"^{name} = ([^#\n]*?)(\s*(#.*)?)$", lambda m: _scalar_assignment(name, value, m),
+                            source, flags=re.M)
+    return source
+
+
+def _scalar_assignment(name: str, value, match: re.Match) -> str:
+    """The new assignment line; an inline comment is only kept while the value is unchanged, since it
+    usually describes the old value."""
+    old = match.group(1).strip()
+    if not match.group(3) or ast.literal_eval(old) == value:
+        return f"{name} = {value!r}{match.group(2)}"
+    return f"{name} = {value!r}  # Calibrated (was {old})"
+
+
+def main():
+    """Searches SEARCH_SPACE for the constants that best hit TARGETS and writes the tuned config."""
+    print("=======================================================")
+    print(f"|  CALIBRATING {len(SEARCH_SPACE)} CONSTANTS ({MATCHES_PER_TIER} MATCHES PER TIER)  |")
+    print("=======================================================")
+    start = time.time()
+    cache = ovr_matrix.load_cache(CACHE_FILE)
+    baseline_key = evaluation_key({})
+    if baseline_key not in cache:
+        _init_worker(PLAYER_DATA_FILE)
+        cache[baseline_key] = evaluate({}, list(TARGETS), MATCHES_PER_TIER, ROOT_SEED)
+        ovr_matrix.save_cache(cache, CACHE_FILE)
+    baseline_stats = cache[baseline_key]
+    result = calibrate()
+    overrides = result['overrides']
+
+    print(f"\nLoss: {loss(baseline_stats):.2f} (current config) -> {result['loss']:.2f} | "
+          f"{result['evaluated']} candidates simulated, {result['cached']} from the cache | "
+          f"{time.time() - start:.1f} seconds")
+    print(f"{'':<28}{'Target':>9}{'Current':>9}{'Tuned':>9}")
+    for tier, targets in TARGETS.items():
+        for stat, target in targets.items():
+            print(f"{tier + ' ' + stat:<28}{target:>9.2f}{baseline_stats[tier][stat]:>9.2f}"
+                  f"{result['stats'][tier][stat]:>9.2f}")
+
+    os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+    output_filename = os.path.join(OUTPUT_FOLDER,
+                                   f"calibrated_simulation_config_{datetime.now().strftime('%Y%m%d_%H%M%S')}.py")
+    with open(output_filename, 'w') as f:
+        f.write(tuned_config_source(overrides))
+    print(f"\nTuned constants: {json.dumps(overrides)}")
+    at_bounds = [name for name, x in zip(_param_names(), result['best']) if x in (0.0, 1.0)] if overrides else []
+    if at_bounds:
+        print(f"At the edge of their SEARCH_SPACE range (widen it to search further): {', '.join(at_bounds)}")
+    print(f"Tuned config saved to '{output_filename}' (copy it over {CONFIG_FILE} to use it)")
+
+
+if __name__ == '__main__':
+    main()
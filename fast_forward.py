@@ -0,0 +1,196 @@
+# fast_forward.py
+import math
+import random
+import time
+from collections import Counter
+
+import point_cache
+import simulation
+import win_probability
+from match_context import MatchContext, MatchPlayer
+from players import Player
+from sim_params import SimParams, DEFAULT_PARAMS
+from stats_tracker import StatsTracker
+
+# --- VALIDATION CONFIGURATION (python fast_forward.py) ---
+VALIDATION_PAIRINGS = 5  # Random player pairings compared against point-by-point matches
+VALIDATION_MATCHES = 2000  # Matches per pairing and fidelity
+NUM_SETS = 3
+# --- END CONFIGURATION ---
+
+
+# ----------------------------------------------------------------------
+# Game Fidelity: one draw per game instead of one per shot
+# ----------------------------------------------------------------------
+# Each game is won with the hold probability that simulate_game's scoring rules give for the
+# server's per-point win probability (win_probability.game_summary), and each tiebreak likewise
+# (simulate_tiebreak's rotation, win_probability.tiebreak_summary). Point probabilities and expected
+# rally lengths come from a point_cache.PointCache, so they are computed once per pairing and fatigue
+# bucket. Fatigue advances by expected points x expected rally length, at the same moments
+# simulate_game (after each game) and simulate_tiebreak (at its end) add it.
+
+def _play_game(server: MatchPlayer, receiver: MatchPlayer, tracker: StatsTracker, rng, cache, observer,
+               params) -> MatchPlayer:
+    dist = cache.distribution(server, receiver, params)
+    hold, expected_points = win_probability.game_summary(dist.server_win_probability)
+    if observer is not None:
+        observer.on_game_start(server, receiver)
+
+    game_winner = server if rng.random() < hold else receiver
+    fatigue_gain = expected_points * dist.expected_rally_length
+    server.fatigue += fatigue_gain
+    receiver.fatigue += fatigue_gain
+    tracker.record_service_game(server, game_winner)
+
+    game_winner.games_won += 1
+    if observer is not None:
+        observer.on_game(server, receiver, game_winner)
+    return game_winner
+
+
+def _play_tiebreak(player1: MatchPlayer, player2: MatchPlayer, initial_server_index: int, tracker: StatsTracker,
+                   rng, cache, observer, params) -> MatchPlayer:
+    tracker.record_tiebreak()
+    if observer is not None:
+        observer.on_tiebreak_start(player1, player2)
+    first, second = (player1, player2) if initial_server_index == 0 else (player2, player1)
+    first_dist, second_dist = cache.distribution(first, second, params), cache.distribution(second, first, params)
+    first_wins, expected_points = win_probability.tiebreak_summary(first_dist.server_win_probability,
+                                                                   second_dist.server_win_probability)
+
+    tiebreak_winner = first if rng.random() < first_wins else second
+    fatigue_gain = expected_points * (first_dist.expected_rally_length + second_dist.expected_rally_length) / 2.0
+    player1.fatigue += fatigue_gain
+    player2.fatigue += fatigue_gain
+    return tiebreak_winner
+
+
+def _play_set(player1: MatchPlayer, player2: MatchPlayer, initial_server_index: int, tracker: StatsTracker, rng,
+              cache, observer, params) -> MatchPlayer:
+    player1.games_won, player2.games_won = 0, 0
+    server_index = initial_server_index
+    if observer is not None:
+        observer.on_set_start(player1, player2)
+    while True:
+        if (player1.games_won >= 6 and player1.games_won >= player2.games_won + 2) or (
+                player2.games_won >= 6 and player2.games_won >= player1.games_won + 2):
+            break
+        if player1.games_won == 6 and player2.games_won == 6:
+            tiebreak_winner = _play_tiebreak(player1, player2, server_index, tracker, rng, cache, observer, params)
+            tiebreak_winner.games_won += 1
+            break
+        server, receiver = (player1, player2) if server_index == 0 else (player2, player1)
+        _play_game(server, receiver, tracker, rng, cache, observer, params)
+        server_index = 1 - server_index
+    set_winner = player1 if player1.games_won > player2.games_won else player2
+    tracker.record_set(player1.games_won, player2.games_won)
+    set_winner.sets_won += 1
+    if observer is not None:
+        observer.on_set(player1, player2, set_winner)
+    return set_winner
+
+
+def simulate_match_games(player1: Player, player2: Player, num_sets: int = 3, rng=random, observer=None,
+                         cache: point_cache.PointCache = None,
+                         params: SimParams = DEFAULT_PARAMS) -> tuple[Player, StatsTracker]:
+    """simulate_match at game fidelity (simulation.FIDELITY_GAME).
+
+    The tracker records service games, tiebreaks and games per set but no points (there are none).
+    Observers get the match, set and game events but no serve/shot/point events. Like simulate_match,
+    it plays on a fresh MatchContext and returns the winning Player.
+    """
+    cache = point_cache.DEFAULT_CACHE if cache is None else cache
+    context = MatchContext(player1, player2, params)
+    player1, player2 = context.player1, context.player2
+    tracker = StatsTracker(player1, player2)
+    server_index = 0
+    sets_to_win = (num_sets // 2) + 1
+    if observer is not None:
+        observer.on_match_start(player1, player2)
+    while player1.sets_won < sets_to_win and player2.sets_won < sets_to_win:
+        _play_set(player1, player2, server_index, tracker, rng, cache, observer, params)
+        server_index = 1 - server_index
+    match_winner = player1 if player1.sets_won == sets_to_win else player2
+    if observer is not None:
+        observer.on_match(player1, player2, match_winner)
+    return match_winner.player, tracker
+
+
+# ----------------------------------------------------------------------
+# Validation Mode: set-score distributions at point vs. game fidelity
+# ----------------------------------------------------------------------
+
+def _chi_square_p_value(statistic: float, dof: int) -> float:
+    """Upper tail of the chi-square distribution (Wilson-Hilferty approximation)."""
+    if dof <= 0:
+        return 1.0
+    z = ((statistic / dof) ** (1.0 / 3.0) - (1.0 - 2.0 / (9.0 * dof))) / math.sqrt(2.0 / (9.0 * dof))
+    return 0.5 * math.erfc(z / math.sqrt(2.0))
+
+
+def compare_score_counts(a: Counter, b: Counter) -> tuple[float, int, float]:
+    """Chi-square test that two samples of scores share a distribution: (statistic, dof, p-value).
+
+    Scores seen fewer than 10 times across both samples are pooled into one category.
+    """
+    n_a, n_b = sum(a.values()), sum(b.values())
+    rare = [score for score in set(a) | set(b) if a[score] + b[score] < 10]
+    a, b = Counter(a), Counter(b)
+    for counts in (a, b):
+        counts['rare'] = sum(counts.pop(score, 0) for score in rare)
+    statistic, categories = 0.0, 0
+    for score in set(a) | set(b):
+        total = a[score] + b[score]
+        if total == 0:
+            continue
+        for observed, n in ((a[score], n_a), (b[score], n_b)):
+            expected = total * n / (n_a + n_b)
+            statistic += (observed - expected) ** 2 / expected
+        categories += 1
+    dof = categories - 1
+    return statistic, dof, _chi_square_p_value(statistic, dof)
+
+
+def _score_counts(p1: Player, p2: Player, matches: int, fidelity: str) -> tuple[Counter, Counter, float]:
+    """(final set scores, games-per-set counts, seconds) for `matches` fresh matches."""
+    scores, set_scores = Counter(), Counter()
+    start = time.time()
+    for _ in range(matches):
+        winner, tracker = simulation.simulate_match(p1, p2, num_sets=NUM_SETS, verbose=False, fidelity=fidelity)
+        scores[(tracker.p1.sets_won, tracker.p2.sets_won)] += 1
+        set_scores.update(tracker.games_per_set)
+    return scores, set_scores, time.time() - start
+
+
+def main():
+    """Compares game-fidelity matches with point-by-point ones on random pairings from players.csv."""
+    import roster_loader
+
+    all_players = roster_loader.load_players(win_probability.PLAYER_DATA_FILE).players
+    if len(all_players) < 2:
+        return
+
+    print("=======================================================")
+    print(f"|  VALIDATING GAME FIDELITY ({VALIDATION_MATCHES} MATCHES PER PAIRING)  |")
+    print("=======================================================")
+    total_point_time = total_game_time = 0.0
+    for _ in range(VALIDATION_PAIRINGS):
+        p1, p2 = random.sample(all_players, 2)
+        point_scores, point_sets, point_time = _score_counts(p1, p2, VALIDATION_MATCHES, simulation.FIDELITY_POINT)
+        game_scores, game_sets, game_time = _score_counts(p1, p2, VALIDATION_MATCHES, simulation.FIDELITY_GAME)
+        total_point_time += point_time
+        total_game_time += game_time
+
+        _, _, score_p = compare_score_counts(point_scores, game_scores)
+        _, _, games_p = compare_score_counts(point_sets, game_sets)
+        point_win = sum(n for (a, b), n in point_scores.items() if a > b) / VALIDATION_MATCHES
+        game_win = sum(n for (a, b), n in game_scores.items() if a > b) / VALIDATION_MATCHES
+        print(f"- {p1.name} ({p1.overall}) vs. {p2.name} ({p2.overall})")
+        print(f"    P1 win: point {point_win:.3f} | game {game_win:.3f} | "
+              f"set-score chi2 p = {score_p:.2f} | games-per-set chi2 p = {games_p:.2f} | "
+              f"{point_time / game_time:.1f}x faster")
+    print(f"\nOverall speedup: {total_point_time / total_game_time:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,9 @@
-import csv
 import random
 import os
 from datetime import date, timedelta
 from collections import defaultdict
 
-from players import Player
+import roster_loader
 from stats_tracker import StatsTracker
 from configs.tournaments_m_db import MENS_PRO_TOUR_DB
 from configs.tournaments_challenger_db import MENS_CHALLENGER_TOUR_DB
@@ -25,7 +24,10 @@ class GameSession:
         self.start_date = actual_start_monday
         self.current_date = actual_start_monday
 
-        self.all_players = self._load_all_players(player_data_file)
+        # A pool of its own: a career changes its players, which mustn't leak into the shared pool
+        player_pool = roster_loader.load_players(player_data_file, shared=False)
+        self.roster = player_pool.roster
+        self.all_players = player_pool.players
         print(f"Loaded {len(self.all_players)} players into the game world.")
 
         self.human_player = None
@@ -38,24 +40,6 @@ class GameSession:
         self.year_schedule = self.generate_annual_schedule(self.start_date.year)
         print(f"Generated schedule for {self.start_date.year}.")
 
-    def _load_all_players(self, filename: str) -> list[Player]:
-        """Loads a flat list of all Player objects from the specified CSV file."""
-        players = []
-        try:
-            with open(filename, 'r', newline='', encoding='utf-8') as csvfile:
-                reader = csv.DictReader(csvfile)
-                for row in reader:
-                    players.append(Player(
-                        player_id=int(row['player_id']),
-                        name=f"{row['first_name']} {row['last_name']}", country=row['country'],
-                        birth_date=row['birth_date'], sab=row['sab'],
-                        sp=int(row['sp']), sa=int(row['sa']), gs=int(row['gs']),
-                        ref=int(row['ref']), sta=int(row['sta']), strg=int(row['strg']), clt=int(row['clt'])
-                    ))
-        except FileNotFoundError:
-            print(f"Error: Player data file not found at '{filename}'.")
-        return players
-
     def _generate_generic_futures(self, week: int, country: str) -> dict:
         """Helper to create a single generic Futures tournament."""
         level = random.choice([15, 25])
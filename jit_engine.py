@@ -0,0 +1,361 @@
+# jit_engine.py
+import hashlib
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+import simulation
+from players import Player
+from configs.simulation_config import (
+    VARIANCE_SIGMA_POINT, VARIANCE_SIGMA_FAULT, ACE_CEILING_FACTOR,
+    POWER_PENALTY_RATE, POWER_THRESHOLD, DOUBLE_FAULT_TIERS,
+    CLUTCH_MODIFIER_RATE, MIN_DF_RATE, FSSR_BASELINE_FLOOR, FSSR_SA_WEIGHT,
+    MIN_DEF_FLOOR, WEIGHTING_SERVE_SP, WEIGHTING_SERVE_SA,
+    WEIGHTING_RALLY_GS_OFFENSE, WEIGHTING_STR_OFFENSE,
+    WEIGHTING_RALLY_GS_DEFENSE, WEIGHTING_REF_DEFENSE,
+    RALLY_SUCCESS_THRESHOLD, SHOT_QUALITY_CEILING, MAX_RALLY_LENGTH,
+    RALLY_FATIGUE_SCALAR, RALLY_FATIGUE_DIVISOR, MATCH_STAMINA_SCALAR
+)
+
+# Every config constant compiled into the kernel
+_KERNEL_CONSTANTS = (
+    VARIANCE_SIGMA_POINT, VARIANCE_SIGMA_FAULT, ACE_CEILING_FACTOR, POWER_PENALTY_RATE, POWER_THRESHOLD,
+    DOUBLE_FAULT_TIERS, CLUTCH_MODIFIER_RATE, MIN_DF_RATE, FSSR_BASELINE_FLOOR, FSSR_SA_WEIGHT, MIN_DEF_FLOOR,
+    WEIGHTING_SERVE_SP, WEIGHTING_SERVE_SA, WEIGHTING_RALLY_GS_OFFENSE, WEIGHTING_STR_OFFENSE,
+    WEIGHTING_RALLY_GS_DEFENSE, WEIGHTING_REF_DEFENSE, RALLY_SUCCESS_THRESHOLD, SHOT_QUALITY_CEILING,
+    MAX_RALLY_LENGTH, RALLY_FATIGUE_SCALAR, RALLY_FATIGUE_DIVISOR, MATCH_STAMINA_SCALAR,
+)
+
+# Numba's on-disk cache only notices edits to this file, so the kernels are cached in a directory named
+# after a hash of the constants: after a config change they recompile instead of loading the old
+# constants. NUMBA_CACHE_DIR is read when numba is imported; if something imported it first, the
+# kernels aren't cached at all.
+_KERNEL_CACHE_NAME = f"jit_engine_{hashlib.sha256(repr(_KERNEL_CONSTANTS).encode()).hexdigest()[:16]}"
+_kernel_cache_dir = os.environ.get('NUMBA_CACHE_DIR') or os.path.join(os.path.dirname(__file__), "__pycache__")
+if os.path.basename(_kernel_cache_dir) != _KERNEL_CACHE_NAME:  # Already keyed if inherited from a parent process
+    _kernel_cache_dir = os.path.join(_kernel_cache_dir, _KERNEL_CACHE_NAME)
+_CACHE_KERNELS = 'numba' not in sys.modules
+if _CACHE_KERNELS:
+    os.environ['NUMBA_CACHE_DIR'] = _kernel_cache_dir
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit: the kernel runs as plain Python (used by the equivalence test)."""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+# --- EQUIVALENCE TEST CONFIGURATION (python jit_engine.py) ---
+EQUIVALENCE_PAIRINGS = 5  # Random player pairings compared between the backends
+EQUIVALENCE_MATCHES = 4000  # Matches per pairing and backend
+EQUIVALENCE_SEED = 2024  # Seeds the pairings and both backends, so a failing run can be rerun as is
+NUM_SETS = 3
+# --- END CONFIGURATION ---
+
+# Backends accepted by simulate_player_matches
+BACKEND_PYTHON = "python"  # simulation.simulate_match_result, one match at a time
+BACKEND_NUMBA = "numba"  # The compiled kernel below; falls back to BACKEND_PYTHON without Numba
+BACKEND_AUTO = "auto"  # BACKEND_NUMBA when Numba is installed
+
+_DF_THRESHOLDS = np.array(list(DOUBLE_FAULT_TIERS.keys()), dtype=np.float64)
+_DF_RATES = np.array(list(DOUBLE_FAULT_TIERS.values()), dtype=np.float64)
+
+
+# ----------------------------------------------------------------------
+# Kernel: simulation.simulate_match_result on primitive skill arrays
+# ----------------------------------------------------------------------
+# A player is a float64 row in roster.SKILL_COLUMNS order (batch_engine.skill_matrix). The formulas
+# are PlayerProfile's and _play_point's, in the same order of draws, but Numba's generator replaces
+# `random`, so the backends agree in distribution rather than match by match. Numba freezes the
+# config constants when the kernel compiles, so config edits need a fresh process (which recompiles
+# rather than loading a stale cached kernel, see _KERNEL_CACHE_NAME).
+
+@njit(cache=_CACHE_KERNELS)
+def _effective(base, fatigue, stamina):
+    """Player.get_skill for a fatigue-affected skill."""
+    penalty = min(0.4, fatigue / (stamina * MATCH_STAMINA_SCALAR))
+    return max(1.0, base * (1.0 - penalty))
+
+
+@njit(cache=_CACHE_KERNELS)
+def _df_rate(skills):
+    """PlayerProfile.df_rate."""
+    max_df_rate = 100.0
+    for i in range(_DF_THRESHOLDS.shape[0]):
+        if skills[1] <= _DF_THRESHOLDS[i]:
+            max_df_rate = _DF_RATES[i]
+            break
+    clutch_modifier = (skills[6] - 50) * CLUTCH_MODIFIER_RATE
+    return max(MIN_DF_RATE, min(99.0, max_df_rate - clutch_modifier))
+
+
+@njit(cache=_CACHE_KERNELS)
+def _level(skills, fatigue):
+    """PlayerProfile.at(fatigue): (fault_chance, ace_attack, ace_defense, serve_quality, offense, defense)."""
+    stamina = skills[4]
+    sp = _effective(skills[0], fatigue, stamina)
+    sa = skills[1]
+    gs = _effective(skills[2], fatigue, stamina)
+    ref = _effective(skills[3], fatigue, stamina)
+    fault_chance = max(1.0, min(99.0, FSSR_BASELINE_FLOOR + sa * FSSR_SA_WEIGHT - (sp - POWER_THRESHOLD) *
+                                POWER_PENALTY_RATE))
+    ace_attack = ((sp + sa) / 200.0) ** 2 * 100
+    ace_defense = max(MIN_DEF_FLOOR, (100.0 - ref) / 100.0)
+    serve_quality = sp * WEIGHTING_SERVE_SP + sa * WEIGHTING_SERVE_SA
+    offense = gs * WEIGHTING_RALLY_GS_OFFENSE + skills[5] * WEIGHTING_STR_OFFENSE
+    defense = gs * WEIGHTING_RALLY_GS_DEFENSE + ref * WEIGHTING_REF_DEFENSE
+    return fault_chance, ace_attack, ace_defense, serve_quality, offense, defense
+
+
+@njit(cache=_CACHE_KERNELS)
+def _clip_quality(quality):
+    return max(1.0, min(SHOT_QUALITY_CEILING, quality))
+
+
+@njit(cache=_CACHE_KERNELS)
+def _play_point(srv_skills, srv_df, srv_penalty, rcv_skills, rcv_penalty, fatigue):
+    """simulation._play_point for two players at the same fatigue: returns (server won, rally length)."""
+    srv = _level(srv_skills, fatigue)
+    rcv = _level(rcv_skills, fatigue)
+    ace_chance = srv[1] * rcv[2] * ACE_CEILING_FACTOR
+
+    if np.random.random() * 100 < max(0.001, ace_chance):
+        return True, 0
+    fault_chance = max(0.0, min(100.0, np.random.normal(srv[0], VARIANCE_SIGMA_FAULT)))
+    if not np.random.random() * 100 > fault_chance:  # simulation._serve_fault's inverted check
+        if np.random.random() * 100 < srv_df:
+            return False, 0
+        if np.random.random() * 100 < max(0.001, ace_chance / 5.0):
+            return True, 0
+        quality = _clip_quality(np.random.normal(srv[3] * 0.80, VARIANCE_SIGMA_POINT))
+    else:
+        quality = _clip_quality(np.random.normal(srv[3], VARIANCE_SIGMA_POINT))
+
+    server_returns = True  # As in _play_point, shot 1 is returned by the server
+    rally_length = 0
+    while True:
+        rally_length += 1
+        defense = srv[5] if server_returns else rcv[5]
+        success_chance = max(0.01, min(0.99, RALLY_SUCCESS_THRESHOLD - (quality - defense) / SHOT_QUALITY_CEILING))
+        if not np.random.random() < success_chance:
+            return not server_returns, rally_length
+        if server_returns:
+            offense, penalty = srv[4], srv_penalty
+        else:
+            offense, penalty = rcv[4], rcv_penalty
+        quality = _clip_quality(np.random.normal(offense * (1.0 - min(0.3, rally_length * penalty)),
+                                                 VARIANCE_SIGMA_POINT))
+        if rally_length >= MAX_RALLY_LENGTH:
+            return server_returns, rally_length
+        server_returns = not server_returns
+
+
+@njit(cache=_CACHE_KERNELS)
+def _play_game(srv_skills, srv_df, srv_penalty, rcv_skills, rcv_penalty, shots):
+    """simulation._fast_game: returns (server held, shots after the game)."""
+    server_points, receiver_points = 0, 0
+    while True:
+        server_won, rally_length = _play_point(srv_skills, srv_df, srv_penalty, rcv_skills, rcv_penalty, shots)
+        shots += rally_length
+        if server_won:
+            server_points += 1
+            if server_points >= 4 and server_points >= receiver_points + 2:
+                return True, shots
+        else:
+            receiver_points += 1
+            if receiver_points >= 4 and receiver_points >= server_points + 2:
+                return False, shots
+
+
+@njit(cache=_CACHE_KERNELS)
+def _play_tiebreak(s1, df1, pen1, s2, df2, pen2, initial_server_index, shots):
+    """simulation._fast_tiebreak: returns (player1 won, shots after the tiebreak)."""
+    p1_points, p2_points = 0, 0
+    point_num = 1
+    total_rally_length = 0
+    while True:
+        if point_num == 1 or (point_num - 2) % 4 >= 2:
+            p1_serves = initial_server_index == 0
+        else:
+            p1_serves = initial_server_index != 0
+        if p1_serves:
+            server_won, rally_length = _play_point(s1, df1, pen1, s2, pen2, shots)
+            p1_won_point = server_won
+        else:
+            server_won, rally_length = _play_point(s2, df2, pen2, s1, pen1, shots)
+            p1_won_point = not server_won
+        total_rally_length += rally_length
+        if p1_won_point:
+            p1_points += 1
+        else:
+            p2_points += 1
+        if (p1_points >= 7 and p1_points >= p2_points + 2) or (p2_points >= 7 and p2_points >= p1_points + 2):
+            return p1_points > p2_points, shots + total_rally_length
+        point_num += 1
+
+
+@njit(cache=_CACHE_KERNELS)
+def _play_match(s1, s2, num_sets):
+    """simulation.simulate_match_result from zero fatigue: returns (player1 sets, player2 sets)."""
+    df1, df2 = _df_rate(s1), _df_rate(s2)
+    pen1 = (RALLY_FATIGUE_SCALAR - s1[4]) / RALLY_FATIGUE_DIVISOR
+    pen2 = (RALLY_FATIGUE_SCALAR - s2[4]) / RALLY_FATIGUE_DIVISOR
+    shots = 0
+    p1_sets, p2_sets = 0, 0
+    server_index = 0
+    sets_to_win = (num_sets // 2) + 1
+    while p1_sets < sets_to_win and p2_sets < sets_to_win:
+        p1_games, p2_games = 0, 0
+        game_server = server_index
+        while True:
+            if (p1_games >= 6 and p1_games >= p2_games + 2) or (p2_games >= 6 and p2_games >= p1_games + 2):
+                break
+            if p1_games == 6 and p2_games == 6:
+                p1_won, shots = _play_tiebreak(s1, df1, pen1, s2, df2, pen2, game_server, shots)
+                if p1_won:
+                    p1_games += 1
+                else:
+                    p2_games += 1
+                break
+            if game_server == 0:
+                held, shots = _play_game(s1, df1, pen1, s2, pen2, shots)
+                p1_won = held
+            else:
+                held, shots = _play_game(s2, df2, pen2, s1, pen1, shots)
+                p1_won = not held
+            if p1_won:
+                p1_games += 1
+            else:
+                p2_games += 1
+            game_server = 1 - game_server
+        if p1_games > p2_games:
+            p1_sets += 1
+        else:
+            p2_sets += 1
+        server_index = 1 - server_index
+    return p1_sets, p2_sets
+
+
+@njit(cache=_CACHE_KERNELS)
+def _play_matches(skills1, skills2, num_sets, seed, sets_won):
+    """Plays match i between rows skills1[i] and skills2[i], writing the set score to sets_won[i]."""
+    np.random.seed(seed)
+    for i in range(skills1.shape[0]):
+        sets_won[i, 0], sets_won[i, 1] = _play_match(skills1[i], skills2[i], num_sets)
+
+
+# ----------------------------------------------------------------------
+# Backend Selection
+# ----------------------------------------------------------------------
+
+def resolve_backend(backend: str = BACKEND_AUTO) -> str:
+    """The backend that will actually run: BACKEND_NUMBA or BACKEND_PYTHON."""
+    if backend not in (BACKEND_PYTHON, BACKEND_NUMBA, BACKEND_AUTO):
+        raise ValueError(f"Unknown backend '{backend}'")
+    if backend == BACKEND_PYTHON or not NUMBA_AVAILABLE:
+        return BACKEND_PYTHON
+    return BACKEND_NUMBA
+
+
+def _skill_rows(players: list[Player]) -> np.ndarray:
+    # Same layout as batch_engine.skill_matrix, kept local so this module doesn't pull in batch_engine
+    return np.array([[p.serve_power, p.serve_accuracy, p.groundstroke, p.reflex, p.stamina, p.strength, p.clutch]
+                     for p in players], dtype=np.float64)
+
+
+def simulate_player_matches(players1: list[Player], players2: list[Player], num_sets: int = 3, seed: int = None,
+                            backend: str = BACKEND_AUTO) -> tuple[np.ndarray, np.ndarray]:
+    """Plays match i between players1[i] and players2[i], each from zero fatigue.
+
+    Returns (winner, sets_won): winner[i] is 0 if players1[i] won and 1 otherwise; sets_won has shape
+    (n, 2). The seed defaults to a draw from `random`, so seeding `random` makes either backend
+    reproducible.
+    """
+    n = len(players1)
+    seed = random.getrandbits(32) if seed is None else seed
+    sets_won = np.zeros((n, 2), dtype=np.int16)
+    if resolve_backend(backend) == BACKEND_NUMBA:
+        _play_matches(_skill_rows(players1), _skill_rows(players2), num_sets, seed, sets_won)
+    else:
+        rng = random.Random(seed)
+        for i, (p1, p2) in enumerate(zip(players1, players2)):
+            _, sets_won[i] = simulation.simulate_match_result(p1, p2, num_sets=num_sets, rng=rng)
+    return (sets_won[:, 1] > sets_won[:, 0]).astype(np.int8), sets_won
+
+
+# ----------------------------------------------------------------------
+# Equivalence Test: set-score distributions of the two backends
+# ----------------------------------------------------------------------
+
+def _score_counts(p1: Player, p2: Player, matches: int, kernel: bool) -> tuple[Counter, float]:
+    """(set-score counts, seconds) of `matches` matches on the kernel (compiled or not) or the Python backend."""
+    start = time.perf_counter()
+    if kernel:
+        sets_won = np.zeros((matches, 2), dtype=np.int16)
+        _play_matches(_skill_rows([p1] * matches), _skill_rows([p2] * matches), NUM_SETS,
+                      random.getrandbits(32), sets_won)
+    else:
+        _, sets_won = simulate_player_matches([p1] * matches, [p2] * matches, num_sets=NUM_SETS,
+                                              backend=BACKEND_PYTHON)
+    return Counter(map(tuple, sets_won.tolist())), time.perf_counter() - start
+
+
+def main():
+    """Chi-square tests that the kernel and simulate_match_result give the same set-score distribution.
+
+    Without Numba the kernel itself runs as plain Python, so the test still checks its logic.
+    Exits with status 1 when the distributions differ.
+    """
+    import roster_loader
+    import win_probability
+    from fast_forward import compare_score_counts
+
+    all_players = roster_loader.load_players(win_probability.PLAYER_DATA_FILE).players
+    if len(all_players) < 2:
+        return
+
+    print("=======================================================")
+    print(f"|  BACKEND EQUIVALENCE ({EQUIVALENCE_MATCHES} MATCHES PER PAIRING)  |")
+    print("=======================================================")
+    print(f"Numba {'available' if NUMBA_AVAILABLE else 'not installed: testing the uncompiled kernel'}\n")
+    if NUMBA_AVAILABLE:
+        _play_matches(_skill_rows(all_players[:1]), _skill_rows(all_players[1:2]), NUM_SETS, 0,
+                      np.zeros((1, 2), dtype=np.int16))  # Compile outside the timings
+
+    random.seed(EQUIVALENCE_SEED)
+    total_python = total_kernel = 0.0
+    p_values = []
+    for _ in range(EQUIVALENCE_PAIRINGS):
+        p1, p2 = random.sample(all_players, 2)
+        python_scores, python_time = _score_counts(p1, p2, EQUIVALENCE_MATCHES, kernel=False)
+        kernel_scores, kernel_time = _score_counts(p1, p2, EQUIVALENCE_MATCHES, kernel=True)
+        total_python += python_time
+        total_kernel += kernel_time
+
+        _, _, p_value = compare_score_counts(python_scores, kernel_scores)
+        p_values.append(p_value)
+        python_win = sum(n for (a, b), n in python_scores.items() if a > b) / EQUIVALENCE_MATCHES
+        kernel_win = sum(n for (a, b), n in kernel_scores.items() if a > b) / EQUIVALENCE_MATCHES
+        print(f"- {p1.name} ({p1.overall}) vs. {p2.name} ({p2.overall})")
+        print(f"    P1 win: python {python_win:.3f} | kernel {kernel_win:.3f} | set-score chi2 p = {p_value:.2f} | "
+              f"{python_time / kernel_time:.1f}x faster")
+
+    # Bonferroni: each pairing is tested at 1% / pairings so one unlucky pairing doesn't fail the run
+    passed = min(p_values) >= 0.01 / len(p_values)
+    print(f"\nOverall speedup: {total_python / total_kernel:.1f}x | "
+          f"{'EQUIVALENT' if passed else 'DISTRIBUTIONS DIFFER'} (min p = {min(p_values):.3f})")
+    if not passed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
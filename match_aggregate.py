@@ -0,0 +1,217 @@
+# match_aggregate.py
+import math
+
+import numpy as np
+
+import stats_tracker
+from configs.simulation_config import MAX_RALLY_LENGTH
+from stats_tracker import StatsTracker
+
+# Per-side counters of a MatchAggregate (side 0 is the pairing's first tier, side 1 the second)
+SIDE_COUNTERS = ('wins', 'service_games_played', 'service_games_won', 'first_serves_in', 'first_serve_won',
+                 'second_serves_faced', 'second_serve_won')
+_SIDE_INDEX = {name: i for i, name in enumerate(SIDE_COUNTERS)}
+
+
+class RunningStats:
+    """Count, mean and variance of a stream of values (Welford), mergeable with Chan et al.'s update."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared deviations from the mean
+
+    def add(self, x: float):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def add_many(self, values: np.ndarray):
+        """Folds in an array of values at once (a batch's moments, merged)."""
+        if len(values) == 0:
+            return
+        batch = RunningStats()
+        batch.n = len(values)
+        batch.mean = float(np.mean(values))
+        batch.m2 = float(np.sum((values - batch.mean) ** 2))
+        self.merge(batch)
+
+    def merge(self, other: 'RunningStats'):
+        if other.n == 0:
+            return
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.n = n
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (0 with fewer than two values)."""
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class MatchAggregate:
+    """Running totals for one tier pairing, whatever the number of matches.
+
+    Absorbs StatsTrackers (add_tracker, O(1) per match) or batch_engine results (add_batch), and
+    merge() combines aggregates from workers, chunks or resumed runs: counts, histograms and maxima
+    combine exactly, means and variances by Chan et al.'s formula. Memory is a few fixed-size lists;
+    match_length_histogram only grows to the longest match seen.
+    """
+
+    def __init__(self):
+        self.matches = 0
+        self.sides = [[0] * len(SIDE_COUNTERS), [0] * len(SIDE_COUNTERS)]
+        self.total_points = 0
+        self.aces = 0
+        self.double_faults = 0
+        self.serves_attempted = 0
+        self.first_serve_faults = 0
+        self.tiebreaks = 0
+        self.total_sets = 0
+        self.total_games = 0
+        self.total_rallies = 0
+        self.sum_rally_lengths = 0
+        self.longest_rally = 0
+        self.rally_histogram = [0] * (MAX_RALLY_LENGTH + 1)
+        self.match_length_histogram = []  # Matches by points played
+        self.match_points = RunningStats()
+        self.match_games = RunningStats()
+
+    def side(self, counter: str, side: int) -> int:
+        return self.sides[side][_SIDE_INDEX[counter]]
+
+    def add_tracker(self, tracker: StatsTracker, p1_won: bool):
+        """Folds in one finished match; tracker player1 is side 0."""
+        c = tracker.counts
+        self.matches += 1
+        self.sides[0 if p1_won else 1][0] += 1
+        for i, side in enumerate(self.sides):
+            side[1] += c[stats_tracker.SERVICE_GAMES_PLAYED + i]
+            side[2] += c[stats_tracker.SERVICE_GAMES_WON + i]
+            side[3] += tracker.first_serves_in(i)
+            side[4] += c[stats_tracker.FIRST_SERVE_POINTS_WON + i]
+            side[5] += c[stats_tracker.SECOND_SERVE_POINTS_FACED + i]
+            side[6] += c[stats_tracker.SECOND_SERVE_POINTS_WON + i]
+
+        points = tracker.total_points
+        games = sum(tracker.games_per_set)
+        self.total_points += points
+        self.aces += c[stats_tracker.ACES]
+        self.double_faults += c[stats_tracker.DOUBLE_FAULTS]
+        self.serves_attempted += c[stats_tracker.SERVES_ATTEMPTED] + c[stats_tracker.SERVES_ATTEMPTED + 1]
+        self.first_serve_faults += c[stats_tracker.FIRST_SERVE_FAULTS] + c[stats_tracker.FIRST_SERVE_FAULTS + 1]
+        self.tiebreaks += tracker.tiebreaks_played
+        self.total_sets += len(tracker.games_per_set)
+        self.total_games += games
+        self.total_rallies += tracker.total_rallies
+        self.sum_rally_lengths += tracker.sum_rally_lengths
+        self.longest_rally = max(self.longest_rally, tracker.longest_rally)
+        for length, count in enumerate(tracker.rally_histogram):
+            self.rally_histogram[length] += count
+        self._count_match_length(points, 1)
+        self.match_points.add(points)
+        self.match_games.add(games)
+
+    def add_batch(self, res):
+        """Folds in every match of a batch_engine.BatchResult; res player1 is side 0."""
+        self.matches += res.n_matches
+        p2_wins = int(res.winner.sum())
+        self.sides[0][0] += res.n_matches - p2_wins
+        self.sides[1][0] += p2_wins
+        for i, side in enumerate(self.sides):
+            side[1] += int(res.service_games_played[:, i].sum())
+            side[2] += int(res.service_games_won[:, i].sum())
+            side[3] += int((res.serves_attempted[:, i] - res.first_serve_faults[:, i]).sum())
+            side[4] += int(res.first_serve_points_won[:, i].sum())
+            side[5] += int(res.second_serve_points_faced[:, i].sum())
+            side[6] += int(res.second_serve_points_won[:, i].sum())
+
+        self.total_points += int(res.total_points.sum())
+        self.aces += int(res.aces.sum())
+        self.double_faults += int(res.double_faults.sum())
+        self.serves_attempted += int(res.serves_attempted.sum())
+        self.first_serve_faults += int(res.first_serve_faults.sum())
+        self.tiebreaks += int(res.tiebreaks_played.sum())
+        self.total_sets += int(res.sets_played.sum())
+        self.total_games += int(res.total_games.sum())
+        self.total_rallies += int(res.total_rallies.sum())
+        self.sum_rally_lengths += int(res.sum_rally_lengths.sum())
+        self.longest_rally = max(self.longest_rally, int(res.longest_rally.max()))
+        for length, count in enumerate(res.rally_histogram.tolist()):
+            self.rally_histogram[length] += count
+        for points, count in enumerate(np.bincount(res.total_points).tolist()):
+            if count:
+                self._count_match_length(points, count)
+        self.match_points.add_many(res.total_points)
+        self.match_games.add_many(res.total_games)
+
+    def merge(self, other: 'MatchAggregate'):
+        """Adds another aggregate of the same pairing into this one."""
+        self.matches += other.matches
+        for side, other_side in zip(self.sides, other.sides):
+            for i, value in enumerate(other_side):
+                side[i] += value
+        for name in ('total_points', 'aces', 'double_faults', 'serves_attempted', 'first_serve_faults', 'tiebreaks',
+                     'total_sets', 'total_games', 'total_rallies', 'sum_rally_lengths'):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.longest_rally = max(self.longest_rally, other.longest_rally)
+        for length, count in enumerate(other.rally_histogram):
+            self.rally_histogram[length] += count
+        for points, count in enumerate(other.match_length_histogram):
+            if count:
+                self._count_match_length(points, count)
+        self.match_points.merge(other.match_points)
+        self.match_games.merge(other.match_games)
+
+    def _count_match_length(self, points: int, count: int):
+        histogram = self.match_length_histogram
+        if points >= len(histogram):
+            histogram.extend([0] * (points + 1 - len(histogram)))
+        histogram[points] += count
+
+    def summary(self, tier1: str, tier2: str) -> dict:
+        """The batch report stats for the pairing (test_batch's summary format).
+
+        In a same-tier pairing both sides report under the one tier name, so their counters are pooled.
+        """
+        by_tier = {}
+        for tier, side in ((tier1, self.sides[0]), (tier2, self.sides[1])):
+            pooled = by_tier.setdefault(tier, [0] * len(SIDE_COUNTERS))
+            for i, value in enumerate(side):
+                pooled[i] += value
+
+        def pct(numerator, denominator, digits=1, empty="N/A"):
+            return f"{numerator / denominator * 100:.{digits}f}%" if denominator > 0 else empty
+
+        def tier_stat(tier, counter):
+            return by_tier[tier][_SIDE_INDEX[counter]]
+
+        matches = self.matches
+        stats = {
+            "Matchup": f"{tier1} vs. {tier2}",
+            f"{tier1} Win %": pct(tier_stat(tier1, 'wins'), matches),
+            f"{tier2} Win %": pct(tier_stat(tier2, 'wins'), matches),
+            "1st Serve In %": pct(self.serves_attempted - self.first_serve_faults, self.serves_attempted),
+            "Ace % (of all points)": pct(self.aces, self.total_points, 2),
+            "Double Fault % (of all points)": pct(self.double_faults, self.total_points, 2),
+            "Avg Match Duration (Points)": f"{self.total_points / matches:.1f}",
+            "Match Duration SD (Points)": f"{self.match_points.std:.1f}",
+            "Avg Games / Set": f"{self.total_games / self.total_sets:.2f}" if self.total_sets > 0 else "0",
+            "Avg Rally Length": f"{self.sum_rally_lengths / self.total_rallies:.2f}" if self.total_rallies > 0
+            else "0",
+            "Longest Rally (in any match)": self.longest_rally,
+            "Tiebreak %": pct(self.tiebreaks, self.total_sets, empty="0.0%"),
+        }
+        for label, won, played in (("Hold %", 'service_games_won', 'service_games_played'),
+                                   ("1st Srv Win %", 'first_serve_won', 'first_serves_in'),
+                                   ("2nd Srv Win %", 'second_serve_won', 'second_serves_faced')):
+            stats[f"{tier1} {label}"] = pct(tier_stat(tier1, won), tier_stat(tier1, played))
+            stats[f"{tier2} {label}"] = pct(tier_stat(tier2, won), tier_stat(tier2, played))
+        return stats
@@ -0,0 +1,55 @@
+# match_context.py
+from players import Player
+from sim_params import SimParams, DEFAULT_PARAMS
+
+
+class MatchPlayer:
+    """One side of a match in progress: the player's read-only rating plus what the match changes.
+
+    The simulate_* functions, point models, observers and StatsTracker all see MatchPlayers; anything
+    not held here (name, id, skills, ...) is read from `player`. `profile` is the player's PlayerProfile
+    under the match's SimParams.
+    """
+
+    __slots__ = ('player', 'profile', 'fatigue', 'games_won', 'sets_won')
+
+    def __init__(self, player: Player, params: SimParams = DEFAULT_PARAMS):
+        self.player = player
+        self.profile = player.profile_for(params)
+        self.fatigue = 0.0
+        self.games_won = 0
+        self.sets_won = 0
+
+    def __getattr__(self, name):
+        # Only reached for names not in the slots; an unset `player` (mid-unpickling) and dunder lookups
+        # such as __setstate__ must fail normally rather than recurse through self.player
+        if name == 'player' or name.startswith('__'):
+            raise AttributeError(name)
+        return getattr(self.player, name)
+
+    def profile_for(self, params: SimParams):
+        profile = self.profile
+        return profile if profile.params is params else self.player.profile_for(params)
+
+    def get_skill(self, skill_name: str, fatigue: float = None, params: SimParams = DEFAULT_PARAMS) -> float:
+        """Player.get_skill at this side's current fatigue by default."""
+        return self.player.get_skill(skill_name, self.fatigue if fatigue is None else fatigue, params)
+
+    def __str__(self):
+        return str(self.player)
+
+
+class MatchContext:
+    """The mutable state of one match: a MatchPlayer per side and the SimParams it is played under.
+
+    Every match builds its own context, so Player objects are never written to: the same player can
+    be in any number of matches at once (threads included), each match starts rested at 0-0, and
+    nothing needs resetting afterwards. A player drawn against themselves still gets two sides.
+    """
+
+    __slots__ = ('params', 'player1', 'player2')
+
+    def __init__(self, player1: Player, player2: Player, params: SimParams = DEFAULT_PARAMS):
+        self.params = params
+        self.player1 = MatchPlayer(player1, params)
+        self.player2 = MatchPlayer(player2, params)
@@ -0,0 +1,209 @@
+# ovr_matrix.py
+import hashlib
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from tqdm import tqdm
+
+import jit_engine
+import roster_loader
+import win_probability
+from configs import simulation_config
+from players import Player
+from roster import Roster
+
+# --- OVR MATRIX CONFIGURATION ---
+OVR_MIN = 1
+OVR_MAX = 99
+PLAYER_SOURCE = "synthetic"  # "synthetic": one player per OVR with every skill at that OVR; "roster": players.csv
+PLAYER_DATA_FILE = roster_loader.PLAYER_DATA_FILE
+SIMULATIONS_PER_CELL = 2000  # Matches per (row OVR, column OVR) cell
+NUM_SETS = 3
+ENGINE = "jit"  # "jit" (jit_engine; Numba when installed) or "analytic" (win_probability; exact, no sampling)
+JIT_BACKEND = "auto"
+WORKERS = os.cpu_count() or 1
+CELLS_PER_TASK = 50  # Cells handed to a worker at a time
+SAVE_EVERY = 500  # Newly computed cells between cache saves, so an interrupted run keeps its progress
+
+CACHE_FILE = os.path.join("sim_stats", "ovr_matrix_cache.json")
+OUTPUT_FOLDER = "sim_stats"
+# Bump when a change to the simulation code (rather than to simulation_config) alters results,
+# so every cached cell is recomputed.
+CACHE_VERSION = 1
+# --- END CONFIGURATION ---
+
+
+# ----------------------------------------------------------------------
+# Cache keys
+# ----------------------------------------------------------------------
+
+def config_constants() -> dict:
+    """The current configs.simulation_config constants (every upper-case module attribute)."""
+    return {name: getattr(simulation_config, name) for name in sorted(dir(simulation_config)) if name.isupper()}
+
+
+def _digest(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=repr).encode()).hexdigest()
+
+
+def run_fingerprint() -> str:
+    """Hash of everything besides the players that decides a cell's value: the simulation config,
+    NUM_SETS, the sample size, the engine and CACHE_VERSION."""
+    sample_size = SIMULATIONS_PER_CELL if ENGINE == "jit" else 0
+    return _digest([CACHE_VERSION, ENGINE, NUM_SETS, sample_size, config_constants()])
+
+
+def cell_key(fingerprint: str, skills1: list, skills2: list) -> str:
+    """Cache key of a cell: the run fingerprint plus the skill vectors of both OVRs' players."""
+    return _digest([fingerprint, skills1, skills2])[:32]
+
+
+def skill_vector(player: Player) -> list[int]:
+    return [player.serve_power, player.serve_accuracy, player.groundstroke, player.reflex, player.stamina,
+            player.strength, player.clutch]
+
+
+def load_cache(filename: str = CACHE_FILE) -> dict:
+    """{cell key: base win rate} of every cell computed so far, under any config."""
+    try:
+        with open(filename) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_cache(cache: dict, filename: str = CACHE_FILE):
+    """Writes the cache through a temporary file, so an interrupted save can't corrupt it."""
+    os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+    with open(filename + ".tmp", 'w') as f:
+        json.dump(cache, f)
+    os.replace(filename + ".tmp", filename)
+
+
+# ----------------------------------------------------------------------
+# Cells
+# ----------------------------------------------------------------------
+
+def players_by_ovr() -> dict:
+    """OVR -> skill vectors of the players at that OVR, for OVR_MIN..OVR_MAX (OVRs with no players are left out)."""
+    if PLAYER_SOURCE == "synthetic":
+        return {ovr: [[ovr] * 7] for ovr in range(OVR_MIN, OVR_MAX + 1)}
+    by_ovr = roster_loader.load_players(PLAYER_DATA_FILE).by_ovr
+    return {ovr: sorted(skill_vector(player) for player in players)
+            for ovr, players in by_ovr.items() if OVR_MIN <= ovr <= OVR_MAX}
+
+
+def _pairings(count1: int, count2: int, same_ovr: bool, matches: int, rng: random.Random) -> list[tuple[int, int]]:
+    """Random (base, opponent) index pairs, never a player against themselves (test_matrix.pick_pairing)."""
+    pairs = []
+    for _ in range(matches):
+        i, j = rng.randrange(count1), rng.randrange(count2)
+        while same_ovr and count1 > 1 and i == j:
+            j = rng.randrange(count2)
+        pairs.append((i, j))
+    return pairs
+
+
+def compute_cell(key: str, skills1: list, skills2: list, same_ovr: bool) -> float:
+    """The base (row) OVR's win rate against the column OVR. Sampling is seeded from the cell key, so a
+    cell's value depends only on what its key hashes."""
+    roster = Roster(capacity=len(skills1) + len(skills2))  # The cell's players, freed with the cell
+    players1 = [Player(f"Base {i}", *skills, roster=roster) for i, skills in enumerate(skills1)]
+    players2 = [Player(f"Opponent {i}", *skills, roster=roster) for i, skills in enumerate(skills2)]
+    if ENGINE == "analytic":
+        probs = [win_probability.match_win_probability(p1, p2, num_sets=NUM_SETS)['p1_match']
+                 for i, p1 in enumerate(players1) for j, p2 in enumerate(players2)
+                 if not (same_ovr and i == j and len(players1) > 1)]
+        return sum(probs) / len(probs)
+    seed = int(key[:8], 16)
+    pairs = _pairings(len(players1), len(players2), same_ovr, SIMULATIONS_PER_CELL, random.Random(seed))
+    winner, _ = jit_engine.simulate_player_matches([players1[i] for i, _ in pairs], [players2[j] for _, j in pairs],
+                                                   num_sets=NUM_SETS, seed=seed, backend=JIT_BACKEND)
+    return 1.0 - float(winner.mean())
+
+
+def _compute_cells(tasks: list[tuple]) -> list[tuple[str, float]]:
+    """Worker entry point: (key, win rate) per (key, skills1, skills2, same_ovr) task."""
+    return [(key, compute_cell(key, skills1, skills2, same_ovr)) for key, skills1, skills2, same_ovr in tasks]
+
+
+def build_matrix(workers: int = WORKERS, cache_file: str = CACHE_FILE) -> tuple[list[int], np.ndarray, dict]:
+    """Fills the OVR x OVR matrix, computing only the cells the cache doesn't have for the current
+    config and players.
+
+    Returns (ovrs, matrix, counts), where matrix[i, j] is the win rate of ovrs[i] against ovrs[j]
+    (player1, serving first, is the row OVR) and counts is {'cached': n, 'computed': n}.
+    """
+    skills_by_ovr = players_by_ovr()
+    ovrs = list(skills_by_ovr)
+    fingerprint = run_fingerprint()
+    cache = load_cache(cache_file)
+
+    keys = {}
+    missing = []
+    for ovr1 in ovrs:
+        for ovr2 in ovrs:
+            key = keys[ovr1, ovr2] = cell_key(fingerprint, skills_by_ovr[ovr1], skills_by_ovr[ovr2])
+            if key not in cache:
+                missing.append((key, skills_by_ovr[ovr1], skills_by_ovr[ovr2], ovr1 == ovr2))
+
+    if missing:
+        tasks = [missing[i:i + CELLS_PER_TASK] for i in range(0, len(missing), CELLS_PER_TASK)]
+        progress = tqdm(total=len(missing), desc=f"Computing OVR cells ({workers} workers)")
+        unsaved = 0
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for future in as_completed([pool.submit(_compute_cells, task) for task in tasks]):
+                results = future.result()
+                cache.update(results)
+                progress.update(len(results))
+                unsaved += len(results)
+                if unsaved >= SAVE_EVERY:
+                    save_cache(cache, cache_file)
+                    unsaved = 0
+        progress.close()
+        save_cache(cache, cache_file)
+
+    matrix = np.array([[cache[keys[ovr1, ovr2]] for ovr2 in ovrs] for ovr1 in ovrs])
+    return ovrs, matrix, {'cached': len(keys) - len(missing), 'computed': len(missing)}
+
+
+def save_matrix_csv(ovrs: list[int], matrix: np.ndarray, filename: str):
+    """Row OVR, then its win % against every column OVR."""
+    with open(filename, 'w') as f:
+        f.write("ovr," + ",".join(str(ovr) for ovr in ovrs) + "\n")
+        for ovr, row in zip(ovrs, matrix):
+            f.write(f"{ovr}," + ",".join(f"{p * 100:.2f}" for p in row) + "\n")
+
+
+def main():
+    """Builds (or loads from the cache) the full OVR matrix and saves it as a CSV."""
+    print("=======================================================")
+    print(f"|  OVR MATRIX {OVR_MIN}-{OVR_MAX} ({ENGINE}, {PLAYER_SOURCE} players)  |")
+    print("=======================================================")
+    start = time.time()
+    ovrs, matrix, counts = build_matrix()
+    if not ovrs:
+        print("No players in the OVR range.")
+        return
+
+    os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+    output_filename = os.path.join(OUTPUT_FOLDER, f"ovr_matrix_{ENGINE}_{PLAYER_SOURCE}.csv")
+    save_matrix_csv(ovrs, matrix, output_filename)
+    print(f"{len(ovrs) ** 2} cells: {counts['cached']} from the cache, {counts['computed']} computed "
+          f"in {time.time() - start:.1f} seconds")
+
+    # A coarse view: every tenth OVR against every tenth OVR
+    shown = [i for i, ovr in enumerate(ovrs) if ovr % 10 == 0] or list(range(len(ovrs)))
+    print("\nRow OVR win % vs. column OVR:")
+    print("     " + "".join(f"{ovrs[j]:>7}" for j in shown))
+    for i in shown:
+        print(f"{ovrs[i]:>5}" + "".join(f"{matrix[i, j] * 100:>6.1f}%" for j in shown))
+    print(f"\nMatrix saved to '{output_filename}'")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+# parallel_batch.py
+from concurrent.futures import ProcessPoolExecutor
+
+from tqdm import tqdm
+
+import point_store
+import roster_loader
+import test_batch
+from match_aggregate import MatchAggregate
+from rng_streams import StreamFactory
+
+# Matches per task handed to a worker: large enough to amortize the pickling of results,
+# small enough that the pool stays busy until the last matchup.
+SHARD_SIZE = 250
+
+# Per-process state, set up once by _init_worker
+_players_by_tier = None
+_streams = None
+_point_model = None
+_recorder = None
+
+
+def _init_worker(player_data_file: str, root_seed: int, point_model: str, store_points: bool):
+    """Loads the player pool once per worker process."""
+    global _players_by_tier, _streams, _point_model, _recorder
+    _point_model = test_batch.resolve_point_model(point_model)
+    _recorder = point_store.PointRecorder() if store_points else None
+    _players_by_tier = roster_loader.load_players(player_data_file).by_tier
+    _streams = StreamFactory(root_seed)
+
+
+def _run_shard(tier1: str, tier2: str, first_match_id: int, count: int) -> tuple[MatchAggregate, list, int, list]:
+    """Plays matches first_match_id .. first_match_id + count - 1.
+
+    Returns (partial MatchAggregate, CSV rows, the first tier's wins, point data), where point data holds
+    (match_id, p1_id, p2_id, point codes) per match when the workers record points.
+    """
+    aggregate = MatchAggregate()
+    rows = []
+    points = []
+    p1_wins = 0
+    for match_id in range(first_match_id, first_match_id + count):
+        row, p1_obj, p2_obj, winner, tracker = test_batch.play_match(_players_by_tier, tier1, tier2, match_id,
+                                                                     _streams, _point_model, _recorder)
+        rows.append(row)
+        if _recorder is not None:
+            points.append((match_id, p1_obj.id, p2_obj.id, _recorder.codes.tobytes()))
+        aggregate.add_tracker(tracker, winner is p1_obj)
+        p1_wins += winner is p1_obj
+    return aggregate, rows, p1_wins, points
+
+
+def run_matchups(matchups: list, root_seed: int, workers: int, shard_size: int = SHARD_SIZE):
+    """Runs test_batch's "python" engine for every matchup across a process pool.
+
+    Yields (aggregate, rows, estimate, points) per matchup, in order, where estimate is the matchup's
+    test_batch.new_estimate() fed one shard at a time. Every match is played from its own id-derived
+    streams (see test_batch.play_match) and adaptive stopping is checked at the same shard boundaries
+    as the serial chunks, so the output is identical to a serial run with the same root seed,
+    whatever the worker count. Shards past an adaptive stop are cancelled (or discarded if running).
+    """
+    per_matchup = test_batch.SIMULATIONS_PER_MATCHUP
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(test_batch.PLAYER_DATA_FILE, root_seed, test_batch.POINT_MODEL,
+                                       test_batch.STORE_POINTS)) as pool:
+        # Submit everything upfront so workers move straight on to the next matchup
+        futures_by_matchup = []
+        for matchup_index, (tier1, tier2) in enumerate(matchups):
+            first_match_id = matchup_index * per_matchup + 1
+            futures = []
+            for start in range(0, per_matchup, shard_size):
+                count = min(shard_size, per_matchup - start)
+                futures.append((count, pool.submit(_run_shard, tier1, tier2, first_match_id + start, count)))
+            futures_by_matchup.append(futures)
+
+        for (tier1, tier2), futures in zip(matchups, futures_by_matchup):
+            aggregate = MatchAggregate()
+            rows = []
+            points = []
+            estimate = test_batch.new_estimate()
+            progress = tqdm(total=per_matchup, desc=f"Simulating {tier1} vs. {tier2} ({workers} workers)")
+            for i, (count, future) in enumerate(futures):
+                partial, partial_rows, p1_wins, partial_points = future.result()
+                aggregate.merge(partial)
+                rows.extend(partial_rows)
+                points.extend(partial_points)
+                estimate.add(p1_wins, count)
+                progress.update(count)
+                if estimate.done():
+                    for _, pending in futures[i + 1:]:
+                        pending.cancel()
+                    break
+            progress.close()
+            yield aggregate, rows, estimate, points
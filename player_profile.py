@@ -0,0 +1,68 @@
+# player_profile.py
+from collections import namedtuple
+
+from sim_params import SimParams, DEFAULT_PARAMS
+
+# The values the serve and rally checks need from one player at one fatigue level:
+#   fault_chance  - serve_fault_check's base_success_chance (before the gauss draw)
+#   ace_attack    - serve_ace_check's server_attack_score
+#   ace_defense   - serve_ace_check's receiver_defense_multiplier
+#   serve_quality - calculate_serve_quality's first-serve base quality
+#   offense       - calculate_rally_quality's base quality (before the in-rally penalty)
+#   defense       - rally_success_check's receiver_defensive_skill
+ProfileLevel = namedtuple('ProfileLevel',
+                          ['fault_chance', 'ace_attack', 'ace_defense', 'serve_quality', 'offense', 'defense'])
+
+
+class PlayerProfile:
+    """Precomputed serve and rally probability inputs for one player, one table row per fatigue level.
+
+    Fatigue only ever grows by whole rally lengths, so the integer fatigue is the (exact) fatigue
+    level. Rows are built the first time a level is used; every level from `saturation` upward has
+    the capped 40% penalty and shares one row. Player drops its profile when a skill changes.
+    A profile is built under one SimParams, kept as `params`.
+    """
+
+    def __init__(self, player, params: SimParams = DEFAULT_PARAMS):
+        self.player = player
+        self.params = params
+
+        # Not affected by fatigue
+        clutch_modifier = (player.clutch - 50) * params.clutch_modifier_rate
+        max_df_rate = params.max_df_rate(player.serve_accuracy)
+        self.df_rate = max(params.min_df_rate, min(99.0, max_df_rate - clutch_modifier))
+        self.rally_penalty_per_shot = (params.rally_fatigue_scalar - player.stamina) / params.rally_fatigue_divisor
+
+        # First fatigue level whose penalty is past the 40% cap
+        self.saturation = int(0.4 * player.stamina * params.match_stamina_scalar) + 1
+        self._levels = [None] * (self.saturation + 1)
+
+    def at(self, fatigue: float) -> ProfileLevel:
+        """Returns the table row for the given match fatigue."""
+        level = int(fatigue)
+        if level > self.saturation:
+            level = self.saturation
+        row = self._levels[level]
+        if row is None:
+            row = self._levels[level] = self._build_level(level)
+        return row
+
+    def _build_level(self, fatigue: int) -> ProfileLevel:
+        p, params = self.player, self.params
+        sp = p.get_skill('serve_power', fatigue, params)
+        sa = p.get_skill('serve_accuracy', fatigue, params)
+        gs = p.get_skill('groundstroke', fatigue, params)
+        ref = p.get_skill('reflex', fatigue, params)
+
+        sa_component = params.fssr_baseline_floor + (sa * params.fssr_sa_weight)
+        power_penalty = (sp - params.power_threshold) * params.power_penalty_rate
+        fault_chance = max(1, min(99, sa_component - power_penalty))
+
+        return ProfileLevel(
+            fault_chance=fault_chance,
+            ace_attack=((sp + sa) / 200.0) ** 2 * 100,
+            ace_defense=max(params.min_def_floor, (100.0 - ref) / 100.0),
+            serve_quality=(sp * params.weighting_serve_sp) + (sa * params.weighting_serve_sa),
+            offense=(gs * params.weighting_rally_gs_offense) + (p.strength * params.weighting_str_offense),
+            defense=(gs * params.weighting_rally_gs_defense) + (ref * params.weighting_ref_defense),
+        )
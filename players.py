@@ -1,44 +1,136 @@
 # players.py
-from configs.simulation_config import OVR_WEIGHTS, MATCH_STAMINA_SCALAR
+from configs.simulation_config import OVR_WEIGHTS
 from datetime import date
+from player_profile import PlayerProfile
+from roster import Roster, SKILL_COLUMNS
+from sim_params import SimParams, DEFAULT_PARAMS
+
+
+class _Column:
+    """A Player attribute that lives in its roster's column arrays."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.is_skill = name in SKILL_COLUMNS
+
+    def __get__(self, player, owner=None):
+        if player is None:
+            return self
+        return player._roster.columns[self.name].item(player._row)
+
+    def __set__(self, player, value):
+        player._roster.columns[self.name][player._row] = value
+        if self.is_skill:
+            player._roster.invalidate_profiles(player._row)
+
 
 class Player:
-    """Represents a tennis player with various skill attributes."""
+    """Represents a tennis player with various skill attributes.
+
+    A lightweight view onto one row of a Roster; numeric attributes are stored in the roster's columns.
+    A Player made without a roster gets a one-row Roster of its own, freed along with it.
+    Matches never write to a Player: fatigue and the score live on match_context.MatchPlayer.
+    """
+
+    __slots__ = ('_roster', '_row', 'id', 'name', 'country', 'sab', '_schedule')
+
+    serve_power = _Column('serve_power')
+    serve_accuracy = _Column('serve_accuracy')
+    groundstroke = _Column('groundstroke')
+    reflex = _Column('reflex')
+    stamina = _Column('stamina')
+    strength = _Column('strength')
+    clutch = _Column('clutch')
+    overall = _Column('overall')
+    energy = _Column('energy')
+    match_form = _Column('match_form')
+    fatigue = 0.0  # A rating is always rested (read-only); a match's fatigue is on its MatchPlayer
 
     def __init__(self, name, sp, sa, gs, ref, sta, strg, clt, country="USA", player_id=0, birth_date="2006-01-01",
-                 sab="M", ovr=None):
+                 sab="M", ovr=None, roster: Roster = None):
+        roster = Roster(capacity=1) if roster is None else roster
+        row = roster.add_row({
+            'serve_power': sp, 'serve_accuracy': sa, 'groundstroke': gs, 'reflex': ref,
+            'stamina': sta, 'strength': strg, 'clutch': clt,
+            'birth_ordinal': date.fromisoformat(birth_date).toordinal(),
+            # --- NEW: Player Status Attributes ---
+            'energy': 100.0,  # Start fully rested
+            'match_form': 0.0,  # Start at a neutral baseline
+        })
+        self._attach(roster, row, player_id, name, country, sab)
+
+        if ovr is None:
+            self.overall = self._calculate_ovr()
+        else:
+            self.overall = ovr
+
+    @classmethod
+    def view(cls, roster: Roster, row: int, player_id=0, name="", country="USA", sab="M") -> 'Player':
+        """Returns a Player for a row that already holds its values (e.g. after a bulk load)."""
+        player = cls.__new__(cls)
+        player._attach(roster, row, player_id, name, country, sab)
+        return player
+
+    @classmethod
+    def views(cls, roster: Roster, player_ids: list, names: list, countries: list, sabs: list) -> list['Player']:
+        """Player.view for rows 0, 1, ... of a bulk-loaded roster, in one pass (no per-row calls)."""
+        new = cls.__new__
+        players = []
+        for row, (player_id, name, country, sab) in enumerate(zip(player_ids, names, countries, sabs)):
+            player = new(cls)
+            player._roster = roster
+            player._row = row
+            player.id = player_id
+            player.name = name
+            player.country = country
+            player.sab = sab
+            player._schedule = None
+            players.append(player)
+        roster.players[:len(players)] = players
+        return players
+
+    def _attach(self, roster: Roster, row: int, player_id, name, country, sab):
+        self._roster = roster
+        self._row = row
         self.id = player_id
         self.name = name
         self.country = country
         self.sab = sab
-        self.birth_date = date.fromisoformat(birth_date)
+        self._schedule = None
+        roster.players[row] = self
 
-        # Core Skills
-        self.serve_power = sp
-        self.serve_accuracy = sa
-        self.groundstroke = gs
-        self.reflex = ref
-        self.stamina = sta
-        self.strength = strg
-        self.clutch = clt
+    @property
+    def birth_date(self) -> date:
+        return date.fromordinal(self._roster.columns['birth_ordinal'].item(self._row))
 
-        if ovr is None:
-            self.overall = self._calculate_ovr()
-        else:
-            self.overall = ovr
+    @property
+    def schedule(self) -> dict:
+        """Week number -> tournament id; only allocated for players that get one."""
+        if self._schedule is None:
+            self._schedule = {}
+        return self._schedule
 
-        # --- NEW: Player Status Attributes ---
-        self.energy = 100.0  # Start fully rested
-        self.match_form = 0.0  # Start at a neutral baseline
+    @property
+    def profile(self) -> PlayerProfile:
+        """The player's precomputed serve/rally tables, rebuilt after any skill change."""
+        profiles = self._roster.profiles
+        profile = profiles[self._row]
+        if profile is None:
+            profile = profiles[self._row] = PlayerProfile(self)
+        return profile
 
-        # Match-specific state variables
-        self.fatigue = 0
-        self.games_won = 0
-        self.sets_won = 0
-        self.schedule = {}
+    def profile_for(self, params: SimParams) -> PlayerProfile:
+        """The player's profile under the given SimParams (the `profile` property for DEFAULT_PARAMS)."""
+        if params is DEFAULT_PARAMS:
+            return self.profile
+        profiles = self._roster.profiles_for(params)
+        profile = profiles[self._row]
+        if profile is None:
+            profile = profiles[self._row] = PlayerProfile(self, params)
+        return profile
 
-    def get_skill(self, skill_name: str) -> float:
-        """Returns the effective skill value, accounting for match fatigue."""
+    def get_skill(self, skill_name: str, fatigue: float = 0.0, params: SimParams = DEFAULT_PARAMS) -> float:
+        """Returns the effective skill value, accounting for match fatigue (rested by default)."""
         base_skill = getattr(self, skill_name)
 
         # Only physical skills are affected by match-long fatigue
@@ -47,7 +139,7 @@ class Player:
 
         # Calculate penalty based on accumulated fatigue and stamina
         # Capped at a max of 40% skill reduction
-        fatigue_penalty_raw = self.fatigue / (self.stamina * MATCH_STAMINA_SCALAR)
+        fatigue_penalty_raw = fatigue / (self.stamina * params.match_stamina_scalar)
         fatigue_penalty = min(0.4, fatigue_penalty_raw)
 
         effective_skill = base_skill * (1.0 - fatigue_penalty)
@@ -0,0 +1,205 @@
+# point_cache.py
+import random
+import time
+from collections import OrderedDict
+
+import simulation
+import win_probability
+from players import Player
+from sim_params import SimParams, DEFAULT_PARAMS
+
+# --- CACHE CONFIGURATION ---
+CACHE_CAPACITY = 4096  # Distributions kept before the least recently used one is evicted
+FATIGUE_BUCKET_SIZE = 10  # Fatigue units per bucket; 1 reproduces simulate_point's distribution exactly
+
+# --- BENCHMARK CONFIGURATION (python point_cache.py) ---
+BENCHMARK_MATCHES = 500
+NUM_SETS = 3
+# --- END CONFIGURATION ---
+
+
+class AliasTable:
+    """Walker/Vose alias table: draws an index from a discrete distribution with a single uniform."""
+
+    def __init__(self, probabilities: list[float]):
+        n = len(probabilities)
+        total = sum(probabilities)
+        scaled = [p * n / total for p in probabilities]
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Whatever is left over is 1.0 up to rounding error, so it keeps prob 1.0 and aliases itself
+        self.n = n
+
+    def sample(self, u: float) -> int:
+        """Index drawn with the table's probabilities, for u uniform on [0, 1)."""
+        scaled = u * self.n
+        i = int(scaled)
+        return i if scaled - i < self.prob[i] else self.alias[i]
+
+
+class PointDistribution:
+    """The outcomes of simulate_point for one server/receiver pair at one fatigue bucket.
+
+    Each outcome is stored as a (server won, rally_length, outcome, first_serve_fault) tuple alongside
+    its probability; the distribution is shared by every match between the pair, so sample() builds the
+    point_data dict for the match's own server and receiver. server_win_probability and
+    expected_rally_length summarize the whole distribution.
+    """
+
+    def __init__(self, server: Player, receiver: Player, server_fatigue: float, receiver_fatigue: float,
+                 params: SimParams = DEFAULT_PARAMS):
+        self.outcomes = []
+        self.probabilities = []
+        self.server_win_probability = 0.0
+        self.expected_rally_length = 0.0
+        for prob, server_won, outcome, rally_length, first_serve_fault in win_probability.point_distribution(
+                server, receiver, server_fatigue, receiver_fatigue, params):
+            if prob <= 0.0:
+                continue
+            self.outcomes.append((server_won, rally_length, outcome, first_serve_fault))
+            self.probabilities.append(prob)
+            if server_won:
+                self.server_win_probability += prob
+            self.expected_rally_length += prob * rally_length
+        self.table = AliasTable(self.probabilities)
+
+    def sample(self, server, receiver, rng=random) -> dict:
+        """A point_data dict, as simulate_point would return for this server and receiver."""
+        server_won, rally_length, outcome, first_serve_fault = self.outcomes[self.table.sample(rng.random())]
+        return {'winner': server if server_won else receiver, 'rally_length': rally_length, 'outcome': outcome,
+                'first_serve_fault': first_serve_fault}
+
+
+class PointCache:
+    """LRU cache of PointDistributions keyed by (server profile, receiver profile, fatigue buckets).
+
+    simulate_point is a drop-in replacement for simulation.simulate_point: one uniform per point
+    instead of a shot-by-shot rally. Keys hold the players' PlayerProfile objects, which are replaced
+    whenever a skill changes, so a skill edit never hits a stale distribution; profiles are per SimParams,
+    so several configs share one cache without mixing. A miss costs about
+    20 simulated points, so the cache pays off when the same pairings meet repeatedly.
+    """
+
+    def __init__(self, capacity: int = CACHE_CAPACITY, fatigue_bucket_size: int = FATIGUE_BUCKET_SIZE):
+        self.capacity = capacity
+        self.fatigue_bucket_size = fatigue_bucket_size
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _bucket(self, profile, fatigue: float) -> tuple[int, float]:
+        """(bucket index, fatigue the bucket's distribution is computed at) for a player's fatigue."""
+        level = min(int(fatigue), profile.saturation)  # Levels past saturation all share one table row
+        bucket = level // self.fatigue_bucket_size
+        representative = bucket * self.fatigue_bucket_size + (self.fatigue_bucket_size - 1) / 2.0
+        return bucket, min(representative, profile.saturation)
+
+    def distribution(self, server: Player, receiver: Player, params: SimParams = DEFAULT_PARAMS) -> PointDistribution:
+        """The cached distribution for the players' current fatigue, computed on a miss."""
+        server_profile, receiver_profile = server.profile_for(params), receiver.profile_for(params)
+        server_bucket, server_fatigue = self._bucket(server_profile, server.fatigue)
+        receiver_bucket, receiver_fatigue = self._bucket(receiver_profile, receiver.fatigue)
+        key = (server_profile, server_bucket, receiver_profile, receiver_bucket)
+
+        entries = self._entries
+        dist = entries.get(key)
+        if dist is not None:
+            self.hits += 1
+            entries.move_to_end(key)
+            return dist
+
+        self.misses += 1
+        dist = entries[key] = PointDistribution(server, receiver, server_fatigue, receiver_fatigue, params)
+        if len(entries) > self.capacity:
+            entries.popitem(last=False)
+            self.evictions += 1
+        return dist
+
+    def simulate_point(self, server: Player, receiver: Player, rng=random, observer=None,
+                       params: SimParams = DEFAULT_PARAMS) -> dict:
+        """Same signature and point_data as simulation.simulate_point, drawn from the cached distribution.
+
+        Usable as a simulate_match point_model. Points have no individual shots, so an observer only
+        sees the game-level events.
+        """
+        return self.distribution(server, receiver, params).sample(server, receiver, rng)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Shared cache used by the batch scripts' "cached" point model
+DEFAULT_CACHE = PointCache()
+
+
+# ----------------------------------------------------------------------
+# Benchmark Mode: cached vs. shot-by-shot points on one repeated pairing
+# ----------------------------------------------------------------------
+
+def _run_matches(p1: Player, p2: Player, matches: int, point_model=simulation.simulate_point) -> dict:
+    wins = points = rallies = rally_shots = aces = 0
+    start = time.time()
+    for _ in range(matches):
+        winner, tracker = simulation.simulate_match(p1, p2, num_sets=NUM_SETS, verbose=False,
+                                                    point_model=point_model)
+        wins += winner is p1
+        points += tracker.total_points
+        rallies += tracker.total_rallies
+        rally_shots += tracker.sum_rally_lengths
+        aces += tracker.outcome_count('Ace')
+    return {
+        'seconds': time.time() - start,
+        'p1_win': wins / matches,
+        'points_per_match': points / matches,
+        'avg_rally': rally_shots / rallies if rallies else 0.0,
+        'ace_rate': aces / points if points else 0.0,
+    }
+
+
+def main():
+    """Times simulate_match with and without the cache on one pairing from players.csv."""
+    import roster_loader
+
+    all_players = roster_loader.load_players(win_probability.PLAYER_DATA_FILE).players
+    if len(all_players) < 2:
+        return
+    p1, p2 = random.sample(all_players, 2)
+
+    print("=======================================================")
+    print(f"|  POINT CACHE BENCHMARK ({BENCHMARK_MATCHES} MATCHES)  |")
+    print("=======================================================")
+    print(f"{p1} vs.\n{p2}\n")
+
+    exact = _run_matches(p1, p2, BENCHMARK_MATCHES)
+    cached = _run_matches(p1, p2, BENCHMARK_MATCHES, point_model=DEFAULT_CACHE.simulate_point)
+
+    for label, res in (("Shot-by-shot", exact), ("Cached", cached)):
+        print(f"- {label:<13}: {res['seconds']:.2f}s | P1 win {res['p1_win']:.3f} | "
+              f"{res['points_per_match']:.1f} pts/match | rally {res['avg_rally']:.2f} | "
+              f"ace {res['ace_rate']:.2%}")
+    print(f"\nCache: {DEFAULT_CACHE.stats()}")
+
+
+if __name__ == '__main__':
+    main()
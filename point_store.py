@@ -0,0 +1,281 @@
+# point_store.py
+import glob
+import os
+import struct
+from array import array
+from types import SimpleNamespace
+
+import numpy as np
+
+from sim_observers import SimulationObserver
+from stats_tracker import StatsTracker
+
+# --- POINT STORE CONFIGURATION ---
+CHUNK_MATCHES = 10000  # Matches a PointStoreWriter buffers before flushing them to disk as one chunk
+
+# --- INSPECTION CONFIGURATION (python point_store.py) ---
+POINTS_FILE = None  # None uses the newest points_*.pts in sim_stats (test_batch.py with STORE_POINTS)
+MATCH_ID = None  # None shows the file's first match
+# --- END CONFIGURATION ---
+
+# Each point is one little-endian uint16:
+#   bit  0     server is player2
+#   bit  1     winner is player2
+#   bits 2-3   outcome, an index into OUTCOMES
+#   bit  4     first-serve fault
+#   bits 5-10  rally length (0-63; rallies stop at MAX_RALLY_LENGTH)
+OUTCOMES = ('Ace', 'Double Fault', 'Forced Error')
+_OUTCOME_CODES = {outcome: i for i, outcome in enumerate(OUTCOMES)}
+
+# File layout: header, then chunks of [chunk header | MATCH_DTYPE table | uint16 points | padding to 8 bytes].
+# A match's points are chunk_points[offset:offset + n_points].
+FILE_MAGIC = b'TSPS'
+FILE_VERSION = 1
+CHUNK_MAGIC = b'PCHK'
+_FILE_HEADER = struct.Struct('<4sI')  # magic, version
+_CHUNK_HEADER = struct.Struct('<4sIQ')  # magic, matches, points
+MATCH_DTYPE = np.dtype([('match_id', '<i8'), ('p1_id', '<i4'), ('p2_id', '<i4'), ('offset', '<i8'),
+                        ('n_points', '<i4'), ('num_sets', '<i4')])
+
+
+def encode_point(server_is_p2: bool, winner_is_p2: bool, outcome: str, first_serve_fault: bool,
+                 rally_length: int) -> int:
+    return (server_is_p2 | (winner_is_p2 << 1) | (_OUTCOME_CODES[outcome] << 2) | (first_serve_fault << 4)
+            | (rally_length << 5))
+
+
+def decode_points(codes: np.ndarray) -> dict:
+    """Per-point arrays for a match's codes: server and winner (0 = player1, 1 = player2), outcome
+    (index into OUTCOMES), first_serve_fault and rally_length."""
+    codes = np.asarray(codes, dtype=np.uint16)
+    return {
+        'server': codes & 1,
+        'winner': (codes >> 1) & 1,
+        'outcome': (codes >> 2) & 3,
+        'first_serve_fault': ((codes >> 4) & 1).astype(bool),
+        'rally_length': (codes >> 5) & 63,
+    }
+
+
+# ----------------------------------------------------------------------
+# Writing
+# ----------------------------------------------------------------------
+
+class PointRecorder(SimulationObserver):
+    """Encodes every point of the match it observes into `codes` (an array('H'), reset per match)."""
+
+    def __init__(self):
+        self.player2 = None
+        self.codes = array('H')
+
+    def on_match_start(self, player1, player2):
+        self.player2 = player2
+        self.codes = array('H')
+
+    def on_point(self, server, receiver, point_data, server_points, receiver_points, game_over):
+        player2 = self.player2
+        self.codes.append(encode_point(server is player2, point_data['winner'] is player2, point_data['outcome'],
+                                       point_data['first_serve_fault'], point_data['rally_length']))
+
+
+class PointStoreWriter:
+    """Appends matches' point codes to a point store file, one chunk per CHUNK_MATCHES matches.
+
+    Use as a context manager (or call close()) so the last partial chunk is flushed.
+    """
+
+    def __init__(self, filename: str, chunk_matches: int = CHUNK_MATCHES):
+        self.filename = filename
+        self.chunk_matches = chunk_matches
+        self._file = open(filename, 'wb')
+        self._file.write(_FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION))
+        self._matches = []
+        self._points = bytearray()
+        self.matches_written = 0
+
+    def add_match(self, match_id: int, p1_id: int, p2_id: int, codes, num_sets: int = 3):
+        """codes: a PointRecorder's codes (or any uint16 buffer) for the match."""
+        codes = codes.tobytes() if hasattr(codes, 'tobytes') else bytes(codes)
+        self._matches.append((match_id, p1_id, p2_id, len(self._points) // 2, len(codes) // 2, num_sets))
+        self._points += codes
+        if len(self._matches) >= self.chunk_matches:
+            self.flush()
+
+    def flush(self):
+        if not self._matches:
+            return
+        table = np.array(self._matches, dtype=MATCH_DTYPE)
+        self._file.write(_CHUNK_HEADER.pack(CHUNK_MAGIC, len(table), len(self._points) // 2))
+        self._file.write(table.tobytes())
+        self._file.write(self._points)
+        self._file.write(b'\0' * (-len(self._points) % 8))
+        self.matches_written += len(table)
+        self._matches = []
+        self._points = bytearray()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# ----------------------------------------------------------------------
+# Reading
+# ----------------------------------------------------------------------
+
+def _scored_points(codes: np.ndarray):
+    """Replays simulate_set's scoring over a match's points.
+
+    Yields (code, score, tiebreak, tiebreak_start, game_over, set_games) per point, where score is
+    (p1 sets, p2 sets, p1 games, p2 games, p1 points, p2 points) after the point and set_games is
+    (p1 games, p2 games) of the set the point ended, else None.
+    """
+    sets, games, points = [0, 0], [0, 0], [0, 0]
+    for code in codes.tolist():
+        winner = (code >> 1) & 1
+        tiebreak = games[0] == 6 and games[1] == 6
+        tiebreak_start = tiebreak and points[0] == points[1] == 0
+        points[winner] += 1
+        target = 7 if tiebreak else 4
+        game_over = points[winner] >= target and points[winner] >= points[1 - winner] + 2
+        set_games = None
+        if game_over:
+            points = [0, 0]
+            games[winner] += 1
+            if tiebreak or (games[winner] >= 6 and games[winner] >= games[1 - winner] + 2):
+                set_games = tuple(games)
+                sets[winner] += 1
+                games = [0, 0]
+        yield (code, (sets[0], sets[1], games[0], games[1], points[0], points[1]), tiebreak, tiebreak_start, game_over,
+               set_games)
+
+
+class PointStore:
+    """Memory-mapped reader for a point store file: nothing is loaded until a match is asked for."""
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self._data = np.memmap(filename, dtype=np.uint8, mode='r')
+        magic, version = _FILE_HEADER.unpack_from(self._data, 0)
+        if magic != FILE_MAGIC or version != FILE_VERSION:
+            raise ValueError(f"'{filename}' is not a version {FILE_VERSION} point store")
+
+        self._tables, self._chunk_points = [], []
+        pos = _FILE_HEADER.size
+        while pos < len(self._data):
+            magic, n_matches, n_points = _CHUNK_HEADER.unpack_from(self._data, pos)
+            if magic != CHUNK_MAGIC:
+                raise ValueError(f"Corrupt chunk header at byte {pos} of '{filename}'")
+            pos += _CHUNK_HEADER.size
+            table_bytes = n_matches * MATCH_DTYPE.itemsize
+            self._tables.append(self._data[pos:pos + table_bytes].view(MATCH_DTYPE))
+            pos += table_bytes
+            self._chunk_points.append(self._data[pos:pos + 2 * n_points].view('<u2'))
+            pos += 2 * n_points + (-2 * n_points % 8)
+
+        # Sorted match ids -> (chunk, row), for lookups by id across chunks
+        ids = [table['match_id'] for table in self._tables]
+        all_ids = np.concatenate(ids) if ids else np.zeros(0, dtype=np.int64)
+        self._chunk_of = np.repeat(np.arange(len(ids)), [len(i) for i in ids])
+        self._row_of = np.concatenate([np.arange(len(i)) for i in ids]) if ids else np.zeros(0, dtype=int)
+        self._order = np.argsort(all_ids, kind='stable')
+        self._sorted_ids = all_ids[self._order]
+
+    def __len__(self) -> int:
+        return len(self._sorted_ids)
+
+    def match_ids(self) -> np.ndarray:
+        return self._sorted_ids
+
+    def _locate(self, match_id: int) -> tuple[int, int]:
+        i = np.searchsorted(self._sorted_ids, match_id)
+        if i == len(self._sorted_ids) or self._sorted_ids[i] != match_id:
+            raise KeyError(match_id)
+        j = self._order[i]
+        return self._chunk_of[j], self._row_of[j]
+
+    def match_info(self, match_id: int) -> dict:
+        """{'match_id', 'p1_id', 'p2_id', 'n_points', 'num_sets'} of a stored match."""
+        chunk, row = self._locate(match_id)
+        entry = self._tables[chunk][row]
+        return {name: int(entry[name]) for name in ('match_id', 'p1_id', 'p2_id', 'n_points', 'num_sets')}
+
+    def points(self, match_id: int) -> np.ndarray:
+        """The match's raw point codes (a read-only view into the file)."""
+        chunk, row = self._locate(match_id)
+        entry = self._tables[chunk][row]
+        return self._chunk_points[chunk][entry['offset']:entry['offset'] + entry['n_points']]
+
+    def decode(self, match_id: int) -> dict:
+        return decode_points(self.points(match_id))
+
+    def momentum(self, match_id: int) -> np.ndarray:
+        """Running points won by player1 minus player2, after each point."""
+        return np.cumsum(1 - 2 * decode_points(self.points(match_id))['winner'].astype(np.int32))
+
+    def score_progression(self, match_id: int) -> list[tuple]:
+        """(p1 sets, p2 sets, p1 games, p2 games, p1 points, p2 points) after each point; points count
+        up from 0 (tiebreak points included) rather than as 15/30/40."""
+        return [score for _, score, _, _, _, _ in _scored_points(self.points(match_id))]
+
+    def tracker(self, match_id: int, player1=None, player2=None) -> StatsTracker:
+        """Rebuilds the match's StatsTracker. Pass the players to label the summary with their names;
+        by default they are named after their ids."""
+        info = self.match_info(match_id)
+        player1 = player1 or SimpleNamespace(id=info['p1_id'], name=f"Player {info['p1_id']}")
+        player2 = player2 or SimpleNamespace(id=info['p2_id'], name=f"Player {info['p2_id']}")
+        players = (player1, player2)
+        tracker = StatsTracker(player1, player2)
+        for code, _, tiebreak, tiebreak_start, game_over, set_games in _scored_points(self.points(match_id)):
+            if tiebreak_start:
+                tracker.record_tiebreak()
+            server, winner = players[code & 1], players[(code >> 1) & 1]
+            tracker.record_point(server, {'winner': winner, 'rally_length': (code >> 5) & 63,
+                                          'outcome': OUTCOMES[(code >> 2) & 3],
+                                          'first_serve_fault': bool((code >> 4) & 1)})
+            if game_over and not tiebreak:
+                tracker.record_service_game(server, winner)
+            if set_games is not None:
+                tracker.record_set(*set_games)
+        return tracker
+
+
+def main():
+    """Prints one stored match's stats, set-by-set game progression and momentum swing."""
+    points_file = POINTS_FILE or max(glob.glob(os.path.join("sim_stats", "points_*.pts")), default=None)
+    if points_file is None:
+        print("No point store found; run test_batch.py with STORE_POINTS = True.")
+        return
+    store = PointStore(points_file)
+    match_id = MATCH_ID if MATCH_ID is not None else int(store.match_ids()[0])
+    info = store.match_info(match_id)
+
+    print("=======================================================")
+    print(f"|  MATCH {match_id} FROM {os.path.basename(points_file)}  |")
+    print("=======================================================")
+    print(f"Player {info['p1_id']} vs. Player {info['p2_id']} | {info['n_points']} points | "
+          f"{info['n_points'] * 2} bytes stored")
+    for stat, value in store.tracker(match_id).calculate_summary().items():
+        print(f"- {stat}: {value}")
+
+    sets, games = [], []
+    for _, score, _, _, game_over, set_games in _scored_points(store.points(match_id)):
+        if game_over:
+            games.append("{}-{}".format(*(set_games or score[2:4])))
+        if set_games is not None:
+            sets.append(games)
+            games = []
+    momentum = store.momentum(match_id)
+    print()
+    for set_number, set_games in enumerate(sets, 1):
+        print(f"Set {set_number}: {' '.join(set_games)}")
+    print(f"Momentum (P1 - P2 points): max {momentum.max():+d}, min {momentum.min():+d}, final {momentum[-1]:+d}")
+
+
+if __name__ == '__main__':
+    main()
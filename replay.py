@@ -0,0 +1,84 @@
+# replay.py
+import glob
+import os
+
+import results_store
+import roster_loader
+import test_batch
+from rng_streams import StreamFactory
+from sim_observers import ConsoleObserver
+
+# --- REPLAY CONFIGURATION ---
+MATCH_ID = 1  # The match_id column of the batch log
+LOG_FILE = None  # A match_results_log_* file or directory; None uses the newest one in test_batch.VERBOSE_LOG_FOLDER
+# --- END CONFIGURATION ---
+
+
+def latest_log(folder: str = test_batch.VERBOSE_LOG_FOLDER) -> str:
+    """The newest match_results_log_* (a CSV file or a columnar directory) in folder, or None."""
+    logs = sorted(glob.glob(os.path.join(folder, "match_results_log_*")))
+    return logs[-1] if logs else None
+
+
+def find_match_row(log_file: str, match_id: int) -> dict:
+    """The log row of match_id with every value as text (as in the CSV log), or None."""
+    results = results_store.load_results(log_file)
+    matches = (results['match_id'] == match_id).nonzero()[0]
+    if len(matches) == 0:
+        return None
+    row = {name: values[matches[0]].item() for name, values in results.items()}
+    # Integer columns store blanks as -1
+    return {name: '' if name in results_store.COLUMN_DTYPES and value == -1 else str(value)
+            for name, value in row.items()}
+
+
+def replay(match_id: int, log_file: str = None, observer=None) -> tuple:
+    """Regenerates one match of a test_batch run from its logged root_seed and stream_index.
+
+    The observer defaults to a ConsoleObserver with the full point log. Returns (row, tracker) for the
+    regenerated match, or None if it can't be replayed. Needs the same players.csv, NUM_SETS and
+    simulation_config as the batch; a replay that disagrees with the log says so.
+    """
+    log_file = log_file or latest_log()
+    if log_file is None:
+        print(f"Error: No match_results_log_* found in '{test_batch.VERBOSE_LOG_FOLDER}'.")
+        return None
+    logged = find_match_row(log_file, match_id)
+    if logged is None:
+        print(f"Error: Match {match_id} not found in '{log_file}'.")
+        return None
+    if logged.get('point_model') == "vectorized":
+        print(f"Error: Match {match_id} was a vectorized-engine lane; its seed replays the whole chunk, not one match.")
+        return None
+    if not logged.get('root_seed'):
+        print(f"Error: Match {match_id} has no seed (a log from before seeds were logged).")
+        return None
+
+    players_by_tier = roster_loader.load_players(test_batch.PLAYER_DATA_FILE).by_tier
+    if not players_by_tier:
+        return None
+    streams = StreamFactory(int(logged['root_seed']))
+    row, _, _, _, tracker = test_batch.play_match(
+        players_by_tier, logged['p1_tier'], logged['p2_tier'], int(logged['stream_index']), streams,
+        test_batch.resolve_point_model(logged['point_model']),
+        observer=observer if observer is not None else ConsoleObserver(log_points=True))
+
+    mismatched = [key for key in ('p1_id', 'p2_id', 'winner_id', 'final_score') if str(row[key]) != logged[key]]
+    if mismatched:
+        print(f"\nWarning: replay differs from the log in {', '.join(mismatched)}; players.csv or the config "
+              f"has changed since the batch ran.")
+    return row, tracker
+
+
+def main():
+    result = replay(MATCH_ID, LOG_FILE)
+    if result is None:
+        return
+    row, tracker = result
+    print(f"\n--- Match {MATCH_ID}: winner {row['winner_id']} ({row['final_score']}) ---")
+    for key, value in tracker.calculate_summary().items():
+        print(f"- {key}: {value}")
+
+
+if __name__ == '__main__':
+    main()
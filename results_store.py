@@ -0,0 +1,202 @@
+# results_store.py
+import csv
+import glob
+import os
+
+import numpy as np
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# --- RESULTS STORE CONFIGURATION ---
+CHUNK_ROWS = 50000  # Rows a columnar sink buffers before writing them out as one part file
+# --- END CONFIGURATION ---
+
+# Sink formats: "auto" picks Parquet when pyarrow is installed and compressed .npz parts otherwise
+FORMAT_AUTO = "auto"
+FORMAT_PARQUET = "parquet"
+FORMAT_NPZ = "npz"
+FORMAT_CSV = "csv"
+
+# Stored dtype of the test_batch log columns; any other column is stored as text. Integer columns
+# store a blank value (e.g. stream_index of a vectorized-engine match) as -1.
+COLUMN_DTYPES = {
+    'match_id': np.int64,
+    'p1_id': np.int32,
+    'p2_id': np.int32,
+    'winner_id': np.int32,
+    'num_sets_played': np.int8,
+    'stream_index': np.int64,
+}
+
+
+def resolve_format(results_format: str) -> str:
+    """The format a sink will actually write: Parquet falls back to npz without pyarrow."""
+    if results_format not in (FORMAT_AUTO, FORMAT_PARQUET, FORMAT_NPZ, FORMAT_CSV):
+        raise ValueError(f"Unknown results format '{results_format}'")
+    if results_format in (FORMAT_AUTO, FORMAT_PARQUET):
+        return FORMAT_PARQUET if PARQUET_AVAILABLE else FORMAT_NPZ
+    return results_format
+
+
+def _column_array(column: str, values: list) -> np.ndarray:
+    dtype = COLUMN_DTYPES.get(column)
+    if dtype is None:
+        return np.array([str(v) for v in values])
+    return np.array([-1 if v == '' else v for v in values], dtype=dtype)
+
+
+# ----------------------------------------------------------------------
+# Sinks
+# ----------------------------------------------------------------------
+
+class ResultsSink:
+    """Takes match rows (dicts with every column) and writes them out; close it, or use it as a
+    context manager, to flush the last rows. `path` is the file or directory written."""
+
+    def write_row(self, row: dict):
+        raise NotImplementedError
+
+    def write_rows(self, rows: list[dict]):
+        for row in rows:
+            self.write_row(row)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class CsvSink(ResultsSink):
+    """One CSV file, written row by row (the original match log format)."""
+
+    def __init__(self, path: str, columns: list[str]):
+        self.path = path
+        self.columns = columns
+        self._file = open(path, 'w', newline='')
+        self._writer = csv.DictWriter(self._file, fieldnames=columns)
+        self._writer.writeheader()
+
+    def write_row(self, row: dict):
+        self._writer.writerow(row)
+
+    def write_rows(self, rows: list[dict]):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class ColumnarSink(ResultsSink):
+    """Buffers rows and writes them as one compressed part file of column arrays every chunk_rows rows,
+    into the `path` directory (part_00000, part_00001, ...)."""
+
+    extension = None
+
+    def __init__(self, path: str, columns: list[str], chunk_rows: int = CHUNK_ROWS):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.columns = columns
+        self.chunk_rows = chunk_rows
+        self._rows = []
+        self._parts = 0
+        self.rows_written = 0
+
+    def write_row(self, row: dict):
+        self._rows.append(row)
+        if len(self._rows) >= self.chunk_rows:
+            self.flush()
+
+    def write_rows(self, rows: list[dict]):
+        self._rows.extend(rows)
+        if len(self._rows) >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        if not self._rows:
+            return
+        rows = self._rows
+        arrays = {column: _column_array(column, [row[column] for row in rows]) for column in self.columns}
+        self._write_part(os.path.join(self.path, f"part_{self._parts:05d}{self.extension}"), arrays)
+        self._parts += 1
+        self.rows_written += len(rows)
+        self._rows = []
+
+    def _write_part(self, filename: str, arrays: dict):
+        raise NotImplementedError
+
+    def close(self):
+        self.flush()
+
+
+class NpzSink(ColumnarSink):
+    extension = ".npz"
+
+    def _write_part(self, filename: str, arrays: dict):
+        np.savez_compressed(filename, **arrays)
+
+
+class ParquetSink(ColumnarSink):
+    extension = ".parquet"
+
+    def _write_part(self, filename: str, arrays: dict):
+        pyarrow.parquet.write_table(pyarrow.table(arrays), filename, compression='zstd')
+
+
+def open_sink(results_format: str, path_base: str, columns: list[str]):
+    """Opens a sink for path_base: path_base + '.csv', or the directory path_base for the columnar formats."""
+    results_format = resolve_format(results_format)
+    if results_format == FORMAT_CSV:
+        return CsvSink(path_base + ".csv", columns)
+    if results_format == FORMAT_PARQUET:
+        return ParquetSink(path_base, columns)
+    return NpzSink(path_base, columns)
+
+
+# ----------------------------------------------------------------------
+# Loading
+# ----------------------------------------------------------------------
+
+def load_results(path: str, columns: list[str] = None) -> dict:
+    """Loads a results log written by any sink as {column: array}, optionally only the given columns.
+
+    Columnar logs only read the requested columns from disk; a CSV is parsed in full either way.
+    Column types follow COLUMN_DTYPES whatever the format.
+    """
+    if os.path.isdir(path):
+        parquet_parts = sorted(glob.glob(os.path.join(path, "part_*.parquet")))
+        if parquet_parts:
+            if not PARQUET_AVAILABLE:
+                raise ImportError(f"Reading '{path}' needs pyarrow")
+            table = pyarrow.parquet.read_table(path, columns=columns)
+            return {name: table.column(name).to_numpy().astype(COLUMN_DTYPES.get(name, str))
+                    for name in table.column_names}
+        parts = [np.load(part) for part in sorted(glob.glob(os.path.join(path, "part_*.npz")))]
+        if not parts:
+            return {}
+        names = columns or parts[0].files
+        return {name: np.concatenate([part[name] for part in parts]) for name in names}
+
+    with open(path, 'r', newline='') as csvfile:
+        reader = csv.DictReader(csvfile)
+        names = columns or reader.fieldnames
+        values = {name: [] for name in names}
+        for row in reader:
+            for name in names:
+                values[name].append(row[name])
+    return {name: _column_array(name, column) for name, column in values.items()}
+
+
+def result_rows(results: dict):
+    """Iterates over loaded results as one dict per match."""
+    names = list(results)
+    for values in zip(*(results[name].tolist() for name in names)):
+        yield dict(zip(names, values))
@@ -0,0 +1,109 @@
+# rng_streams.py
+from itertools import chain, repeat
+
+import numpy as np
+
+# Variates generated per refill of a stream's uniform or normal buffer
+BLOCK_SIZE = 1024
+
+# Variates of each kind a PointSyncedStream reserves per point. A point draws at most 4 + MAX_RALLY_LENGTH
+# uniforms and 2 + MAX_RALLY_LENGTH normals (every shot returned up to the cap).
+POINT_WINDOW = 64
+
+# Stream channels: independent streams derived from the same match index
+MATCH_CHANNEL = 0  # Everything simulate_match draws
+SELECTION_CHANNEL = 1  # Picking the players for the match (batch runners)
+
+
+def _buffered(draw_block, block_size: int):
+    """Returns a zero-argument callable yielding one variate per call from refilled blocks.
+
+    The chain/map/repeat pipeline keeps every call at C level: draw_block only runs once per block.
+    """
+    return chain.from_iterable(map(lambda _: draw_block(block_size).tolist(), repeat(None))).__next__
+
+
+class MatchStream:
+    """An independent random stream for one match, read from pre-generated blocks.
+
+    Provides the random(), uniform() and gauss() calls the simulation makes on the `random` module,
+    so either can be passed as a simulation `rng`. An antithetic stream replays the same seed with
+    every uniform u mirrored to 1 - u and every normal z to -z (see variance_reduction.py).
+    """
+
+    def __init__(self, seed_sequence: np.random.SeedSequence, block_size: int = BLOCK_SIZE,
+                 antithetic: bool = False):
+        self.seed_sequence = seed_sequence
+        self.antithetic = antithetic
+        uniform_seq, normal_seq = seed_sequence.spawn(2)
+        uniforms = np.random.Generator(np.random.PCG64(uniform_seq)).random
+        normals = np.random.Generator(np.random.PCG64(normal_seq)).standard_normal
+        if antithetic:
+            self.random = _buffered(lambda n: 1.0 - uniforms(n), block_size)
+            self._normal = _buffered(lambda n: -normals(n), block_size)
+        else:
+            self.random = _buffered(uniforms, block_size)
+            self._normal = _buffered(normals, block_size)
+
+    def uniform(self, a: float, b: float) -> float:
+        return a + (b - a) * self.random()
+
+    def gauss(self, mu: float = 0.0, sigma: float = 1.0) -> float:
+        return mu + sigma * self._normal()
+
+    def choice(self, seq):
+        # min() covers the antithetic draw 1 - 0.0 == 1.0
+        return seq[min(int(self.random() * len(seq)), len(seq) - 1)]
+
+
+class PointSyncedStream(MatchStream):
+    """A match stream in which point k always starts at variate k * POINT_WINDOW.
+
+    Two runs that replay the same seed (common random numbers) stay aligned point by point even when
+    a config or build change makes some rally longer or shorter, instead of drifting apart for the
+    rest of the match. Call next_point() after every point (variance_reduction.PointSyncObserver does).
+    """
+
+    def __init__(self, seed_sequence: np.random.SeedSequence, antithetic: bool = False, window: int = POINT_WINDOW):
+        self.seed_sequence = seed_sequence
+        self.antithetic = antithetic
+        self.window = window
+        uniform_seq, normal_seq = seed_sequence.spawn(2)
+        self._uniforms = np.random.Generator(np.random.PCG64(uniform_seq)).random
+        self._normals = np.random.Generator(np.random.PCG64(normal_seq)).standard_normal
+        self.next_point()
+
+    def next_point(self):
+        uniforms, normals = self._uniforms(self.window), self._normals(self.window)
+        if self.antithetic:
+            uniforms, normals = 1.0 - uniforms, -normals
+        self.random = iter(uniforms.tolist()).__next__
+        self._normal = iter(normals.tolist()).__next__
+
+
+class StreamFactory:
+    """Derives per-match streams from one root seed.
+
+    The stream for (match index, channel) depends only on the root seed and those two numbers (its
+    SeedSequence spawn key), so results are bit-identical whether matches run serially or are split
+    across workers in any order.
+    """
+
+    def __init__(self, root_seed: int = None):
+        # A fresh OS-entropy seed when none is given; it's kept so the run can be reproduced
+        self.root_seed = np.random.SeedSequence(root_seed).entropy
+
+    def stream(self, index: int, channel: int = MATCH_CHANNEL, antithetic: bool = False) -> MatchStream:
+        return MatchStream(np.random.SeedSequence(self.root_seed, spawn_key=(index, channel)),
+                           antithetic=antithetic)
+
+    def synced_stream(self, index: int, antithetic: bool = False) -> PointSyncedStream:
+        """Match `index`'s PointSyncedStream (its own channel-0 seed, read point by point)."""
+        return PointSyncedStream(np.random.SeedSequence(self.root_seed, spawn_key=(index, MATCH_CHANNEL)),
+                                 antithetic=antithetic)
+
+    def seed(self, index: int, channel: int = MATCH_CHANNEL) -> int:
+        """An integer seed for (index, channel), for generators that take a seed rather than a stream
+        (e.g. one batch_engine call)."""
+        state = np.random.SeedSequence(self.root_seed, spawn_key=(index, channel)).generate_state(2, np.uint32)
+        return int(state[0]) | int(state[1]) << 32
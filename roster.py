@@ -0,0 +1,139 @@
+# roster.py
+from collections import OrderedDict
+
+import numpy as np
+
+from configs.simulation_config import OVR_WEIGHTS, TIER_RANGES
+from sim_params import DEFAULT_PARAMS
+
+# Per-player numeric columns and their dtypes. Skills and OVR are whole numbers in this game.
+SKILL_COLUMNS = ('serve_power', 'serve_accuracy', 'groundstroke', 'reflex', 'stamina', 'strength', 'clutch')
+COLUMN_DTYPES = {
+    **{name: np.int16 for name in SKILL_COLUMNS},
+    'overall': np.int16,
+    'energy': np.float64,
+    'match_form': np.float64,
+    'birth_ordinal': np.int32,
+}
+
+# SimParams besides DEFAULT_PARAMS whose PlayerProfiles a roster keeps; the least recently used set is
+# dropped past this, so sweeping through many configs doesn't hold every config's profiles.
+PARAM_PROFILE_SETS = 4
+
+# OVR_WEIGHTS keys in the order Player._calculate_ovr sums them
+_OVR_TERMS = (('groundstroke', 'gs'), ('reflex', 'ref'), ('strength', 'strg'), ('serve_power', 'sp'),
+              ('serve_accuracy', 'sa'), ('clutch', 'clt'), ('stamina', 'sta'))
+
+
+class Roster:
+    """A world of players stored column-wise: one contiguous NumPy array per attribute.
+
+    Player objects are thin views onto a row (see players.Player), so per-player code keeps working
+    while whole-roster operations run vectorized over the columns.
+    """
+
+    def __init__(self, capacity: int = 256):
+        self.size = 0
+        self.columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in COLUMN_DTYPES.items()}
+        self.players = []  # Row -> Player view
+        self.profiles = []  # Row -> cached PlayerProfile under DEFAULT_PARAMS (None until first use)
+        self._param_profiles = OrderedDict()  # Other SimParams -> their row -> PlayerProfile list (LRU)
+
+    @classmethod
+    def from_columns(cls, values: dict) -> 'Roster':
+        """A roster filled a whole column at a time (missing columns are zero), e.g. from a saved
+        snapshot; its Players are then made with Player.views."""
+        size = len(next(iter(values.values()))) if values else 0
+        roster = cls(capacity=max(size, 1))
+        for name, column in values.items():
+            roster.columns[name][:size] = column
+        roster.size = size
+        roster.players = [None] * size
+        roster.profiles = [None] * size
+        return roster
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add_row(self, values: dict) -> int:
+        """Appends one row and returns its index; missing columns are zero."""
+        row = self.size
+        capacity = len(self.columns['overall'])
+        if row == capacity:
+            for name, column in self.columns.items():
+                grown = np.zeros(capacity * 2, dtype=column.dtype)
+                grown[:capacity] = column
+                self.columns[name] = grown
+        for name, value in values.items():
+            self.columns[name][row] = value
+        self.size += 1
+        self.players.append(None)
+        self.profiles.append(None)
+        for profiles in self._param_profiles.values():
+            profiles.append(None)
+        return row
+
+    def column(self, name: str) -> np.ndarray:
+        """The live (writable) array of one column, trimmed to the roster size."""
+        return self.columns[name][:self.size]
+
+    def profiles_for(self, params) -> list:
+        """The row -> cached PlayerProfile list for a SimParams."""
+        if params is DEFAULT_PARAMS:
+            return self.profiles
+        param_profiles = self._param_profiles
+        profiles = param_profiles.get(params)
+        if profiles is None:
+            profiles = param_profiles[params] = [None] * self.size
+            if len(param_profiles) > PARAM_PROFILE_SETS:
+                param_profiles.popitem(last=False)
+        else:
+            param_profiles.move_to_end(params)
+        return profiles
+
+    def invalidate_profiles(self, rows=None):
+        """Drops cached PlayerProfiles (under every SimParams); call after writing skill columns directly.
+
+        With no rows, the caches of non-default SimParams are released altogether.
+        """
+        if rows is None:
+            self.profiles = [None] * self.size
+            self._param_profiles = OrderedDict()
+        else:
+            for row in np.atleast_1d(rows):
+                self.profiles[int(row)] = None
+                for profiles in self._param_profiles.values():
+                    profiles[int(row)] = None
+
+    # ----------------------------------------------------------------------
+    # Vectorized whole-roster operations
+    # ----------------------------------------------------------------------
+
+    def calculate_ovr(self) -> np.ndarray:
+        """Player._calculate_ovr for every row at once."""
+        weighted_sum = np.zeros(self.size)
+        for column, key in _OVR_TERMS:
+            weighted_sum = weighted_sum + self.column(column) * OVR_WEIGHTS[key]
+        return weighted_sum.astype(np.int16)
+
+    def recalculate_ovr(self):
+        """Rewrites the overall column from the current skills."""
+        self.column('overall')[:] = self.calculate_ovr()
+
+    def tier_indices(self) -> np.ndarray:
+        """Index into TIER_RANGES (in its order) of each row's OVR tier, or -1 if it falls outside all."""
+        overall = self.column('overall')
+        tiers = np.full(self.size, -1, dtype=np.int8)
+        for i, (low, high) in enumerate(TIER_RANGES.values()):
+            tiers[(overall >= low) & (overall <= high)] = i
+        return tiers
+
+    def rows_by_tier(self) -> dict:
+        """Maps each TIER_RANGES tier name to the array of rows whose OVR falls in it."""
+        tiers = self.tier_indices()
+        return {name: np.flatnonzero(tiers == i) for i, name in enumerate(TIER_RANGES)}
+
+    def skill_matrix(self, rows=None) -> np.ndarray:
+        """(n, 7) float array of base skills in SKILL_COLUMNS order (the batch_engine layout)."""
+        rows = np.arange(self.size) if rows is None else rows
+        return np.stack([self.column(name)[rows] for name in SKILL_COLUMNS], axis=1).astype(float)
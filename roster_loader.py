@@ -0,0 +1,196 @@
+# roster_loader.py
+import csv
+import hashlib
+import io
+import os
+import zipfile
+from collections import defaultdict
+from datetime import date
+
+import numpy as np
+
+from players import Player
+from roster import Roster
+
+# --- ROSTER LOADER CONFIGURATION ---
+PLAYER_DATA_FILE = os.path.join("data", "players.csv")
+SNAPSHOT_FOLDER = os.path.join("sim_stats", "roster_cache")  # Parsed player CSVs, one .npz snapshot per file
+# Bump when the snapshot layout or the CSV parsing changes, so every snapshot is rebuilt.
+SNAPSHOT_VERSION = 1
+# --- END CONFIGURATION ---
+
+# players.csv skill column -> roster column
+CSV_SKILLS = {'sp': 'serve_power', 'sa': 'serve_accuracy', 'gs': 'groundstroke', 'ref': 'reflex',
+              'sta': 'stamina', 'strg': 'strength', 'clt': 'clutch'}
+# Player.__init__'s defaults, for files without these columns
+DEFAULT_BIRTH_DATE = "2006-01-01"
+DEFAULT_SAB = "M"
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()  # datetime64[D] counts days from here
+
+
+class PlayerPool:
+    """The players of one players.csv, in file order, on a Roster of their own, with grouped views.
+
+    by_tier (the CSV's tier column), by_ovr and by_country map each key to its players in file order.
+    A view is built the first time it is read and then kept, and pools are shared (see load_players),
+    so treat the lists as read-only.
+    """
+
+    def __init__(self, roster: Roster, players: list[Player], tiers: list[str]):
+        self.roster = roster
+        self.players = players
+        self.tiers = tiers  # Row -> CSV tier
+        self._by_tier = None
+        self._by_ovr = None
+        self._by_country = None
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+    @property
+    def by_tier(self) -> dict[str, list[Player]]:
+        """CSV tier -> players, tiers in order of first appearance."""
+        if self._by_tier is None:
+            self._by_tier = _group(self.players, self.tiers)
+        return self._by_tier
+
+    @property
+    def by_ovr(self) -> dict[int, list[Player]]:
+        """OVR -> players, OVRs ascending."""
+        if self._by_ovr is None:
+            self._by_ovr = dict(sorted(_group(self.players, self.roster.column('overall').tolist()).items()))
+        return self._by_ovr
+
+    @property
+    def by_country(self) -> dict[str, list[Player]]:
+        """Country -> players, countries in order of first appearance."""
+        if self._by_country is None:
+            self._by_country = _group(self.players, [player.country for player in self.players])
+        return self._by_country
+
+
+def _group(players: list[Player], keys: list) -> dict:
+    groups = defaultdict(list)
+    for player, key in zip(players, keys):
+        groups[key].append(player)
+    return dict(groups)
+
+
+# ----------------------------------------------------------------------
+# Loading
+# ----------------------------------------------------------------------
+
+_pools = {}  # Absolute CSV path -> ((mtime_ns, size) it was loaded at, shared PlayerPool)
+
+
+def load_players(filename: str = PLAYER_DATA_FILE, shared: bool = True) -> PlayerPool:
+    """Every player in a players.csv, as a PlayerPool (empty, after printing an error, if there's no file).
+
+    The parsed file is kept as a snapshot in SNAPSHOT_FOLDER, used while the CSV's modification time
+    and size are unchanged or its content hash still matches, so the CSV is only parsed again after an
+    edit. Shared pools are also kept for the process: every call for an unchanged file returns the same
+    pool, views included. Pass shared=False for a pool (and Roster) of your own to modify.
+    """
+    path = os.path.abspath(filename)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        print(f"Error: Player data file not found at '{filename}'.")
+        return PlayerPool(Roster(), [], [])
+    signature = (stat.st_mtime_ns, stat.st_size)
+    if shared:
+        loaded = _pools.get(path)
+        if loaded is not None and loaded[0] == signature:
+            return loaded[1]
+
+    pool = _build_pool(_load_records(path, signature))
+    if shared:
+        _pools[path] = (signature, pool)
+    return pool
+
+
+def _build_pool(records: np.ndarray) -> PlayerPool:
+    """Players on a new Roster from parsed records; OVR is computed here, so snapshots follow OVR_WEIGHTS."""
+    columns = {column: records[column] for column in (*CSV_SKILLS.values(), 'birth_ordinal')}
+    roster = Roster.from_columns({**columns, 'energy': np.full(len(records), 100.0)})  # Start fully rested
+    roster.recalculate_ovr()
+    players = Player.views(roster, records['player_id'].tolist(), records['name'].tolist(),
+                           records['country'].tolist(), records['sab'].tolist())
+    return PlayerPool(roster, players, records['tier'].tolist())
+
+
+def parse_csv(text: str) -> np.ndarray:
+    """A players.csv's text as one record per row: the roster's skill and birth_ordinal columns, plus
+    player_id, name, country, sab and tier."""
+    rows = list(csv.DictReader(io.StringIO(text)))
+    arrays = {column: np.array([int(row[key]) for row in rows], dtype=np.int16) for key, column in CSV_SKILLS.items()}
+    births = np.array([row.get('birth_date') or DEFAULT_BIRTH_DATE for row in rows], dtype='datetime64[D]')
+    arrays['birth_ordinal'] = (births.astype(np.int64) + _EPOCH_ORDINAL).astype(np.int32)
+    arrays['player_id'] = np.array([int(row['player_id']) for row in rows], dtype=np.int64)
+    arrays['name'] = np.array([f"{row['first_name']} {row['last_name']}" for row in rows], dtype=str)
+    arrays['country'] = np.array([row['country'] for row in rows], dtype=str)
+    arrays['sab'] = np.array([row.get('sab') or DEFAULT_SAB for row in rows], dtype=str)
+    arrays['tier'] = np.array([row.get('tier', '') for row in rows], dtype=str)
+    records = np.empty(len(rows), dtype=[(name, array.dtype) for name, array in arrays.items()])
+    for name, array in arrays.items():
+        records[name] = array
+    return records
+
+
+# ----------------------------------------------------------------------
+# Snapshots
+# ----------------------------------------------------------------------
+# A snapshot is an uncompressed .npz of parse_csv's records ('players'), '_meta' (SNAPSHOT_VERSION and
+# the CSV's mtime_ns and size) and '_sha256' (the CSV's content hash); one record array keeps a load to
+# three array reads however many columns there are. The mtime/size check costs one stat; the hash is
+# only read when they differ, e.g. after a checkout touched an unchanged file.
+
+def snapshot_path(filename: str) -> str:
+    """The snapshot file of a CSV (named after its absolute path, so same-named CSVs don't collide)."""
+    path = os.path.abspath(filename)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(SNAPSHOT_FOLDER, f"{stem}_{hashlib.sha256(path.encode()).hexdigest()[:12]}.npz")
+
+
+def _load_records(path: str, signature: tuple[int, int]) -> np.ndarray:
+    """parse_csv's records for the CSV: from its snapshot when that is current, else parsed and snapshotted."""
+    snapshot = snapshot_path(path)
+    saved = _read_snapshot(snapshot)
+    if saved is not None:
+        records, (version, mtime_ns, size), digest = saved
+        if version == SNAPSHOT_VERSION:
+            if (mtime_ns, size) == signature:
+                return records
+            with open(path, 'rb') as f:
+                if hashlib.sha256(f.read()).hexdigest() == digest:
+                    _write_snapshot(snapshot, records, signature, digest)  # Record the new mtime
+                    return records
+
+    with open(path, 'rb') as f:
+        data = f.read()
+    records = parse_csv(data.decode('utf-8'))
+    _write_snapshot(snapshot, records, signature, hashlib.sha256(data).hexdigest())
+    return records
+
+
+def _read_snapshot(filename: str) -> tuple:
+    """(records, [version, mtime_ns, size], sha256) of a snapshot, or None if it is missing or unreadable."""
+    try:
+        with np.load(filename, allow_pickle=False) as data:
+            return data['players'], data['_meta'].tolist(), str(data['_sha256'])
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        return None
+
+
+def _write_snapshot(filename: str, records: np.ndarray, signature: tuple[int, int], digest: str):
+    """Writes through a per-process temporary file, so concurrent workers and interrupted saves can't
+    corrupt it. A snapshot is only a speed-up: if the folder isn't writable, loads parse the CSV."""
+    temporary = f"{filename}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(temporary, 'wb') as f:
+            np.savez(f, players=records, _meta=np.array([SNAPSHOT_VERSION, *signature], dtype=np.int64),
+                     _sha256=np.array(digest))
+        os.replace(temporary, filename)
+    except OSError:
+        pass
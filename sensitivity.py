@@ -0,0 +1,212 @@
+# sensitivity.py
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from tqdm import tqdm
+
+import simulation
+import roster_loader
+import stats_tracker
+from configs import simulation_config
+from rng_streams import StreamFactory, SELECTION_CHANNEL
+from sim_params import SimParams
+from variance_reduction import PointSyncObserver
+
+# --- SENSITIVITY CONFIGURATION ---
+PLAYER_DATA_FILE = roster_loader.PLAYER_DATA_FILE
+# The fixed matchup set: close (base OVR, opponent OVR) pairings, so win % can move either way. Players
+# within OVR_WINDOW of each OVR are drawn for every match; the base player is player1.
+MATCHUPS = [(93, 91), (79, 77), (60, 58), (40, 38)]
+OVR_WINDOW = 1
+MATCHES_PER_PAIRING = 200
+NUM_SETS = 3
+ROOT_SEED = 2024
+WORKERS = os.cpu_count() or 1
+SHARD_SIZE = 100  # Matches per task; every (perturbation, shard) task goes into one pool
+
+PERTURBATION = 0.10  # Each constant is moved up and down by this fraction of its value
+# Constants to perturb. DOUBLE_FAULT_TIERS is perturbed as a whole (every rate scaled together).
+CONSTANTS = ['VARIANCE_SIGMA_POINT', 'VARIANCE_SIGMA_FAULT', 'FSSR_BASELINE_FLOOR', 'FSSR_SA_WEIGHT',
+             'POWER_PENALTY_RATE', 'POWER_THRESHOLD', 'DOUBLE_FAULT_TIERS', 'CLUTCH_MODIFIER_RATE',
+             'ACE_CEILING_FACTOR', 'WEIGHTING_SERVE_SP', 'WEIGHTING_SERVE_SA', 'SHOT_QUALITY_CEILING',
+             'WEIGHTING_RALLY_GS_OFFENSE', 'WEIGHTING_RALLY_GS_DEFENSE', 'RALLY_SUCCESS_THRESHOLD',
+             'MATCH_STAMINA_SCALAR', 'RALLY_FATIGUE_SCALAR']
+# --- END CONFIGURATION ---
+
+# Output stats, each a ratio of per-match sums: name -> (numerator column, denominator column)
+STATS = {
+    'Win %': (0, 1),  # Base player's wins over matches
+    'Hold %': (2, 3),
+    'Ace %': (4, 5),  # Of all points
+    'Rally Length': (6, 7),
+}
+_PERCENT_STATS = {'Win %', 'Hold %', 'Ace %'}
+
+
+def perturbed(name: str, direction: int) -> dict:
+    """The override moving `name` by direction * PERTURBATION of its value (integers by at least 1)."""
+    value = getattr(simulation_config, name)
+    factor = 1 + direction * PERTURBATION
+    if isinstance(value, dict):
+        return {name: {key: rate * factor for key, rate in value.items()}}
+    if isinstance(value, int):
+        return {name: value + direction * max(1, round(abs(value) * PERTURBATION))}
+    return {name: value * factor}
+
+
+def _relative_step(name: str) -> float:
+    """The actual up-minus-down change of a perturbation, as a fraction of the value (integers round)."""
+    value = getattr(simulation_config, name)
+    if isinstance(value, int) and not isinstance(value, bool):
+        return 2 * max(1, round(abs(value) * PERTURBATION)) / abs(value)
+    return 2 * PERTURBATION
+
+
+# ----------------------------------------------------------------------
+# Simulation
+# ----------------------------------------------------------------------
+
+_players_by_ovr = None
+
+
+def _init_worker(player_data_file: str):
+    global _players_by_ovr
+    _players_by_ovr = roster_loader.load_players(player_data_file).by_ovr
+
+
+def matchup_players(ovr: int) -> list:
+    return [p for o in range(ovr - OVR_WINDOW, ovr + OVR_WINDOW + 1) for p in _players_by_ovr.get(o, [])]
+
+
+def run_shard(params: SimParams, first_unit: int, count: int, root_seed: int) -> np.ndarray:
+    """Per-match (count x 8) sums for units first_unit .. first_unit + count - 1 under params.
+
+    Unit u plays MATCHUPS[u // MATCHES_PER_PAIRING] on selection stream u and point-synced match stream u
+    (see rng_streams.PointSyncedStream), so every perturbation replays the same players and draws and a
+    match only diverges where the constant changes an outcome.
+    """
+    streams = StreamFactory(root_seed)
+    rows = np.zeros((count, 8))
+    for k, unit in enumerate(range(first_unit, first_unit + count)):
+        base_ovr, opponent_ovr = MATCHUPS[unit // MATCHES_PER_PAIRING]
+        selection = streams.stream(unit, SELECTION_CHANNEL)
+        p1 = selection.choice(matchup_players(base_ovr))
+        p2 = selection.choice(matchup_players(opponent_ovr))
+        while p2 is p1:
+            p2 = selection.choice(matchup_players(opponent_ovr))
+        rng = streams.synced_stream(unit)
+        winner, tracker = simulation.simulate_match(p1, p2, num_sets=NUM_SETS, verbose=False, rng=rng,
+                                                    observer=PointSyncObserver(rng), params=params)
+        c = tracker.counts
+        rows[k] = (winner is p1, 1,
+                   c[stats_tracker.SERVICE_GAMES_WON] + c[stats_tracker.SERVICE_GAMES_WON + 1],
+                   c[stats_tracker.SERVICE_GAMES_PLAYED] + c[stats_tracker.SERVICE_GAMES_PLAYED + 1],
+                   c[stats_tracker.ACES], tracker.total_points,
+                   tracker.sum_rally_lengths, tracker.total_rallies)
+    return rows
+
+
+def run_arms(arms: dict, workers: int = WORKERS, root_seed: int = ROOT_SEED) -> dict:
+    """{arm: per-match sums} for every {arm: SimParams}, all arms' shards sharing one process pool."""
+    units = len(MATCHUPS) * MATCHES_PER_PAIRING
+    shards = [(start, min(SHARD_SIZE, units - start)) for start in range(0, units, SHARD_SIZE)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(PLAYER_DATA_FILE,)) as pool:
+        futures = {arm: [pool.submit(run_shard, params, start, count, root_seed) for start, count in shards]
+                   for arm, params in arms.items()}
+        progress = tqdm(total=len(arms) * units, desc=f"Simulating {len(arms)} configs ({workers} workers)")
+        results = {}
+        for arm, arm_futures in futures.items():
+            parts = []
+            for future in arm_futures:
+                parts.append(future.result())
+                progress.update(len(parts[-1]))
+            results[arm] = np.vstack(parts)
+        progress.close()
+    return results
+
+
+# ----------------------------------------------------------------------
+# Estimates
+# ----------------------------------------------------------------------
+
+def ratio(rows: np.ndarray, stat: str) -> float:
+    numerator, denominator = STATS[stat]
+    return rows[:, numerator].sum() / rows[:, denominator].sum()
+
+
+def paired_difference(up: np.ndarray, down: np.ndarray, stat: str) -> tuple[float, float, float]:
+    """(ratio(up) - ratio(down), its standard error, the standard error independent samples of the same
+    size would have), by the delta method on the matched per-match rows.
+
+    Each match's linearized contribution to its arm's ratio is (N_i - R * D_i) / mean(D); pairing the
+    two arms' contributions match by match is what lets common random numbers cancel the noise.
+    """
+    numerator, denominator = STATS[stat]
+    influences = []
+    for rows in (up, down):
+        r = ratio(rows, stat)
+        influences.append((rows[:, numerator] - r * rows[:, denominator]) / rows[:, denominator].mean())
+    d = influences[0] - influences[1]
+    n = len(d)
+    unpaired = math.sqrt((influences[0].var(ddof=1) + influences[1].var(ddof=1)) / n)
+    return ratio(up, stat) - ratio(down, stat), float(d.std(ddof=1) / math.sqrt(n)), unpaired
+
+
+def sensitivities(constants: list[str] = None, workers: int = WORKERS) -> tuple[dict, dict]:
+    """Returns (base stats, {constant: {stat: (effect, std err, independent-sampling std err)}}), where
+    effect is the central-difference change in the stat per +PERTURBATION relative change in the constant."""
+    constants = constants or CONSTANTS
+    arms = {'base': SimParams()}
+    for name in constants:
+        arms[name, +1] = SimParams(perturbed(name, +1))
+        arms[name, -1] = SimParams(perturbed(name, -1))
+    results = run_arms(arms, workers)
+
+    base = {stat: ratio(results['base'], stat) for stat in STATS}
+    table = {}
+    for name in constants:
+        # Scale the up-minus-down difference to one PERTURBATION step
+        scale = PERTURBATION / _relative_step(name)
+        table[name] = {}
+        for stat in STATS:
+            difference, std_err, unpaired = paired_difference(results[name, +1], results[name, -1], stat)
+            table[name][stat] = (difference * scale, std_err * scale, unpaired * scale)
+    return base, table
+
+
+def _format(stat: str, value: float) -> str:
+    return f"{value * 100:+.2f}" if stat in _PERCENT_STATS else f"{value:+.3f}"
+
+
+def main():
+    """Prints the constant -> stat sensitivity table with 95% confidence intervals."""
+    print("=======================================================")
+    print(f"|  CONFIG SENSITIVITY (+/-{PERTURBATION:.0%}, {len(MATCHUPS) * MATCHES_PER_PAIRING} MATCHES PER CONFIG)  |")
+    print("=======================================================")
+    start = time.time()
+    base, table = sensitivities()
+    elapsed = time.time() - start
+
+    print(f"Base: " + " | ".join(f"{stat} {base[stat] * 100:.2f}" if stat in _PERCENT_STATS
+                                 else f"{stat} {base[stat]:.3f}" for stat in STATS))
+    print(f"\nChange per +{PERTURBATION:.0%} in the constant (percentage points for %; ± is the 95% CI; "
+          f"* = CI excludes 0):")
+    print(f"{'Constant':<28}" + "".join(f"{stat:>22}" for stat in STATS))
+    for name, effects in table.items():
+        cells = []
+        for stat in STATS:
+            effect, std_err, _ = effects[stat]
+            significant = "*" if abs(effect) > 1.96 * std_err else " "
+            cells.append(f"{_format(stat, effect)} ± {_format(stat, 1.96 * std_err)[1:]}{significant}")
+        print(f"{name:<28}" + "".join(f"{cell:>22}" for cell in cells))
+    factors = [(unpaired / std_err) ** 2 for effects in table.values() for _, std_err, unpaired in effects.values()
+               if std_err > 0]
+    print(f"\n{2 * len(table) + 1} configs in one parallel pass: {elapsed:.1f} seconds | common random numbers "
+          f"cut the variance x{np.median(factors):.1f} (median) against independent samples")
+
+
+if __name__ == '__main__':
+    main()
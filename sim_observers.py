@@ -0,0 +1,218 @@
+# sim_observers.py
+import json
+
+from configs.simulation_config import MAX_RALLY_LENGTH
+
+
+class SimulationObserver:
+    """Receives simulation events; subclass and override the ones you need (the rest are no-ops).
+
+    Pass an observer as simulation.simulate_match(..., observer=...). With no observer attached the
+    engine skips every hook, so console logs, file traces and live views cost nothing in batch runs.
+    """
+
+    def on_match_start(self, player1, player2):
+        pass
+
+    def on_set_start(self, player1, player2):
+        pass
+
+    def on_game_start(self, server, receiver):
+        pass
+
+    def on_tiebreak_start(self, player1, player2):
+        pass
+
+    def on_serve(self, server, receiver, serve_number: int, result: str, quality: float = None):
+        """result is 'Ace', 'Fault', 'Double Fault' or 'In'; quality is the serve's shot quality when 'In'."""
+        pass
+
+    def on_shot(self, returner, shot_number: int, success_chance: float, success: bool, quality: float = None):
+        """returner tried to return shot shot_number; quality is the shot they hit back on a success."""
+        pass
+
+    def on_point(self, server, receiver, point_data: dict, server_points: int, receiver_points: int,
+                 game_over: bool):
+        """After each game or tiebreak point, with the score (in points) from the server's side."""
+        pass
+
+    def on_game(self, server, receiver, winner):
+        pass
+
+    def on_set(self, player1, player2, winner):
+        pass
+
+    def on_match(self, player1, player2, winner):
+        pass
+
+
+class ObserverGroup(SimulationObserver):
+    """Forwards every event to several observers, in order."""
+
+    def __init__(self, *observers: SimulationObserver):
+        self.observers = observers
+
+
+def _forward(event: str):
+    def forward(self, *args, **kwargs):
+        for observer in self.observers:
+            getattr(observer, event)(*args, **kwargs)
+    return forward
+
+
+for _event in [name for name in vars(SimulationObserver) if name.startswith('on_')]:
+    setattr(ObserverGroup, _event, _forward(_event))
+
+
+class ConsoleObserver(SimulationObserver):
+    """The simulator's verbose console output: scores per game and set, plus a shot-by-shot point log."""
+
+    SCORE_MAP = {0: "0", 1: "15", 2: "30", 3: "40"}
+
+    def __init__(self, log_points: bool = True):
+        self.log_points = log_points
+        self.player1 = self.player2 = None
+        self.in_tiebreak = False
+
+    # --- Point log ---
+    def on_serve(self, server, receiver, serve_number, result, quality=None):
+        if not self.log_points:
+            return
+        if serve_number == 1:
+            print(f"\n===== NEW POINT: {server.name} SERVES =====")
+        if result == 'Fault':
+            print("-> CHECK: 1ST SERVE: FAULT")
+        elif result == 'In':
+            if serve_number == 2:
+                print("-> CHECK: 2ND SERVE: IN")
+            else:
+                print("-> CHECK: 1ST SERVE: IN")
+            print(f"--- RALLY START (Serve {serve_number} IN) ---")
+            print(f"STRIKER: {server.name} | ASQ: {quality:.2f}")
+        elif result == 'Ace' and serve_number == 2:
+            print("-> CHECK: 2ND SERVE: IN")
+
+    def on_shot(self, returner, shot_number, success_chance, success, quality=None):
+        if not self.log_points:
+            return
+        print(f"-> SHOT {shot_number} ({returner.name} returning): {success_chance:.2%} -> "
+              f"{'SUCCESS' if success else 'FAILURE'}")
+        if success:
+            print(f"STRIKER: {returner.name} | ASQ: {quality:.2f}")
+
+    def _log_point_win(self, server, point_data):
+        winner, outcome = point_data['winner'], point_data['outcome']
+        if outcome == 'Ace':
+            how = "Second Serve ACE" if point_data['first_serve_fault'] else "First Serve ACE"
+        elif (outcome == 'Forced Error' and point_data['rally_length'] >= MAX_RALLY_LENGTH
+              and (winner is server) == (MAX_RALLY_LENGTH % 2 == 1)):
+            # The cap goes to the last shot's returner (the server on odd shots); a miss on it to the other player
+            print(f"Rally has reached the {MAX_RALLY_LENGTH}-shot maximum length.")
+            how = "Rally Length Cap"
+        else:
+            how = outcome
+        print(f"*** POINT WIN: {winner.name} wins via {how}. ***")
+
+    # --- Scores ---
+    def on_set_start(self, player1, player2):
+        self.player1, self.player2 = player1, player2
+        print(f"\n------------------ STARTING NEW SET ------------------")
+
+    def on_game_start(self, server, receiver):
+        print(f"--- NEW GAME: {server.name} serving (Fatigue: {server.fatigue:.1f}) ---")
+
+    def on_tiebreak_start(self, player1, player2):
+        self.in_tiebreak = True
+        print("--- STARTING TIEBREAK ---")
+
+    def on_point(self, server, receiver, point_data, server_points, receiver_points, game_over):
+        if self.log_points:
+            self._log_point_win(server, point_data)
+
+        rally_length = point_data['rally_length']
+        if self.in_tiebreak:
+            if server is self.player1:
+                print(f"Tiebreak Score: {server_points}-{receiver_points}")
+            else:
+                print(f"Tiebreak Score: {receiver_points}-{server_points}")
+            return
+        if game_over:
+            return
+        if server_points >= 3 and receiver_points >= 3:
+            if server_points == receiver_points:
+                print(f"Score: Deuce (40-40) (Rally: {rally_length})")
+            elif server_points > receiver_points:
+                print(f"Score: Advantage {server.name} (Adv-40) (Rally: {rally_length})")
+            else:
+                print(f"Score: Advantage {receiver.name} (40-Adv) (Rally: {rally_length})")
+        else:
+            s_score, r_score = self.SCORE_MAP.get(server_points, "40"), self.SCORE_MAP.get(receiver_points, "40")
+            print(f"Score: ({s_score}-{r_score}) (Rally: {rally_length})")
+
+    def on_game(self, server, receiver, winner):
+        print(f"\n--- GAME WON BY: {winner.name} ---")
+        p1, p2 = self.player1, self.player2
+        if p1 is not None:
+            print(f"--> Set Score: {p1.name} {p1.games_won} - {p2.games_won} {p2.name}")
+
+    def on_set(self, player1, player2, winner):
+        self.in_tiebreak = False
+        print(f"--- SET WON BY: {winner.name} ({player1.games_won}-{player2.games_won}) ---")
+        print(f"\n==> Match Score: {player1.name} {player1.sets_won} - {player2.sets_won} {player2.name}")
+
+    def on_match(self, player1, player2, winner):
+        print("\n=======================================================")
+        print(f"| 🏆 MATCH COMPLETE! Winner is {winner.name} 🏆 |")
+        print(f"| Final Score: {player1.sets_won} - {player2.sets_won} |")
+        print("=======================================================")
+
+
+class TraceObserver(SimulationObserver):
+    """Writes every event to a file as one JSON object per line, for replaying or inspecting a match.
+
+    The file stays open across matches; close it with close() or by using the observer as a context manager.
+    """
+
+    def __init__(self, filename: str):
+        self.file = open(filename, 'w')
+
+    def _write(self, event: str, **fields):
+        self.file.write(json.dumps({'event': event, **fields}) + "\n")
+
+    def on_game_start(self, server, receiver):
+        self._write('game_start', server=server.name, receiver=receiver.name, server_fatigue=server.fatigue)
+
+    def on_tiebreak_start(self, player1, player2):
+        self._write('tiebreak_start')
+
+    def on_serve(self, server, receiver, serve_number, result, quality=None):
+        self._write('serve', server=server.name, serve_number=serve_number, result=result, quality=quality)
+
+    def on_shot(self, returner, shot_number, success_chance, success, quality=None):
+        self._write('shot', returner=returner.name, shot=shot_number, success_chance=success_chance,
+                    success=success, quality=quality)
+
+    def on_point(self, server, receiver, point_data, server_points, receiver_points, game_over):
+        self._write('point', server=server.name, winner=point_data['winner'].name,
+                    outcome=point_data['outcome'], rally_length=point_data['rally_length'],
+                    first_serve_fault=point_data['first_serve_fault'],
+                    score=[server_points, receiver_points])
+
+    def on_game(self, server, receiver, winner):
+        self._write('game', server=server.name, winner=winner.name)
+
+    def on_set(self, player1, player2, winner):
+        self._write('set', winner=winner.name, games=[player1.games_won, player2.games_won])
+
+    def on_match(self, player1, player2, winner):
+        self._write('match', winner=winner.name, sets=[player1.sets_won, player2.sets_won])
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,100 @@
+# sim_params.py
+from bisect import bisect_left
+
+import numpy as np
+
+from configs import simulation_config
+
+# The simulation_config constants the match engines read. MAX_RALLY_LENGTH is a rule rather than a
+# tuning constant (it also sizes StatsTracker's rally histogram), so it stays module-level with the
+# OVR weights and tier ranges.
+ENGINE_CONSTANTS = (
+    'VARIANCE_SIGMA_POINT', 'VARIANCE_SIGMA_FAULT', 'FSSR_BASELINE_FLOOR', 'FSSR_SA_WEIGHT',
+    'POWER_PENALTY_RATE', 'POWER_THRESHOLD', 'DOUBLE_FAULT_TIERS', 'CLUTCH_MODIFIER_RATE', 'MIN_DF_RATE',
+    'ACE_CEILING_FACTOR', 'MIN_DEF_FLOOR', 'WEIGHTING_SERVE_SP', 'WEIGHTING_SERVE_SA', 'SHOT_QUALITY_CEILING',
+    'WEIGHTING_RALLY_GS_OFFENSE', 'WEIGHTING_STR_OFFENSE', 'WEIGHTING_RALLY_GS_DEFENSE', 'WEIGHTING_REF_DEFENSE',
+    'RALLY_SUCCESS_THRESHOLD', 'MATCH_STAMINA_SCALAR', 'RALLY_FATIGUE_SCALAR', 'RALLY_FATIGUE_DIVISOR',
+)
+
+
+class SimParams:
+    """An immutable set of match-engine constants: one attribute per ENGINE_CONSTANTS name, in lower
+    case (VARIANCE_SIGMA_POINT -> params.variance_sigma_point).
+
+    SimParams() is the current simulation_config and SimParams({'RALLY_SUCCESS_THRESHOLD': 0.66})
+    overrides part of it. The engines take one as `params` (DEFAULT_PARAMS when left out), so several
+    configs can be simulated side by side in one process, on the same players and streams. Instances
+    compare and hash by value and pickle to worker processes. The double-fault tier lookup is built
+    once per instance, and players cache one PlayerProfile per instance (Player.profile_for).
+
+    jit_engine compiles the module constants into its kernels and only runs DEFAULT_PARAMS.
+    """
+
+    def __init__(self, overrides: dict = None):
+        overrides = overrides or {}
+        unknown = set(overrides) - set(ENGINE_CONSTANTS)
+        if unknown:
+            raise ValueError(f"Not a SimParams constant: {', '.join(sorted(unknown))}")
+        values = {name: overrides.get(name, getattr(simulation_config, name)) for name in ENGINE_CONSTANTS}
+        # Tiers are stored as ascending (serve accuracy threshold, rate) pairs, the order the lookup needs
+        values['DOUBLE_FAULT_TIERS'] = tuple(sorted(dict(values['DOUBLE_FAULT_TIERS']).items()))
+        for name, value in values.items():
+            object.__setattr__(self, name.lower(), value)
+
+        # Double-fault tier lookup: scalar (max_df_rate) and NumPy (batch_engine) forms
+        thresholds = tuple(threshold for threshold, _ in values['DOUBLE_FAULT_TIERS'])
+        rates = tuple(rate for _, rate in values['DOUBLE_FAULT_TIERS'])
+        threshold_array = np.array(thresholds, dtype=float)
+        rate_array = np.append(np.array(rates, dtype=float), 100.0)  # Past the last tier: 100%
+        threshold_array.flags.writeable = rate_array.flags.writeable = False
+        object.__setattr__(self, 'df_thresholds', thresholds)
+        object.__setattr__(self, 'df_rates', rates)
+        object.__setattr__(self, 'df_threshold_array', threshold_array)
+        object.__setattr__(self, 'df_rate_array', rate_array)
+
+        key = tuple(values.items())
+        object.__setattr__(self, '_key', key)
+        object.__setattr__(self, '_hash', hash(key))
+
+    def max_df_rate(self, serve_accuracy: float) -> float:
+        """The DOUBLE_FAULT_TIERS rate of the first tier whose threshold is >= serve_accuracy (100 past the last)."""
+        i = bisect_left(self.df_thresholds, serve_accuracy)
+        return self.df_rates[i] if i < len(self.df_rates) else 100.0
+
+    def constants(self) -> dict:
+        """{ENGINE_CONSTANTS name: value}, with DOUBLE_FAULT_TIERS as a dict like simulation_config's."""
+        return {name: dict(value) if name == 'DOUBLE_FAULT_TIERS' else value for name, value in self._key}
+
+    def overrides(self) -> dict:
+        """The constants that differ from the current simulation_config."""
+        return {name: value for name, value in self.constants().items()
+                if value != getattr(simulation_config, name)}
+
+    def with_overrides(self, overrides: dict) -> 'SimParams':
+        """A new SimParams: these constants with `overrides` applied on top."""
+        return SimParams({**self.constants(), **overrides})
+
+    def __setattr__(self, name, value):
+        raise AttributeError("SimParams is immutable; use with_overrides() for a changed copy")
+
+    def __delattr__(self, name):
+        raise AttributeError("SimParams is immutable")
+
+    def __eq__(self, other):
+        return isinstance(other, SimParams) and (self is other or self._key == other._key)
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        # DEFAULT_PARAMS unpickles as the receiving process's DEFAULT_PARAMS, keeping `is` checks valid
+        if self is DEFAULT_PARAMS:
+            return 'DEFAULT_PARAMS'
+        return SimParams, (self.constants(),)
+
+    def __repr__(self):
+        return f"SimParams({self.overrides()!r})"
+
+
+# The current simulation_config; every engine's default
+DEFAULT_PARAMS = SimParams()
@@ -1,212 +1,180 @@
 import random
 from players import Player
+from match_context import MatchContext, MatchPlayer
 from stats_tracker import StatsTracker
-from configs.simulation_config import (
-    VARIANCE_SIGMA_POINT, VARIANCE_SIGMA_FAULT, ACE_CEILING_FACTOR,
-    POWER_PENALTY_RATE, POWER_THRESHOLD, DOUBLE_FAULT_TIERS,
-    CLUTCH_MODIFIER_RATE, MIN_DF_RATE, FSSR_BASELINE_FLOOR, FSSR_SA_WEIGHT,
-    MIN_DEF_FLOOR, WEIGHTING_SERVE_SP, WEIGHTING_SERVE_SA,
-    WEIGHTING_RALLY_GS_OFFENSE, WEIGHTING_STR_OFFENSE,
-    WEIGHTING_RALLY_GS_DEFENSE, WEIGHTING_REF_DEFENSE,
-    RALLY_SUCCESS_THRESHOLD, SHOT_QUALITY_CEILING, MAX_RALLY_LENGTH,
-    RALLY_FATIGUE_SCALAR, RALLY_FATIGUE_DIVISOR
-)
+from sim_observers import ConsoleObserver
+from sim_params import SimParams, DEFAULT_PARAMS
+from configs.simulation_config import MAX_RALLY_LENGTH
+
+# simulate_match fidelity levels
+FIDELITY_POINT = "point"  # Every shot of every point
+FIDELITY_GAME = "game"  # One draw per game from precomputed hold probabilities (see fast_forward.py)
 
 
 # ----------------------------------------------------------------------
-# Core Skill Checks (Updated for Fatigue via .get_skill())
+# Core Skill Checks (table lookups into each player's PlayerProfile)
 # ----------------------------------------------------------------------
+# The _underscored versions take PlayerProfile rows directly so simulate_point can look each
+# player's fatigue level up once per point instead of once per check. Every function takes the
+# SimParams to simulate under (sim_params.py); the profiles must be the players' profiles for it.
 
-def serve_fault_check(server: Player) -> bool:
-    sa = server.get_skill('serve_accuracy')
-    sp = server.get_skill('serve_power')
-    sa_component = FSSR_BASELINE_FLOOR + (sa * FSSR_SA_WEIGHT)
-    power_difference = sp - POWER_THRESHOLD
-    power_penalty = power_difference * POWER_PENALTY_RATE
-    base_success_chance = sa_component - power_penalty
-    base_success_chance = max(1, min(99, base_success_chance))
-    actual_success_chance = random.gauss(mu=base_success_chance, sigma=VARIANCE_SIGMA_FAULT)
+def _serve_fault(server_level, rng, params) -> bool:
+    actual_success_chance = rng.gauss(mu=server_level.fault_chance, sigma=params.variance_sigma_fault)
     actual_success_chance = max(0.0, min(100.0, actual_success_chance))
-    return random.uniform(0, 100) > actual_success_chance
+    return rng.random() * 100 > actual_success_chance
 
 
-def second_serve_df_check(server: Player) -> bool:
-    sa = server.get_skill('serve_accuracy')
-    clt = server.clutch
-    max_df_rate = 100.0
-    for sa_threshold, df_rate in DOUBLE_FAULT_TIERS.items():
-        if sa <= sa_threshold:
-            max_df_rate = df_rate
-            break
-    clutch_modifier = (clt - 50) * CLUTCH_MODIFIER_RATE
-    df_rate_final = max_df_rate - clutch_modifier
-    df_rate_final = max(MIN_DF_RATE, min(99.0, df_rate_final))
-    return random.uniform(0, 100) < df_rate_final
-
-
-def serve_ace_check(server: Player, receiver: Player, is_second_serve: bool = False) -> bool:
-    sp = server.get_skill('serve_power')
-    sa = server.get_skill('serve_accuracy')
-    ref = receiver.get_skill('reflex')
-    server_attack_score = ((sp + sa) / 200.0) ** 2 * 100
-    receiver_defense_multiplier = max(MIN_DEF_FLOOR, (100.0 - ref) / 100.0)
-    ace_chance = server_attack_score * receiver_defense_multiplier * ACE_CEILING_FACTOR
+def _serve_ace(server_level, receiver_level, is_second_serve: bool, rng, params) -> bool:
+    ace_chance = server_level.ace_attack * receiver_level.ace_defense * params.ace_ceiling_factor
     if is_second_serve:
         ace_chance /= 5.0
     ace_chance = max(0.001, ace_chance)
-    return random.uniform(0, 100) < ace_chance
+    return rng.random() * 100 < ace_chance
 
 
-# ----------------------------------------------------------------------
-# Shot Quality & Rally Logic (Updated for Stamina/Fatigue)
-# ----------------------------------------------------------------------
-
-def calculate_rally_quality(striker: Player, rally_length: int) -> float:
-    gs = striker.get_skill('groundstroke')
-    strg = striker.strength
-    penalty_per_shot = (RALLY_FATIGUE_SCALAR - striker.stamina) / RALLY_FATIGUE_DIVISOR
-    rally_penalty = min(0.3, rally_length * penalty_per_shot)
-    bqs = (gs * WEIGHTING_RALLY_GS_OFFENSE) + (strg * WEIGHTING_STR_OFFENSE)
+def _rally_quality(profile, striker_level, rally_length: int, rng, params) -> float:
+    rally_penalty = min(0.3, rally_length * profile.rally_penalty_per_shot)
+    bqs = striker_level.offense
     bqs *= (1.0 - rally_penalty)
-    asq = random.gauss(mu=bqs, sigma=VARIANCE_SIGMA_POINT)
-    return max(1.0, min(SHOT_QUALITY_CEILING, asq))
+    asq = rng.gauss(bqs, params.variance_sigma_point)
+    return max(1.0, min(params.shot_quality_ceiling, asq))
 
 
-def calculate_serve_quality(server: Player, is_second_serve: bool = False) -> float:
-    sp = server.get_skill('serve_power')
-    sa = server.get_skill('serve_accuracy')
-    bqs = (sp * WEIGHTING_SERVE_SP) + (sa * WEIGHTING_SERVE_SA)
+def _serve_quality(server_level, is_second_serve: bool, rng, params) -> float:
+    bqs = server_level.serve_quality
     if is_second_serve:
         bqs *= 0.80
-    asq = random.gauss(mu=bqs, sigma=VARIANCE_SIGMA_POINT)
-    return max(1.0, min(SHOT_QUALITY_CEILING, asq))
+    asq = rng.gauss(bqs, params.variance_sigma_point)
+    return max(1.0, min(params.shot_quality_ceiling, asq))
+
+
+def _rally_success_chance(receiver_level, incoming_shot_quality: float, params) -> float:
+    skill_challenge = incoming_shot_quality - receiver_level.defense
+    success_chance = params.rally_success_threshold - (skill_challenge / params.shot_quality_ceiling)
+    return max(0.01, min(0.99, success_chance))
 
 
-def rally_success_check(receiver: Player, incoming_shot_quality: float) -> bool:
-    gs = receiver.get_skill('groundstroke')
-    ref = receiver.get_skill('reflex')
-    receiver_defensive_skill = (gs * WEIGHTING_RALLY_GS_DEFENSE) + (ref * WEIGHTING_REF_DEFENSE)
-    skill_challenge = incoming_shot_quality - receiver_defensive_skill
-    success_chance = RALLY_SUCCESS_THRESHOLD - (skill_challenge / SHOT_QUALITY_CEILING)
-    success_chance = max(0.01, min(0.99, success_chance))
-    setattr(receiver, 'last_success_chance', success_chance)
-    return random.random() < success_chance
+def serve_fault_check(server: Player, rng=random, params: SimParams = DEFAULT_PARAMS) -> bool:
+    return _serve_fault(server.profile_for(params).at(server.fatigue), rng, params)
+
+
+def second_serve_df_check(server: Player, rng=random, params: SimParams = DEFAULT_PARAMS) -> bool:
+    return rng.random() * 100 < server.profile_for(params).df_rate
+
+
+def serve_ace_check(server: Player, receiver: Player, is_second_serve: bool = False, rng=random,
+                    params: SimParams = DEFAULT_PARAMS) -> bool:
+    return _serve_ace(server.profile_for(params).at(server.fatigue),
+                      receiver.profile_for(params).at(receiver.fatigue), is_second_serve, rng, params)
 
 
 # ----------------------------------------------------------------------
-# Point Simulation Logic (Now returns a data dictionary)
+# Shot Quality & Rally Logic (Updated for Stamina/Fatigue)
 # ----------------------------------------------------------------------
 
-def simulate_point(server: Player, receiver: Player) -> dict:
-    """Simulates a single point, returning a dictionary of data."""
-    current_striker, current_receiver = server, receiver
-    first_serve_fault = False
+def calculate_rally_quality(striker: Player, rally_length: int, rng=random,
+                            params: SimParams = DEFAULT_PARAMS) -> float:
+    profile = striker.profile_for(params)
+    return _rally_quality(profile, profile.at(striker.fatigue), rally_length, rng, params)
 
-    if serve_ace_check(current_striker, current_receiver, is_second_serve=False):
-        return {'winner': current_striker, 'rally_length': 0, 'outcome': 'Ace', 'first_serve_fault': False}
 
-    if not serve_fault_check(current_striker):
-        first_serve_fault = True
-        if second_serve_df_check(current_striker):
-            return {'winner': current_receiver, 'rally_length': 0, 'outcome': 'Double Fault', 'first_serve_fault': True}
-        if serve_ace_check(current_striker, current_receiver, is_second_serve=True):
-            return {'winner': current_striker, 'rally_length': 0, 'outcome': 'Ace', 'first_serve_fault': True}
-        incoming_shot_quality = calculate_serve_quality(current_striker, is_second_serve=True)
-    else:
-        incoming_shot_quality = calculate_serve_quality(current_striker, is_second_serve=False)
+def calculate_serve_quality(server: Player, is_second_serve: bool = False, rng=random,
+                            params: SimParams = DEFAULT_PARAMS) -> float:
+    return _serve_quality(server.profile_for(params).at(server.fatigue), is_second_serve, rng, params)
 
-    current_striker, current_receiver = current_receiver, current_striker
-    rally_length = 0
-    while True:
-        rally_length += 1
-        if not rally_success_check(current_receiver, incoming_shot_quality):
-            return {'winner': current_striker, 'rally_length': rally_length, 'outcome': 'Forced Error',
-                    'first_serve_fault': first_serve_fault}
 
-        new_shot_quality = calculate_rally_quality(current_receiver, rally_length)
-        current_striker, current_receiver = current_receiver, current_striker
-        incoming_shot_quality = new_shot_quality
+def rally_success_check(receiver: Player, incoming_shot_quality: float, rng=random,
+                        params: SimParams = DEFAULT_PARAMS) -> bool:
+    success_chance = _rally_success_chance(receiver.profile_for(params).at(receiver.fatigue), incoming_shot_quality,
+                                           params)
+    return rng.random() < success_chance
 
-        if rally_length >= MAX_RALLY_LENGTH:
-            return {'winner': current_striker, 'rally_length': rally_length, 'outcome': 'Forced Error',
-                    'first_serve_fault': first_serve_fault}
 
+# ----------------------------------------------------------------------
+# Point Simulation Logic (Now returns a data dictionary)
+# ----------------------------------------------------------------------
+# Every simulate_* function takes an optional SimulationObserver (see sim_observers.py). Hooks are
+# guarded by `observer is not None`, so the hook-free path costs one comparison per event site.
+
+def _play_point(server: Player, server_profile, server_level, receiver: Player, receiver_profile, receiver_level,
+                rng, observer, params) -> tuple[Player, int, str, bool]:
+    """The point engine: returns (winner, rally_length, outcome, first_serve_fault).
 
-def simulate_point_logged(server: Player, receiver: Player) -> dict:
-    """Simulates a point with logging, returning a dictionary of data."""
-    log = []
-    current_striker, current_receiver = server, receiver
+    Takes each player's profile and the table row for their fatigue (fixed for the whole point), so
+    callers that track fatigue themselves can skip the Player attribute reads.
+    """
     first_serve_fault = False
-    log.append(f"\n===== NEW POINT: {server.name} SERVES =====")
 
-    if serve_ace_check(current_striker, current_receiver, is_second_serve=False):
-        log.append(f"*** POINT WIN: {current_striker.name} wins via First Serve ACE. ***")
-        print('\n'.join(log))
-        return {'winner': current_striker, 'rally_length': 0, 'outcome': 'Ace', 'first_serve_fault': False}
+    if _serve_ace(server_level, receiver_level, False, rng, params):
+        if observer is not None:
+            observer.on_serve(server, receiver, 1, 'Ace')
+        return server, 0, 'Ace', False
 
-    if not serve_fault_check(current_striker):
-        log.append(f"-> CHECK: 1ST SERVE: FAULT")
+    if not _serve_fault(server_level, rng, params):
         first_serve_fault = True
-        if second_serve_df_check(current_striker):
-            log.append(f"*** POINT WIN: {current_receiver.name} wins via Double Fault. ***")
-            print('\n'.join(log))
-            return {'winner': current_receiver, 'rally_length': 0, 'outcome': 'Double Fault', 'first_serve_fault': True}
-        log.append(f"-> CHECK: 2ND SERVE: IN")
-        is_second_serve = True
-        if serve_ace_check(current_striker, current_receiver, is_second_serve=True):
-            log.append(f"*** POINT WIN: {current_striker.name} wins via Second Serve ACE. ***")
-            print('\n'.join(log))
-            return {'winner': current_striker, 'rally_length': 0, 'outcome': 'Ace', 'first_serve_fault': True}
-        incoming_shot_quality = calculate_serve_quality(current_striker, is_second_serve=True)
+        if observer is not None:
+            observer.on_serve(server, receiver, 1, 'Fault')
+        if rng.random() * 100 < server_profile.df_rate:
+            if observer is not None:
+                observer.on_serve(server, receiver, 2, 'Double Fault')
+            return receiver, 0, 'Double Fault', True
+        if _serve_ace(server_level, receiver_level, True, rng, params):
+            if observer is not None:
+                observer.on_serve(server, receiver, 2, 'Ace')
+            return server, 0, 'Ace', True
+        incoming_shot_quality = _serve_quality(server_level, True, rng, params)
     else:
-        log.append(f"-> CHECK: 1ST SERVE: IN")
-        is_second_serve = False
-        incoming_shot_quality = calculate_serve_quality(current_striker, is_second_serve=False)
+        incoming_shot_quality = _serve_quality(server_level, False, rng, params)
+    if observer is not None:
+        observer.on_serve(server, receiver, 2 if first_serve_fault else 1, 'In', incoming_shot_quality)
 
-    log.append(f"--- RALLY START (Serve {1 if not is_second_serve else 2} IN) ---")
-    log.append(f"STRIKER: {current_striker.name} | ASQ: {incoming_shot_quality:.2f}")
-    current_striker, current_receiver = current_receiver, current_striker
+    # (player, profile, level) of the striker and the player returning the shot
+    current_striker = (receiver, receiver_profile, receiver_level)
+    current_receiver = (server, server_profile, server_level)
     rally_length = 0
     while True:
         rally_length += 1
-        if not rally_success_check(current_receiver, incoming_shot_quality):
-            success_chance = getattr(current_receiver, 'last_success_chance')
-            log.append(f"-> SHOT {rally_length} ({current_receiver.name} returning): {success_chance:.2%} -> FAILURE")
-            log.append(f"*** POINT WIN: {current_striker.name} wins via Forced Error. ***")
-            print('\n'.join(log))
-            return {'winner': current_striker, 'rally_length': rally_length, 'outcome': 'Forced Error',
-                    'first_serve_fault': first_serve_fault}
-
-        success_chance = getattr(current_receiver, 'last_success_chance')
-        log.append(f"-> SHOT {rally_length} ({current_receiver.name} returning): {success_chance:.2%} -> SUCCESS")
-        new_shot_quality = calculate_rally_quality(current_receiver, rally_length)
+        success_chance = _rally_success_chance(current_receiver[2], incoming_shot_quality, params)
+        if not rng.random() < success_chance:
+            if observer is not None:
+                observer.on_shot(current_receiver[0], rally_length, success_chance, False)
+            return current_striker[0], rally_length, 'Forced Error', first_serve_fault
+
+        new_shot_quality = _rally_quality(current_receiver[1], current_receiver[2], rally_length, rng, params)
+        if observer is not None:
+            observer.on_shot(current_receiver[0], rally_length, success_chance, True, new_shot_quality)
         current_striker, current_receiver = current_receiver, current_striker
         incoming_shot_quality = new_shot_quality
-        log.append(f"STRIKER: {current_striker.name} | ASQ: {incoming_shot_quality:.2f}")
 
         if rally_length >= MAX_RALLY_LENGTH:
-            log.append(f"Rally has reached the {MAX_RALLY_LENGTH}-shot maximum length.")
-            log.append(f"*** POINT WIN: {current_striker.name} wins via Rally Length Cap. ***")
-            print('\n'.join(log))
-            return {'winner': current_striker, 'rally_length': rally_length, 'outcome': 'Forced Error',
-                    'first_serve_fault': first_serve_fault}
+            return current_striker[0], rally_length, 'Forced Error', first_serve_fault
 
 
-def simulate_point_wrapper(server, receiver):
-    return simulate_point(server, receiver)
+def simulate_point(server: Player, receiver: Player, rng=random, observer=None,
+                   params: SimParams = DEFAULT_PARAMS) -> dict:
+    """Simulates a single point, returning a dictionary of data."""
+    server_profile, receiver_profile = server.profile_for(params), receiver.profile_for(params)
+    winner, rally_length, outcome, first_serve_fault = _play_point(
+        server, server_profile, server_profile.at(server.fatigue),
+        receiver, receiver_profile, receiver_profile.at(receiver.fatigue), rng, observer, params)
+    return {'winner': winner, 'rally_length': rally_length, 'outcome': outcome, 'first_serve_fault': first_serve_fault}
 
 
 # ----------------------------------------------------------------------
 # Game, Set, and Match Simulation (with Tiebreak and StatsTracker)
 # ----------------------------------------------------------------------
+# point_model is any callable with simulate_point's signature, e.g. point_cache.PointCache.simulate_point;
+# it is called with the match's SimParams as its fifth argument. Below simulate_match, players are the
+# MatchPlayers of its MatchContext (match_context.py), which hold the fatigue and score the match changes.
 
-def simulate_tiebreak(player1: Player, player2: Player, initial_server_index: int, tracker: StatsTracker,
-                      verbose: bool = True) -> Player:
+def simulate_tiebreak(player1: MatchPlayer, player2: MatchPlayer, initial_server_index: int, tracker: StatsTracker,
+                      rng=random, observer=None, point_model=simulate_point,
+                      params: SimParams = DEFAULT_PARAMS) -> MatchPlayer:
     """Simulates a single tiebreak to 7 points, win by two."""
     tracker.record_tiebreak()
     p1_points, p2_points = 0, 0
-    if verbose:
-        print("--- STARTING TIEBREAK ---")
+    if observer is not None:
+        observer.on_tiebreak_start(player1, player2)
 
     point_num = 1
     total_rally_length = 0
@@ -222,7 +190,7 @@ def simulate_tiebreak(player1: Player, player2: Player, initial_server_index: in
 
         receiver = player1 if server == player2 else player2
 
-        point_data = simulate_point_wrapper(server, receiver)
+        point_data = point_model(server, receiver, rng, observer, params)
 
         # --- CORRECTED LINE ---
         # Pass the 'server' object along with the point_data
@@ -235,12 +203,17 @@ def simulate_tiebreak(player1: Player, player2: Player, initial_server_index: in
         else:
             p2_points += 1
 
-        if verbose:
-            print(f"Tiebreak Score: {p1_points}-{p2_points}")
-
         # Check for win condition
-        if (p1_points >= 7 and p1_points >= p2_points + 2) or \
-                (p2_points >= 7 and p2_points >= p1_points + 2):
+        is_over = (p1_points >= 7 and p1_points >= p2_points + 2) or \
+                  (p2_points >= 7 and p2_points >= p1_points + 2)
+
+        if observer is not None:
+            if server is player1:
+                observer.on_point(server, receiver, point_data, p1_points, p2_points, is_over)
+            else:
+                observer.on_point(server, receiver, point_data, p2_points, p1_points, is_over)
+
+        if is_over:
             break
 
         point_num += 1
@@ -251,14 +224,15 @@ def simulate_tiebreak(player1: Player, player2: Player, initial_server_index: in
     return player1 if p1_points > p2_points else player2
 
 
-def simulate_game(server: Player, receiver: Player, tracker: StatsTracker, verbose: bool = True) -> Player:
+def simulate_game(server: MatchPlayer, receiver: MatchPlayer, tracker: StatsTracker, rng=random, observer=None,
+                  point_model=simulate_point, params: SimParams = DEFAULT_PARAMS) -> MatchPlayer:
     """Simulates a full game of tennis, including fatigue accumulation."""
-    score_map = {0: "0", 1: "15", 2: "30", 3: "40"}
     server_points, receiver_points = 0, 0
-    if verbose: print(f"--- NEW GAME: {server.name} serving (Fatigue: {server.fatigue:.1f}) ---")
+    if observer is not None:
+        observer.on_game_start(server, receiver)
 
     while True:
-        point_data = simulate_point_wrapper(server, receiver)
+        point_data = point_model(server, receiver, rng, observer, params)
 
         # --- CORRECTED LINE ---
         # Pass the 'server' object along with the point_data to the tracker.
@@ -275,67 +249,179 @@ def simulate_game(server: Player, receiver: Player, tracker: StatsTracker, verbo
         is_game_over = (server_points >= 4 and server_points >= receiver_points + 2) or \
                        (receiver_points >= 4 and receiver_points >= server_points + 2)
 
-        if verbose and not is_game_over:
-            if server_points >= 3 and receiver_points >= 3:
-                if server_points == receiver_points:
-                    score_string = f"Score: Deuce (40-40) (Rally: {rally_length})"
-                elif server_points > receiver_points:
-                    score_string = f"Score: Advantage {server.name} (Adv-40) (Rally: {rally_length})"
-                else:
-                    score_string = f"Score: Advantage {receiver.name} (40-Adv) (Rally: {rally_length})"
-            else:
-                s_score, r_score = score_map.get(server_points, "40"), score_map.get(receiver_points, "40")
-                score_string = f"Score: ({s_score}-{r_score}) (Rally: {rally_length})"
-            print(score_string)
+        if observer is not None:
+            observer.on_point(server, receiver, point_data, server_points, receiver_points, is_game_over)
 
         if is_game_over: break
 
     game_winner = server if server_points > receiver_points else receiver
     tracker.record_service_game(server, game_winner)
 
-    if verbose: print(f"\n--- GAME WON BY: {game_winner.name} ---")
     game_winner.games_won += 1
+    if observer is not None:
+        observer.on_game(server, receiver, game_winner)
     return game_winner
 
 
-def simulate_set(player1: Player, player2: Player, initial_server_index: int, tracker: StatsTracker,
-                 verbose: bool = True) -> Player:
+def simulate_set(player1: MatchPlayer, player2: MatchPlayer, initial_server_index: int, tracker: StatsTracker,
+                 rng=random, observer=None, point_model=simulate_point,
+                 params: SimParams = DEFAULT_PARAMS) -> MatchPlayer:
     player1.games_won, player2.games_won = 0, 0
     server_index = initial_server_index
-    if verbose: print(f"\n------------------ STARTING NEW SET ------------------")
+    if observer is not None:
+        observer.on_set_start(player1, player2)
     while True:
         if (player1.games_won >= 6 and player1.games_won >= player2.games_won + 2) or (
                 player2.games_won >= 6 and player2.games_won >= player1.games_won + 2):
             break
         if player1.games_won == 6 and player2.games_won == 6:
-            tiebreak_winner = simulate_tiebreak(player1, player2, server_index, tracker, verbose)
+            tiebreak_winner = simulate_tiebreak(player1, player2, server_index, tracker, rng, observer, point_model,
+                                                params)
             tiebreak_winner.games_won += 1
             break
         server, receiver = (player1, player2) if server_index == 0 else (player2, player1)
-        game_winner = simulate_game(server, receiver, tracker, verbose=verbose)
-        if verbose: print(f"--> Set Score: {player1.name} {player1.games_won} - {player2.games_won} {player2.name}")
+        simulate_game(server, receiver, tracker, rng, observer, point_model, params)
         server_index = 1 - server_index
     set_winner = player1 if player1.games_won > player2.games_won else player2
     tracker.record_set(player1.games_won, player2.games_won)
-    if verbose: print(f"--- SET WON BY: {set_winner.name} ({player1.games_won}-{player2.games_won}) ---")
     set_winner.sets_won += 1
+    if observer is not None:
+        observer.on_set(player1, player2, set_winner)
     return set_winner
 
 
-def simulate_match(player1: Player, player2: Player, num_sets: int = 3, verbose: bool = True) -> tuple[
-    Player, StatsTracker]:
+def simulate_match(player1: Player, player2: Player, num_sets: int = 3, verbose: bool = True, rng=random,
+                   observer=None, point_model=simulate_point, fidelity: str = FIDELITY_POINT,
+                   params: SimParams = DEFAULT_PARAMS) -> tuple[Player, StatsTracker]:
+    """Simulates a full match. rng is the `random` module or an rng_streams.MatchStream.
+
+    verbose prints game and set scores (a sim_observers.ConsoleObserver without the point log) unless
+    an observer is given; point_model replaces simulate_point, e.g. with a point_cache.PointCache.
+    FIDELITY_GAME fast-forwards a game at a time (fast_forward.simulate_match_games; no point stats).
+    params is the SimParams to simulate under.
+
+    Both players start rested and are left untouched: the match is played on a fresh MatchContext, so
+    the same players can be in other matches at the same time. Returns the winning Player; the
+    tracker's p1 and p2 are the MatchPlayers, holding each side's final fatigue and sets_won.
+    """
+    if verbose and observer is None:
+        observer = ConsoleObserver(log_points=False)
+    if fidelity == FIDELITY_GAME:
+        import fast_forward
+        return fast_forward.simulate_match_games(player1, player2, num_sets, rng, observer, params=params)
+    context = MatchContext(player1, player2, params)
+    player1, player2 = context.player1, context.player2
     tracker = StatsTracker(player1, player2)
-    player1.sets_won, player2.sets_won = 0, 0
     server_index = 0
     sets_to_win = (num_sets // 2) + 1
+    if observer is not None:
+        observer.on_match_start(player1, player2)
     while player1.sets_won < sets_to_win and player2.sets_won < sets_to_win:
-        set_winner = simulate_set(player1, player2, server_index, tracker, verbose=verbose)
-        if verbose: print(f"\n==> Match Score: {player1.name} {player1.sets_won} - {player2.sets_won} {player2.name}")
+        simulate_set(player1, player2, server_index, tracker, rng, observer, point_model, params)
         server_index = 1 - server_index
     match_winner = player1 if player1.sets_won == sets_to_win else player2
-    if verbose:
-        print("\n=======================================================")
-        print(f"| 🏆 MATCH COMPLETE! Winner is {match_winner.name} 🏆 |")
-        print(f"| Final Score: {player1.sets_won} - {player2.sets_won} |")
-        print("=======================================================")
-    return match_winner, tracker
\ No newline at end of file
+    if observer is not None:
+        observer.on_match(player1, player2, match_winner)
+    return match_winner.player, tracker
+
+
+# ----------------------------------------------------------------------
+# Result-Only Fast Mode (score state only: no StatsTracker, no point dicts)
+# ----------------------------------------------------------------------
+# Both players start rested and gain the same fatigue from every rally, so these track one running
+# count of rally shots since the match started (`shots`), which is both players' fatigue. The rules,
+# fatigue timing and rng draws match simulate_match exactly, so a seeded run gives the same result.
+
+def _fast_tiebreak(player1: MatchPlayer, p1_profile, player2: MatchPlayer, p2_profile, initial_server_index: int,
+                   shots: int, rng, params) -> tuple[bool, int]:
+    """simulate_tiebreak's score logic: returns (player1 won, shots after the tiebreak)."""
+    p1_level, p2_level = p1_profile.at(shots), p2_profile.at(shots)
+    p1_points, p2_points = 0, 0
+    point_num = 1
+    total_rally_length = 0
+    while True:
+        if point_num == 1 or (point_num - 2) % 4 >= 2:
+            p1_serves = initial_server_index == 0
+        else:
+            p1_serves = initial_server_index != 0
+        if p1_serves:
+            winner, rally_length, _, _ = _play_point(player1, p1_profile, p1_level, player2, p2_profile, p2_level,
+                                                     rng, None, params)
+        else:
+            winner, rally_length, _, _ = _play_point(player2, p2_profile, p2_level, player1, p1_profile, p1_level,
+                                                     rng, None, params)
+        total_rally_length += rally_length
+        if winner is player1:
+            p1_points += 1
+        else:
+            p2_points += 1
+        if (p1_points >= 7 and p1_points >= p2_points + 2) or (p2_points >= 7 and p2_points >= p1_points + 2):
+            return p1_points > p2_points, shots + total_rally_length  # Tiebreak fatigue lands at the end
+        point_num += 1
+
+
+def _fast_game(server: MatchPlayer, server_profile, receiver: MatchPlayer, receiver_profile, shots: int, rng,
+               params) -> tuple[bool, int]:
+    """simulate_game's score logic: returns (server held, shots after the game)."""
+    server_points, receiver_points = 0, 0
+    while True:
+        winner, rally_length, _, _ = _play_point(server, server_profile, server_profile.at(shots),
+                                                 receiver, receiver_profile, receiver_profile.at(shots), rng, None,
+                                                 params)
+        shots += rally_length
+        if winner is server:
+            server_points += 1
+            if server_points >= 4 and server_points >= receiver_points + 2:
+                return True, shots
+        else:
+            receiver_points += 1
+            if receiver_points >= 4 and receiver_points >= server_points + 2:
+                return False, shots
+
+
+def simulate_match_result(player1: Player, player2: Player, num_sets: int = 3, rng=random,
+                          params: SimParams = DEFAULT_PARAMS) -> tuple[Player, tuple[int, int]]:
+    """simulate_match without statistics: returns (winner, (player1 sets, player2 sets)).
+
+    For sweeps that only need the result. Like simulate_match, it starts both players rested and
+    leaves them untouched.
+    """
+    context = MatchContext(player1, player2, params)
+    player1, player2 = context.player1, context.player2
+    p1_profile, p2_profile = player1.profile, player2.profile
+    shots = 0
+    p1_sets, p2_sets = 0, 0
+    server_index = 0
+    sets_to_win = (num_sets // 2) + 1
+    while p1_sets < sets_to_win and p2_sets < sets_to_win:
+        p1_games, p2_games = 0, 0
+        game_server = server_index
+        while True:
+            if (p1_games >= 6 and p1_games >= p2_games + 2) or (p2_games >= 6 and p2_games >= p1_games + 2):
+                break
+            if p1_games == 6 and p2_games == 6:
+                p1_won, shots = _fast_tiebreak(player1, p1_profile, player2, p2_profile, game_server, shots, rng,
+                                               params)
+                if p1_won:
+                    p1_games += 1
+                else:
+                    p2_games += 1
+                break
+            if game_server == 0:
+                held, shots = _fast_game(player1, p1_profile, player2, p2_profile, shots, rng, params)
+                p1_won = held
+            else:
+                held, shots = _fast_game(player2, p2_profile, player1, p1_profile, shots, rng, params)
+                p1_won = not held
+            if p1_won:
+                p1_games += 1
+            else:
+                p2_games += 1
+            game_server = 1 - game_server
+        if p1_games > p2_games:
+            p1_sets += 1
+        else:
+            p2_sets += 1
+        server_index = 1 - server_index
+
+    return (player1 if p1_sets == sets_to_win else player2).player, (p1_sets, p2_sets)
@@ -1,29 +1,43 @@
 # stats_tracker.py
 from players import Player
-from collections import defaultdict
+from configs.simulation_config import MAX_RALLY_LENGTH
+
+# Index of each per-player counter in StatsTracker.counts; add the player's index (0 = player1,
+# 1 = player2), e.g. counts[SERVICE_GAMES_WON + 1] is player2's holds.
+POINTS_WON = 0
+SERVES_ATTEMPTED = 2
+FIRST_SERVE_FAULTS = 4
+SECOND_SERVE_POINTS_FACED = 6
+FIRST_SERVE_POINTS_WON = 8
+SECOND_SERVE_POINTS_WON = 10
+SERVICE_GAMES_PLAYED = 12
+SERVICE_GAMES_WON = 14
+# Match-wide counters
+ACES = 16
+DOUBLE_FAULTS = 17
+FORCED_ERRORS = 18
+NUM_COUNTERS = 19
+
+OUTCOME_COUNTERS = {'Ace': ACES, 'Double Fault': DOUBLE_FAULTS, 'Forced Error': FORCED_ERRORS}
 
 
 class StatsTracker:
-    """A class to accumulate and calculate statistics for a single match."""
+    """A class to accumulate and calculate statistics for a single match.
+
+    The two players are indexed 0 (player1) and 1 (player2), so players who share a name keep separate
+    stats. All counters live in the fixed-size `counts` list and rally lengths in `rally_histogram`
+    (rally_histogram[n] is the number of n-shot rallies), so recording a point allocates nothing.
+    """
 
     def __init__(self, player1: Player, player2: Player):
         self.p1 = player1
         self.p2 = player2
 
-        self.total_points = 0  # <-- ADD THIS LINE
-        self.points_won = defaultdict(int)
-        self.rally_lengths = []
-        self.outcomes = defaultdict(int)
-
-        self.serves_attempted = defaultdict(int)
-        self.first_serve_faults = defaultdict(int)
-        self.second_serve_points_faced = defaultdict(int)
-
-        self.first_serve_points_won = defaultdict(int)
-        self.second_serve_points_won = defaultdict(int)
-
-        self.service_games_played = defaultdict(int)
-        self.service_games_won = defaultdict(int)
+        self.total_points = 0
+        self.counts = [0] * NUM_COUNTERS
+        self.rally_histogram = [0] * (MAX_RALLY_LENGTH + 1)
+        self.total_rallies = 0  # Points with at least one rally shot
+        self.sum_rally_lengths = 0
 
         self.games_per_set = []
         self.tiebreaks_played = 0
@@ -31,33 +45,39 @@ class StatsTracker:
 
     def record_point(self, server: Player, point_data: dict):
         """Records the outcome of a single point."""
-        self.total_points += 1  # <-- ADD THIS LINE
-        winner = point_data['winner']
+        self.total_points += 1
+        counts = self.counts
+        s = 0 if server is self.p1 else 1
+        server_won = point_data['winner'] is server
         outcome = point_data['outcome']
+        rally_length = point_data['rally_length']
 
-        self.points_won[winner.name] += 1
-        self.outcomes[outcome] += 1
-        self.longest_rally = max(self.longest_rally, point_data['rally_length'])
-        if point_data['rally_length'] > 0:
-            self.rally_lengths.append(point_data['rally_length'])
+        counts[POINTS_WON + (s if server_won else 1 - s)] += 1
+        counts[OUTCOME_COUNTERS[outcome]] += 1
+        if rally_length > 0:
+            self.rally_histogram[rally_length] += 1
+            self.total_rallies += 1
+            self.sum_rally_lengths += rally_length
+            if rally_length > self.longest_rally:
+                self.longest_rally = rally_length
 
         # Track serve-specific stats
         if outcome != "Double Fault":
-            self.serves_attempted[server.name] += 1
+            counts[SERVES_ATTEMPTED + s] += 1
             if not point_data['first_serve_fault']:  # 1st serve was in
-                if winner == server:
-                    self.first_serve_points_won[server.name] += 1
+                if server_won:
+                    counts[FIRST_SERVE_POINTS_WON + s] += 1
             else:  # 2nd serve was in
-                self.first_serve_faults[server.name] += 1
-                self.second_serve_points_faced[server.name] += 1
-                if winner == server:
-                    self.second_serve_points_won[server.name] += 1
+                counts[FIRST_SERVE_FAULTS + s] += 1
+                counts[SECOND_SERVE_POINTS_FACED + s] += 1
+                if server_won:
+                    counts[SECOND_SERVE_POINTS_WON + s] += 1
 
-    # ... (the rest of the file is unchanged) ...
     def record_service_game(self, server: Player, winner: Player):
-        self.service_games_played[server.name] += 1
-        if server == winner:
-            self.service_games_won[server.name] += 1
+        s = 0 if server is self.p1 else 1
+        self.counts[SERVICE_GAMES_PLAYED + s] += 1
+        if winner is server:
+            self.counts[SERVICE_GAMES_WON + s] += 1
 
     def record_set(self, p1_games, p2_games):
         self.games_per_set.append(p1_games + p2_games)
@@ -65,30 +85,43 @@ class StatsTracker:
     def record_tiebreak(self):
         self.tiebreaks_played += 1
 
+    def outcome_count(self, outcome: str) -> int:
+        """Points that ended in `outcome` ('Ace', 'Double Fault' or 'Forced Error')."""
+        return self.counts[OUTCOME_COUNTERS[outcome]]
+
+    def first_serves_in(self, player_index: int) -> int:
+        return self.counts[SERVES_ATTEMPTED + player_index] - self.counts[FIRST_SERVE_FAULTS + player_index]
+
     def calculate_summary(self) -> dict:
         """Calculates final summary statistics for the match."""
         if self.total_points == 0: return {}
 
+        c = self.counts
         p1_name, p2_name = self.p1.name, self.p2.name
-
-        p1_fs_in = self.serves_attempted[p1_name] - self.first_serve_faults[p1_name]
-        p2_fs_in = self.serves_attempted[p2_name] - self.first_serve_faults[p2_name]
+        if p1_name == p2_name:  # Keep both players' rows in the summary
+            p1_name, p2_name = f"{p1_name} (P1)", f"{p2_name} (P2)"
 
         summary = {
             "Total Points": self.total_points,
-            "Avg Rally Length": f"{(sum(self.rally_lengths) / len(self.rally_lengths)):.2f}" if self.rally_lengths else "0.00",
+            "Avg Rally Length": f"{(self.sum_rally_lengths / self.total_rallies):.2f}" if self.total_rallies else "0.00",
             "Longest Rally": self.longest_rally,
             "Tiebreaks Played": self.tiebreaks_played,
             "Avg Games per Set": f"{(sum(self.games_per_set) / len(self.games_per_set)):.2f}" if self.games_per_set else "0.00",
-            f"{p1_name} Hold %": f"{(self.service_games_won[p1_name] / self.service_games_played[p1_name] * 100):.1f}%" if
-            self.service_games_played[p1_name] > 0 else "N/A",
-            f"{p2_name} Hold %": f"{(self.service_games_won[p2_name] / self.service_games_played[p2_name] * 100):.1f}%" if
-            self.service_games_played[p2_name] > 0 else "N/A",
-            f"{p1_name} 1st Srv Win %": f"{(self.first_serve_points_won[p1_name] / p1_fs_in * 100):.1f}%" if p1_fs_in > 0 else "N/A",
-            f"{p2_name} 1st Srv Win %": f"{(self.first_serve_points_won[p2_name] / p2_fs_in * 100):.1f}%" if p2_fs_in > 0 else "N/A",
-            f"{p1_name} 2nd Srv Win %": f"{(self.second_serve_points_won[p1_name] / self.second_serve_points_faced[p1_name] * 100):.1f}%" if
-            self.second_serve_points_faced[p1_name] > 0 else "N/A",
-            f"{p2_name} 2nd Srv Win %": f"{(self.second_serve_points_won[p2_name] / self.second_serve_points_faced[p2_name] * 100):.1f}%" if
-            self.second_serve_points_faced[p2_name] > 0 else "N/A",
         }
-        return summary
\ No newline at end of file
+        for stat, stat_format in (("Hold %", self._hold_pct), ("1st Srv Win %", self._first_serve_pct),
+                                  ("2nd Srv Win %", self._second_serve_pct)):
+            summary[f"{p1_name} {stat}"] = stat_format(0)
+            summary[f"{p2_name} {stat}"] = stat_format(1)
+        return summary
+
+    def _hold_pct(self, i: int) -> str:
+        played = self.counts[SERVICE_GAMES_PLAYED + i]
+        return f"{(self.counts[SERVICE_GAMES_WON + i] / played * 100):.1f}%" if played > 0 else "N/A"
+
+    def _first_serve_pct(self, i: int) -> str:
+        fs_in = self.first_serves_in(i)
+        return f"{(self.counts[FIRST_SERVE_POINTS_WON + i] / fs_in * 100):.1f}%" if fs_in > 0 else "N/A"
+
+    def _second_serve_pct(self, i: int) -> str:
+        faced = self.counts[SECOND_SERVE_POINTS_FACED + i]
+        return f"{(self.counts[SECOND_SERVE_POINTS_WON + i] / faced * 100):.1f}%" if faced > 0 else "N/A"
@@ -3,8 +3,7 @@
 import random
 from players import Player
 import simulation # Import the whole module
-from simulation import simulate_point_logged
-from stats_tracker import StatsTracker
+from sim_observers import ConsoleObserver
 
 TIER_RANGES = {
     "Elite": (86, 100),
@@ -36,14 +35,8 @@ def create_player(name: str, tier: str) -> Player:
     # The Player class now handles the OVR calculation automatically
     return Player(name=name, **skills)
 
-# Helper function to simulate a point, using the logging version
-def simulate_point_wrapper(server, receiver):
-    return simulate_point_logged(server, receiver)
-
 # single match simulation to review line by line
 if __name__ == "__main__":
-    simulation.simulate_point_wrapper = simulation.simulate_point_logged
-
     player_A = create_player("Rafael Nadal (Pro)", "Pro")
     player_B = create_player("Roger Federer (Pro)", "Pro")
 
@@ -58,10 +51,11 @@ if __name__ == "__main__":
         player_A,
         player_B,
         num_sets=5,
-        verbose=True
+        observer=ConsoleObserver(log_points=True)
     )
 
     # After the match, display the final stats
     if match_tracker:
-        match_tracker.display_summary()
+        for stat, value in match_tracker.calculate_summary().items():
+            print(f"- {stat}: {value}")
 
@@ -1,14 +1,21 @@
-import csv
-import random
 import time
 import os
 from datetime import datetime
-from collections import defaultdict
+import numpy as np
 from tqdm import tqdm
 
 import simulation
+import batch_engine
+import point_cache
+import point_store
+import results_store
+import roster_loader
 from players import Player
 from stats_tracker import StatsTracker
+from match_aggregate import MatchAggregate
+from rng_streams import StreamFactory, SELECTION_CHANNEL
+from sim_params import SimParams, DEFAULT_PARAMS
+from adaptive_sampling import SequentialEstimate
 
 # --- SIMULATION CONFIGURATION ---
 # Define folder structure and file paths
@@ -19,40 +26,42 @@ VERBOSE_LOG_FOLDER = "verboselog"
 PLAYER_DATA_FILE = os.path.join(DATA_FOLDER, "players.csv")
 NUM_SETS = 3
 SIMULATIONS_PER_MATCHUP = 5000
+ENGINE = "python"  # "python" for simulation.simulate_match, "vectorized" for batch_engine lanes
+WORKERS = 1  # >1 shards the "python" engine across a process pool (see parallel_batch.py)
+ROOT_SEED = None  # Set to an int to reproduce a run exactly; None picks a fresh seed
+POINT_MODEL = "exact"  # "exact" plays every rally shot by shot, "cached" samples points from point_cache
+STORE_POINTS = False  # Also save every point of the "python" engine's matches (2 bytes each, see point_store.py)
+RESULTS_FORMAT = "auto"  # Match log: "auto" (Parquet, else compressed .npz parts), "parquet", "npz" or "csv"
 
+# Adaptive sample sizing: play each pairing in chunks and stop once the 95% CI of the first tier's
+# win rate is narrow enough. SIMULATIONS_PER_MATCHUP becomes the per-pairing maximum.
+ADAPTIVE = False
+TARGET_CI_HALF_WIDTH = 0.02  # Stop once the win rate is known to within +/- this
+ADAPTIVE_MIN_MATCHES = 500
+ADAPTIVE_CHUNK = 250
 
-# --- END CONFIGURATION ---
+# Arm comparison: set COMPARE_OVERRIDES to simulation_config overrides (see sim_params.SimParams) to
+# compare them with the current config on every tier pairing instead of running the batch, using
+# variance_reduction.py. SIMULATIONS_PER_MATCHUP becomes the sampling units per pairing and arm.
+COMPARE_OVERRIDES = None  # e.g. {'RALLY_SUCCESS_THRESHOLD': 0.66}; None runs the normal batch
+COMPARE_COMMON_RANDOM_NUMBERS = True  # Replay the same streams in both arms
+COMPARE_ANTITHETIC = False  # Pair every match with its mirrored-stream twin
+COMPARE_CONTROL_VARIATE = True  # Adjust by the analytic win probability of each match's players
+COMPARE_MAX_PAIRINGS = 200  # Player pairings sampled per tier pairing (each costs one analytic control)
 
 
-def load_players_from_csv(filename: str) -> dict:
-    """Loads players from a CSV and groups them by tier."""
-    players_by_tier = defaultdict(list)
-    try:
-        with open(filename, 'r', newline='') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                player = Player(
-                    player_id=int(row['player_id']),
-                    name=f"{row['first_name']} {row['last_name']}", country=row['country'],
-                    sp=int(row['sp']), sa=int(row['sa']), gs=int(row['gs']),
-                    ref=int(row['ref']), sta=int(row['sta']), strg=int(row['strg']), clt=int(row['clt'])
-                )
-                players_by_tier[row['tier']].append(player)
-    except FileNotFoundError:
-        print(f"Error: Player data file not found at '{filename}'.")
-        return {}
-    return players_by_tier
+# --- END CONFIGURATION ---
 
 
 def main():
     """Main function to run the batch simulation and generate results."""
-    simulation.simulate_point_wrapper = simulation.simulate_point
+    point_model = resolve_point_model(POINT_MODEL)
 
     # Create output directories if they don't exist
     os.makedirs(SIM_STATS_FOLDER, exist_ok=True)
     os.makedirs(VERBOSE_LOG_FOLDER, exist_ok=True)
 
-    players_by_tier = load_players_from_csv(PLAYER_DATA_FILE)
+    players_by_tier = roster_loader.load_players(PLAYER_DATA_FILE).by_tier
     if not players_by_tier:
         return
 
@@ -62,124 +71,210 @@ def main():
         for j in range(i, len(tiers)):
             matchups_to_run.append((tiers[i], tiers[j]))
 
+    streams = StreamFactory(ROOT_SEED)
+    if COMPARE_OVERRIDES is not None:
+        run_comparison(players_by_tier, matchups_to_run, streams)
+        return
+
     all_results = []
+    parallel_results = None
+    if WORKERS > 1 and ENGINE == "python":
+        import parallel_batch
+        parallel_results = parallel_batch.run_matchups(matchups_to_run, streams.root_seed, WORKERS,
+                                                       shard_size=ADAPTIVE_CHUNK if ADAPTIVE else
+                                                       parallel_batch.SHARD_SIZE)
     start_time = time.time()
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
 
-    # Set up the detailed CSV log file
-    csv_filename = os.path.join(VERBOSE_LOG_FOLDER, f"match_results_log_{timestamp}.csv")
-    csv_header = ['match_id', 'p1_id', 'p1_tier', 'p2_id', 'p2_tier', 'winner_id', 'final_score', 'num_sets_played']
+    # Set up the detailed match log (see results_store.py for the formats)
+    log_base = os.path.join(VERBOSE_LOG_FOLDER, f"match_results_log_{timestamp}")
+    # root_seed, stream_index and point_model are what replay.py needs to regenerate a match
+    csv_header = ['match_id', 'p1_id', 'p1_tier', 'p2_id', 'p2_tier', 'winner_id', 'final_score', 'num_sets_played',
+                  'root_seed', 'stream_index', 'point_model']
 
-    with open(csv_filename, 'w', newline='') as csvfile:
-        csv_writer = csv.DictWriter(csvfile, fieldnames=csv_header)
-        csv_writer.writeheader()
-        match_id_counter = 1
+    points_filename = os.path.join(SIM_STATS_FOLDER, f"points_{timestamp}.pts")
+    store_points = STORE_POINTS and ENGINE == "python"
+    point_writer = point_store.PointStoreWriter(points_filename) if store_points else None
+    recorder = point_store.PointRecorder() if store_points else None
 
+    with results_store.open_sink(RESULTS_FORMAT, log_base, csv_header) as sink:
         print("=======================================================")
         print(f"|  STARTING BATCH SIMULATION ({SIMULATIONS_PER_MATCHUP} MATCHES PER PAIRING)  |")
         print("=======================================================")
 
-        for tier1, tier2 in matchups_to_run:
+        total_matches = 0
+        for matchup_index, (tier1, tier2) in enumerate(matchups_to_run):
             matchup_key = f"{tier1} vs. {tier2}"
-            agg_stats = defaultdict(float)
-
-            for _ in tqdm(range(SIMULATIONS_PER_MATCHUP), desc=f"Simulating {matchup_key}"):
-                p1_obj = random.choice(players_by_tier[tier1])
-                p2_obj = random.choice(players_by_tier[tier2])
-
-                # This defines the name variables needed for stats aggregation
-                p1_name, p2_name = p1_obj.name, p2_obj.name
-
-                winner, tracker = simulation.simulate_match(p1_obj, p2_obj, num_sets=NUM_SETS, verbose=False)
-
-                csv_writer.writerow({
-                    'match_id': match_id_counter, 'p1_id': p1_obj.id, 'p1_tier': tier1,
-                    'p2_id': p2_obj.id, 'p2_tier': tier2, 'winner_id': winner.id,
-                    'final_score': f"{p1_obj.sets_won}-{p2_obj.sets_won}" if winner.id == p1_obj.id else f"{p2_obj.sets_won}-{p1_obj.sets_won}",
-                    'num_sets_played': p1_obj.sets_won + p2_obj.sets_won
-                })
-                match_id_counter += 1
-
-                if winner.name == p1_name:
-                    agg_stats[f'{tier1}_wins'] += 1
-                else:
-                    agg_stats[f'{tier2}_wins'] += 1
-
-                # Aggregate all stats
-                agg_stats['total_points'] += tracker.total_points
-                agg_stats['sum_rally_lengths'] += sum(tracker.rally_lengths)
-                agg_stats['total_rallies'] += len(tracker.rally_lengths)
-                agg_stats['longest_rally'] = max(agg_stats['longest_rally'], tracker.longest_rally)
-                agg_stats['tiebreaks'] += tracker.tiebreaks_played
-                agg_stats['total_sets'] += len(tracker.games_per_set)
-                agg_stats['total_games'] += sum(tracker.games_per_set)
-                agg_stats['aces'] += tracker.outcomes.get('Ace', 0)
-                agg_stats['double_faults'] += tracker.outcomes.get('Double Fault', 0)
-                agg_stats['total_serves_attempted'] += sum(tracker.serves_attempted.values())
-                agg_stats['total_first_serve_faults'] += sum(tracker.first_serve_faults.values())
-                agg_stats[f'{tier1}_service_games_played'] += tracker.service_games_played.get(p1_name, 0)
-                agg_stats[f'{tier2}_service_games_played'] += tracker.service_games_played.get(p2_name, 0)
-                agg_stats[f'{tier1}_service_games_won'] += tracker.service_games_won.get(p1_name, 0)
-                agg_stats[f'{tier2}_service_games_won'] += tracker.service_games_won.get(p2_name, 0)
-                agg_stats[f'{tier1}_1st_serves_in'] += tracker.serves_attempted.get(p1_name,
-                                                                                    0) - tracker.first_serve_faults.get(
-                    p1_name, 0)
-                agg_stats[f'{tier2}_1st_serves_in'] += tracker.serves_attempted.get(p2_name,
-                                                                                    0) - tracker.first_serve_faults.get(
-                    p2_name, 0)
-                agg_stats[f'{tier1}_1st_serve_won'] += tracker.first_serve_points_won.get(p1_name, 0)
-                agg_stats[f'{tier2}_1st_serve_won'] += tracker.first_serve_points_won.get(p2_name, 0)
-                agg_stats[f'{tier1}_2nd_serves_faced'] += tracker.second_serve_points_faced.get(p1_name, 0)
-                agg_stats[f'{tier2}_2nd_serves_faced'] += tracker.second_serve_points_faced.get(p2_name, 0)
-                agg_stats[f'{tier1}_2nd_serve_won'] += tracker.second_serve_points_won.get(p1_name, 0)
-                agg_stats[f'{tier2}_2nd_serve_won'] += tracker.second_serve_points_won.get(p2_name, 0)
-
-            # Calculate final stats for the matchup
-            total_matches = SIMULATIONS_PER_MATCHUP
-            final_stats = {
-                "Matchup": matchup_key,
-                f"{tier1} Win %": f"{(agg_stats[f'{tier1}_wins'] / total_matches) * 100:.1f}%",
-                f"{tier2} Win %": f"{(agg_stats[f'{tier2}_wins'] / total_matches) * 100:.1f}%",
-                "1st Serve In %": f"{((agg_stats['total_serves_attempted'] - agg_stats['total_first_serve_faults']) / agg_stats['total_serves_attempted']) * 100:.1f}%" if
-                agg_stats['total_serves_attempted'] > 0 else "N/A",
-                "Ace % (of all points)": f"{(agg_stats['aces'] / agg_stats['total_points']) * 100:.2f}%" if agg_stats[
-                                                                                                                'total_points'] > 0 else "N/A",
-                "Double Fault % (of all points)": f"{(agg_stats['double_faults'] / agg_stats['total_points']) * 100:.2f}%" if
-                agg_stats['total_points'] > 0 else "N/A",
-                "Avg Match Duration (Points)": f"{agg_stats['total_points'] / total_matches:.1f}",
-                "Avg Games / Set": f"{agg_stats['total_games'] / agg_stats['total_sets']:.2f}" if agg_stats[
-                                                                                                      'total_sets'] > 0 else "0",
-                "Avg Rally Length": f"{agg_stats['sum_rally_lengths'] / agg_stats['total_rallies']:.2f}" if agg_stats[
-                                                                                                                'total_rallies'] > 0 else "0",
-                "Longest Rally (in any match)": int(agg_stats['longest_rally']),
-                "Tiebreak %": f"{(agg_stats['tiebreaks'] / agg_stats['total_sets']) * 100:.1f}%" if agg_stats[
-                                                                                                        'total_sets'] > 0 else "0.0%",
-                f"{tier1} Hold %": f"{(agg_stats[f'{tier1}_service_games_won'] / agg_stats[f'{tier1}_service_games_played'] * 100):.1f}%" if
-                agg_stats[f'{tier1}_service_games_played'] > 0 else "N/A",
-                f"{tier2} Hold %": f"{(agg_stats[f'{tier2}_service_games_won'] / agg_stats[f'{tier2}_service_games_played'] * 100):.1f}%" if
-                agg_stats[f'{tier2}_service_games_played'] > 0 else "N/A",
-                f"{tier1} 1st Srv Win %": f"{(agg_stats[f'{tier1}_1st_serve_won'] / agg_stats[f'{tier1}_1st_serves_in'] * 100):.1f}%" if
-                agg_stats[f'{tier1}_1st_serves_in'] > 0 else "N/A",
-                f"{tier2} 1st Srv Win %": f"{(agg_stats[f'{tier2}_1st_serve_won'] / agg_stats[f'{tier2}_1st_serves_in'] * 100):.1f}%" if
-                agg_stats[f'{tier2}_1st_serves_in'] > 0 else "N/A",
-                f"{tier1} 2nd Srv Win %": f"{(agg_stats[f'{tier1}_2nd_serve_won'] / agg_stats[f'{tier1}_2nd_serves_faced'] * 100):.1f}%" if
-                agg_stats[f'{tier1}_2nd_serves_faced'] > 0 else "N/A",
-                f"{tier2} 2nd Srv Win %": f"{(agg_stats[f'{tier2}_2nd_serve_won'] / agg_stats[f'{tier2}_2nd_serves_faced'] * 100):.1f}%" if
-                agg_stats[f'{tier2}_2nd_serves_faced'] > 0 else "N/A",
-            }
+            # Each pairing owns a block of match ids, so ids don't depend on where earlier pairings stopped
+            first_match_id = matchup_index * SIMULATIONS_PER_MATCHUP + 1
+
+            if parallel_results is not None:
+                aggregate, rows, estimate, points = next(parallel_results)
+                sink.write_rows(rows)
+                for match_id, p1_id, p2_id, codes in points:
+                    point_writer.add_match(match_id, p1_id, p2_id, codes, NUM_SETS)
+            else:
+                aggregate = MatchAggregate()
+                estimate = new_estimate()
+                chunk_size = ADAPTIVE_CHUNK if ADAPTIVE else SIMULATIONS_PER_MATCHUP
+                progress = tqdm(total=SIMULATIONS_PER_MATCHUP, desc=f"Simulating {matchup_key}")
+                while not estimate.done():
+                    chunk_start = first_match_id + estimate.matches
+                    count = estimate.next_chunk(chunk_size)
+                    if ENGINE == "vectorized":
+                        p1_wins = run_vectorized_matchup(players_by_tier, tier1, tier2, sink, aggregate,
+                                                         chunk_start, count, streams)
+                    else:
+                        p1_wins = 0
+                        for match_id in range(chunk_start, chunk_start + count):
+                            row, p1_obj, p2_obj, winner, tracker = play_match(players_by_tier, tier1, tier2,
+                                                                              match_id, streams, point_model,
+                                                                              recorder)
+                            sink.write_row(row)
+                            if point_writer is not None:
+                                point_writer.add_match(match_id, p1_obj.id, p2_obj.id, recorder.codes, NUM_SETS)
+                            aggregate.add_tracker(tracker, winner is p1_obj)
+                            p1_wins += winner is p1_obj
+                    estimate.add(p1_wins, count)
+                    progress.update(count)
+                progress.close()
+
+            total_matches += estimate.matches
+            final_stats = aggregate.summary(tier1, tier2)
+            if ADAPTIVE:
+                final_stats["Matches Simulated"] = estimate.matches
+                final_stats["P1 Win % (95% CI)"] = estimate.describe()
             all_results.append(final_stats)
 
+    if point_writer is not None:
+        point_writer.close()
+
     # Generate final output
     output_string = "\n".join(
-        generate_output_string(all_results, len(matchups_to_run) * SIMULATIONS_PER_MATCHUP, time.time() - start_time))
+        generate_output_string(all_results, total_matches, time.time() - start_time))
     print(output_string)
 
     output_filename = os.path.join(SIM_STATS_FOLDER, f"simulation_summary_{timestamp}.txt")
     with open(output_filename, 'w') as f:
         f.write(output_string)
 
+    if POINT_MODEL == "cached" and parallel_results is None:
+        print(f"\nPoint cache: {point_cache.DEFAULT_CACHE.stats()}")
     print(f"\nSummary report saved to '{output_filename}'")
-    print(f"Detailed match log saved to '{csv_filename}'")
+    print(f"Detailed match log saved to '{sink.path}'")
+    if point_writer is not None:
+        print(f"Point data saved to '{points_filename}'")
+
+
+def new_estimate() -> SequentialEstimate:
+    """The stopping rule for one pairing: adaptive, or a fixed SIMULATIONS_PER_MATCHUP matches."""
+    return SequentialEstimate(TARGET_CI_HALF_WIDTH if ADAPTIVE else 0.0, ADAPTIVE_MIN_MATCHES,
+                              SIMULATIONS_PER_MATCHUP)
+
+
+def resolve_point_model(point_model: str):
+    """The simulate_match point_model for a POINT_MODEL setting."""
+    if point_model == "cached":
+        return point_cache.DEFAULT_CACHE.simulate_point
+    return simulation.simulate_point
+
+
+def play_match(players_by_tier: dict, tier1: str, tier2: str, match_id: int,
+               streams: StreamFactory, point_model=simulation.simulate_point, observer=None,
+               params: SimParams = DEFAULT_PARAMS) -> tuple[dict, Player, Player, Player, StatsTracker]:
+    """Picks and simulates match `match_id` of a tier pairing; returns its log row and results.
+
+    Both the player pick and the match use streams derived from the match id, and players start
+    fresh, so a match's outcome doesn't depend on which process runs it or in what order, and
+    replay.py can regenerate it from the row's root_seed and stream_index. params is the SimParams to
+    play under; replaying the same match id under several configs gives them the same players and draws.
+    """
+    selection = streams.stream(match_id, SELECTION_CHANNEL)
+    p1_obj = selection.choice(players_by_tier[tier1])
+    p2_obj = selection.choice(players_by_tier[tier2])
+
+    winner, tracker = simulation.simulate_match(p1_obj, p2_obj, num_sets=NUM_SETS, verbose=False,
+                                                rng=streams.stream(match_id), observer=observer,
+                                                point_model=point_model, params=params)
+    p1_sets, p2_sets = tracker.p1.sets_won, tracker.p2.sets_won
+    row = {
+        'match_id': match_id, 'p1_id': p1_obj.id, 'p1_tier': tier1,
+        'p2_id': p2_obj.id, 'p2_tier': tier2, 'winner_id': winner.id,
+        'final_score': f"{p1_sets}-{p2_sets}" if p1_sets > p2_sets else f"{p2_sets}-{p1_sets}",
+        'num_sets_played': p1_sets + p2_sets,
+        'root_seed': streams.root_seed, 'stream_index': match_id,
+        'point_model': "exact" if point_model is simulation.simulate_point else "cached"
+    }
+    return row, p1_obj, p2_obj, winner, tracker
+
+
+def run_vectorized_matchup(players_by_tier: dict, tier1: str, tier2: str, sink, aggregate: MatchAggregate,
+                           first_match_id: int, count: int, streams: StreamFactory,
+                           params: SimParams = DEFAULT_PARAMS) -> int:
+    """Runs `count` matches of a tier pairing as one batch_engine call, folds them into the aggregate
+    and the match log sink, and returns the first tier's wins.
+
+    The players come from the chunk's selection stream and the lanes from one seed derived from the
+    root seed and first_match_id, so a seeded run is reproducible like the "python" engine's.
+    """
+    selection = streams.stream(first_match_id, SELECTION_CHANNEL)
+    p1_list = [selection.choice(players_by_tier[tier1]) for _ in range(count)]
+    p2_list = [selection.choice(players_by_tier[tier2]) for _ in range(count)]
+    seed = streams.seed(first_match_id)
+    res = batch_engine.simulate_player_matches(p1_list, p2_list, num_sets=NUM_SETS, seed=seed, params=params)
+
+    for i, (p1_obj, p2_obj) in enumerate(zip(p1_list, p2_list)):
+        sink.write_row({
+            'match_id': first_match_id + i, 'p1_id': p1_obj.id, 'p1_tier': tier1,
+            'p2_id': p2_obj.id, 'p2_tier': tier2, 'winner_id': p2_obj.id if res.winner[i] else p1_obj.id,
+            'final_score': res.final_score(i), 'num_sets_played': int(res.sets_played[i]),
+            # The chunk's batch seed; lanes share its generator, so single matches can't be replayed
+            'root_seed': seed, 'stream_index': '', 'point_model': "vectorized"
+        })
+
+    aggregate.add_batch(res)
+    return count - int(res.winner.sum())
+
+
+def run_comparison(players_by_tier: dict, matchups: list[tuple[str, str]], streams: StreamFactory):
+    """Compares the current config with COMPARE_OVERRIDES on every tier pairing and saves the report.
+
+    Each pairing's arms play the same sample of player pairings, and the pairing takes its own block of
+    stream indices as in the batch, so with common random numbers both arms see the same players and draws.
+    """
+    import variance_reduction
+
+    overrides_params = SimParams(COMPARE_OVERRIDES)
+    start_time = time.time()
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    lines = [
+        "=======================================================",
+        "|          VARIANCE-REDUCED CONFIG COMPARISON         |",
+        "=======================================================",
+        f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        f"Arm A: current config | Arm B: overrides {COMPARE_OVERRIDES}",
+        f"Root seed: {streams.root_seed}",
+    ]
+    for matchup_index, (tier1, tier2) in enumerate(matchups):
+        pairings = [(p1, p2) for p1 in players_by_tier[tier1] for p2 in players_by_tier[tier2] if p1 is not p2]
+        if len(pairings) > COMPARE_MAX_PAIRINGS:
+            rng = np.random.default_rng([streams.root_seed, matchup_index])
+            pairings = [pairings[k] for k in sorted(rng.choice(len(pairings), COMPARE_MAX_PAIRINGS, replace=False))]
+        res = variance_reduction.compare_arms(
+            variance_reduction.Arm(f"{tier1} vs {tier2} (A)", pairings),
+            variance_reduction.Arm(f"{tier1} vs {tier2} (B)", pairings, overrides_params),
+            SIMULATIONS_PER_MATCHUP, streams.root_seed, COMPARE_COMMON_RANDOM_NUMBERS, COMPARE_ANTITHETIC,
+            COMPARE_CONTROL_VARIATE, NUM_SETS, first_index=matchup_index * SIMULATIONS_PER_MATCHUP + 1)
+        lines.append(f"\n--- {tier1} vs {tier2} ({len(pairings)} player pairings) ---")
+        lines.extend(variance_reduction.describe_comparison(res, "Current config", "Overrides"))
+    lines.insert(5, f"Execution Time: {time.time() - start_time:.2f} seconds")
+
+    output_string = "\n".join(lines)
+    print(output_string)
+    output_filename = os.path.join(SIM_STATS_FOLDER, f"comparison_summary_{timestamp}.txt")
+    with open(output_filename, 'w') as f:
+        f.write(output_string)
+    print(f"\nComparison report saved to '{output_filename}'")
 
 
 def generate_output_string(all_results, total_sims, exec_time):
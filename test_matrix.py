@@ -1,11 +1,14 @@
-import csv
 import random
 import os
-from collections import defaultdict
 from tqdm import tqdm
 
 import simulation
+import batch_engine
+import jit_engine
+import roster_loader
+import win_probability
 from players import Player
+from adaptive_sampling import SequentialEstimate
 
 # --- CONFIGURATION ---
 PLAYER_DATA_FILE = os.path.join("data", "players.csv")
@@ -13,40 +16,24 @@ BASE_OVR = 80  # The OVR of the player we are testing
 TESTING_RANGE = 5  # Test against OVRs +/- this amount (e.g., 80 vs 75, 80 vs 76...)
 SIMULATIONS_PER_PAIRING = 5000  # Number of matches per OVR pairing
 NUM_SETS = 3  # 3 for standard, 5 for Grand Slam
+ENGINE = "python"  # "python" (simulate_match), "vectorized" (batch_engine), "jit" (jit_engine) or "analytic"
+JIT_BACKEND = "auto"  # jit_engine backend: "auto"/"numba" fall back to "python" when Numba isn't installed
 
+# Adaptive sample sizing (see test_batch.py): SIMULATIONS_PER_PAIRING becomes the maximum
+ADAPTIVE = False
+TARGET_CI_HALF_WIDTH = 0.02
+ADAPTIVE_MIN_MATCHES = 500
+ADAPTIVE_CHUNK = 250
 
-# --- END CONFIGURATION ---
-
-def load_all_players(filename: str) -> list[Player]:
-    """Loads a flat list of all Player objects from the specified CSV file."""
-    players = []
-    try:
-        with open(filename, 'r', newline='') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                players.append(Player(
-                    player_id=int(row['player_id']),
-                    name=f"{row['first_name']} {row['last_name']}", country=row['country'],
-                    sp=int(row['sp']), sa=int(row['sa']), gs=int(row['gs']),
-                    ref=int(row['ref']), sta=int(row['sta']), strg=int(row['strg']), clt=int(row['clt'])
-                ))
-    except FileNotFoundError:
-        print(f"Error: Player data file not found at '{filename}'.")
-    return players
 
+# --- END CONFIGURATION ---
 
 def main():
     """Main function to run the OVR matchup matrix simulation."""
-    simulation.simulate_point_wrapper = simulation.simulate_point
-
-    all_players = load_all_players(PLAYER_DATA_FILE)
-    if not all_players:
+    players_by_ovr = roster_loader.load_players(PLAYER_DATA_FILE).by_ovr
+    if not players_by_ovr:
         return
 
-    players_by_ovr = defaultdict(list)
-    for p in all_players:
-        players_by_ovr[p.overall].append(p)
-
     opponent_ovrs = range(BASE_OVR - TESTING_RANGE, BASE_OVR + TESTING_RANGE + 1)
     all_results = []
 
@@ -58,8 +45,8 @@ def main():
     for opp_ovr in opponent_ovrs:
         matchup_key = f"{BASE_OVR} OVR vs. {opp_ovr} OVR"
 
-        base_players = players_by_ovr[BASE_OVR]
-        opp_players = players_by_ovr[opp_ovr]
+        base_players = players_by_ovr.get(BASE_OVR, [])
+        opp_players = players_by_ovr.get(opp_ovr, [])
 
         if not base_players or not opp_players:
             print(f"Skipping {matchup_key}: Not enough players with the required OVR in players.csv.")
@@ -70,33 +57,64 @@ def main():
             print(f"Skipping {matchup_key}: Need at least 2 players with OVR {BASE_OVR} to simulate.")
             continue
 
-        win_counts = {'base': 0, 'opponent': 0}
-
-        for _ in tqdm(range(SIMULATIONS_PER_PAIRING), desc=f"Simulating {matchup_key}"):
-            p1 = random.choice(base_players)
-            p2 = random.choice(opp_players)
+        if ENGINE == "analytic":
+            # Exact average over every distinct pairing instead of sampling pairings
+            probs = [win_probability.match_win_probability(p1, p2, num_sets=NUM_SETS)['p1_match']
+                     for p1 in base_players for p2 in opp_players if p1.id != p2.id]
+            base_win_pct = sum(probs) / len(probs) * 100
+            all_results.append((matchup_key, base_win_pct, 100 - base_win_pct, None))
+            continue
 
-            # --- NEW: Check to prevent a player from playing themself ---
-            if p1.id == p2.id:
-                # Re-pick p2 until it's a different player
-                while p2.id == p1.id:
-                    p2 = random.choice(opp_players)
+        estimate = SequentialEstimate(TARGET_CI_HALF_WIDTH if ADAPTIVE else 0.0, ADAPTIVE_MIN_MATCHES,
+                                      SIMULATIONS_PER_PAIRING)
+        chunk_size = ADAPTIVE_CHUNK if ADAPTIVE else SIMULATIONS_PER_PAIRING
+        progress = tqdm(total=SIMULATIONS_PER_PAIRING, desc=f"Simulating {matchup_key}")
+        while not estimate.done():
+            count = estimate.next_chunk(chunk_size)
+            base_wins = 0
+            if ENGINE == "vectorized":
+                pairings = [pick_pairing(base_players, opp_players) for _ in range(count)]
+                res = batch_engine.simulate_player_matches([p1 for p1, _ in pairings], [p2 for _, p2 in pairings],
+                                                           num_sets=NUM_SETS)
+                base_wins = count - int(res.winner.sum())
+            elif ENGINE == "jit":
+                pairings = [pick_pairing(base_players, opp_players) for _ in range(count)]
+                winner, _ = jit_engine.simulate_player_matches([p1 for p1, _ in pairings],
+                                                               [p2 for _, p2 in pairings], num_sets=NUM_SETS,
+                                                               backend=JIT_BACKEND)
+                base_wins = count - int(winner.sum())
+            else:
+                for _ in range(count):
+                    p1, p2 = pick_pairing(base_players, opp_players)
 
-            winner, _ = simulation.simulate_match(p1, p2, num_sets=NUM_SETS, verbose=False)
+                    winner, _ = simulation.simulate_match_result(p1, p2, num_sets=NUM_SETS)
 
-            if winner.id == p1.id:
-                win_counts['base'] += 1
-            else:
-                win_counts['opponent'] += 1
+                    if winner.id == p1.id:
+                        base_wins += 1
+            estimate.add(base_wins, count)
+            progress.update(count)
+        progress.close()
 
-        base_win_pct = (win_counts['base'] / SIMULATIONS_PER_PAIRING) * 100
-        opp_win_pct = (win_counts['opponent'] / SIMULATIONS_PER_PAIRING) * 100
-        all_results.append((matchup_key, base_win_pct, opp_win_pct))
+        base_win_pct = estimate.win_rate * 100
+        all_results.append((matchup_key, base_win_pct, 100 - base_win_pct, estimate if ADAPTIVE else None))
 
     output_string = generate_output_string(all_results)
     print(output_string)
 
 
+def pick_pairing(base_players: list[Player], opp_players: list[Player]) -> tuple[Player, Player]:
+    """Picks a random base player and a different random opponent."""
+    p1 = random.choice(base_players)
+    p2 = random.choice(opp_players)
+
+    # --- NEW: Check to prevent a player from playing themself ---
+    if p1.id == p2.id:
+        # Re-pick p2 until it's a different player
+        while p2.id == p1.id:
+            p2 = random.choice(opp_players)
+    return p1, p2
+
+
 def generate_output_string(results: list) -> str:
     """Formats the final results matrix into a printable string."""
     lines = [
@@ -104,8 +122,11 @@ def generate_output_string(results: list) -> str:
         "|            OVR MATCHUP MATRIX RESULTS             |",
         "======================================================="
     ]
-    for matchup_key, base_pct, opp_pct in results:
-        lines.append(f"- {matchup_key:<18}: {base_pct:.1f}% / {opp_pct:.1f}%")
+    for matchup_key, base_pct, opp_pct, estimate in results:
+        line = f"- {matchup_key:<18}: {base_pct:.1f}% / {opp_pct:.1f}%"
+        if estimate is not None:
+            line += f"  (95% CI ±{estimate.half_width() * 100:.1f}%, {estimate.matches} matches)"
+        lines.append(line)
     lines.append("=======================================================")
     return "\n".join(lines)
 
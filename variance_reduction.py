@@ -0,0 +1,220 @@
+# variance_reduction.py
+import numpy as np
+from tqdm import tqdm
+
+import simulation
+import win_probability
+from players import Player
+from rng_streams import StreamFactory, SELECTION_CHANNEL
+from sim_observers import SimulationObserver
+from sim_params import SimParams, DEFAULT_PARAMS
+
+# --- COMPARISON CONFIGURATION (python variance_reduction.py) ---
+COMPARISON_MATCHES = 2000  # Sampling units per arm (pairs of matches when ANTITHETIC)
+NUM_SETS = 3
+ROOT_SEED = 2024
+COMMON_RANDOM_NUMBERS = True  # Replay the same streams in both arms
+ANTITHETIC = False  # Pair every match with its mirrored-stream twin (measured x0.75 here: off by default)
+CONTROL_VARIATE = True  # Adjust by the analytic win probability of each match's pairing
+# Arm B's simulation_config overrides (see sim_params.SimParams); arm A runs the current config
+ARM_B_OVERRIDES = {'RALLY_SUCCESS_THRESHOLD': 0.66}
+# --- END CONFIGURATION ---
+
+
+# ----------------------------------------------------------------------
+# Arms and Sampling
+# ----------------------------------------------------------------------
+
+class PointSyncObserver(SimulationObserver):
+    """Moves a rng_streams.PointSyncedStream to its next point window after every point."""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def on_point(self, server, receiver, point_data, server_points, receiver_points, game_over):
+        self.stream.next_point()
+
+
+class Arm:
+    """One side of a comparison: a list of (player1, player2) pairings and the SimParams to play them under.
+
+    Each match picks a pairing uniformly at random, so comparing two builds means passing pairings
+    lists of the same length where entry j of arm B is entry j of arm A with the build applied.
+    """
+
+    def __init__(self, label: str, pairings: list[tuple[Player, Player]], params: SimParams = DEFAULT_PARAMS):
+        self.label = label
+        self.pairings = pairings
+        self.params = params
+
+
+def _analytic_controls(pairings: list[tuple[Player, Player]], num_sets: int, params: SimParams) -> np.ndarray:
+    """Analytic P(player1 wins) of each pairing: the control variate and, averaged, its exact mean."""
+    return np.array([win_probability.match_win_probability(p1, p2, num_sets=num_sets, params=params)['p1_match']
+                     for p1, p2 in pairings])
+
+
+def sample_arm(arm: Arm, units: int, streams: StreamFactory, antithetic: bool, control_variate: bool,
+               num_sets: int = NUM_SETS, first_index: int = 0) -> dict:
+    """Plays one arm; unit i uses match stream first_index + i (and its antithetic twin) and selection
+    stream first_index + i.
+
+    Match streams are point-synced, so an arm replaying another arm's streams stays aligned with it.
+
+    Returns per-unit arrays: 'y' (player1 win, averaged over the antithetic pair), 'y_single' (the
+    first match of the unit alone), 'control' and 'control_mean' (None without control_variate).
+    """
+    controls = _analytic_controls(arm.pairings, num_sets, arm.params) if control_variate else None
+    y = np.empty(units)
+    y_single = np.empty(units)
+    pairing_index = np.empty(units, dtype=int)
+    for i in tqdm(range(units), desc=f"Simulating {arm.label}"):
+        j = int(streams.stream(first_index + i, SELECTION_CHANNEL).random() * len(arm.pairings))
+        p1, p2 = arm.pairings[j]
+        pairing_index[i] = j
+        wins = []
+        for twin in ((False, True) if antithetic else (False,)):
+            rng = streams.synced_stream(first_index + i, antithetic=twin)
+            winner, _ = simulation.simulate_match(p1, p2, num_sets=num_sets, verbose=False, rng=rng,
+                                                  observer=PointSyncObserver(rng), params=arm.params)
+            wins.append(1.0 if winner is p1 else 0.0)
+        y[i] = sum(wins) / len(wins)
+        y_single[i] = wins[0]
+    return {
+        'y': y,
+        'y_single': y_single,
+        'control': controls[pairing_index] if control_variate else None,
+        'control_mean': controls.mean() if control_variate else None,
+    }
+
+
+# ----------------------------------------------------------------------
+# Estimators
+# ----------------------------------------------------------------------
+
+def _control_adjusted(y: np.ndarray, control: np.ndarray, control_mean: float) -> np.ndarray:
+    """y - beta * (control - control_mean), with beta the sample regression coefficient."""
+    control_var = control.var()
+    if control_var == 0.0:  # One pairing: the control is constant and can't help
+        return y
+    beta = np.cov(y, control, bias=True)[0, 1] / control_var
+    return y - beta * (control - control_mean)
+
+
+def _factor(baseline_var: float, achieved_var: float) -> float:
+    if achieved_var > 0:
+        return baseline_var / achieved_var
+    return 1.0 if baseline_var == 0 else float('inf')  # A one-sided pairing has no variance to reduce
+
+
+def estimate_arm(sample: dict, antithetic: bool) -> dict:
+    """Win-rate estimate of one arm, with the variance reduction factor of each technique.
+
+    Factors compare estimator variances at the same number of simulated matches: 'antithetic' against
+    independent matches, 'control_variate' against the unadjusted estimate.
+    """
+    y, n = sample['y'], len(sample['y'])
+    matches = n * (2 if antithetic else 1)
+    baseline_var = sample['y_single'].var(ddof=1) / matches  # Plain Monte Carlo at the same match count
+    plain_var = y.var(ddof=1) / n
+    adjusted = y if sample['control'] is None else _control_adjusted(y, sample['control'], sample['control_mean'])
+    final_var = adjusted.var(ddof=1) / n
+    return {
+        'win_rate': adjusted.mean(),
+        'std_err': np.sqrt(final_var),
+        'matches': matches,
+        'antithetic_factor': _factor(baseline_var, plain_var) if antithetic else 1.0,
+        'control_variate_factor': _factor(plain_var, final_var),
+        'total_factor': _factor(baseline_var, final_var),
+    }
+
+
+def estimate_difference(sample_a: dict, sample_b: dict, antithetic: bool, common_random_numbers: bool) -> dict:
+    """Estimate of win rate A - B. 'total_factor' compares with independent plain Monte Carlo at the same
+    match count; 'crn_factor' is the part due to common random numbers."""
+    n = len(sample_a['y'])
+    matches = n * (2 if antithetic else 1)
+    baseline_var = (sample_a['y_single'].var(ddof=1) + sample_b['y_single'].var(ddof=1)) / matches
+    independent_var = (sample_a['y'].var(ddof=1) + sample_b['y'].var(ddof=1)) / n
+    diff = sample_a['y'] - sample_b['y']
+    paired_var = diff.var(ddof=1) / n if common_random_numbers else independent_var
+    if sample_a['control'] is not None:
+        if common_random_numbers:
+            diff = _control_adjusted(diff, sample_a['control'] - sample_b['control'],
+                                     sample_a['control_mean'] - sample_b['control_mean'])
+            final_var = diff.var(ddof=1) / n
+        else:
+            a = _control_adjusted(sample_a['y'], sample_a['control'], sample_a['control_mean'])
+            b = _control_adjusted(sample_b['y'], sample_b['control'], sample_b['control_mean'])
+            diff = a - b
+            final_var = (a.var(ddof=1) + b.var(ddof=1)) / n
+    else:
+        final_var = paired_var
+    return {
+        'difference': diff.mean(),
+        'std_err': np.sqrt(final_var),
+        'crn_factor': _factor(independent_var, paired_var),
+        'total_factor': _factor(baseline_var, final_var),
+    }
+
+
+def compare_arms(arm_a: Arm, arm_b: Arm, units: int, root_seed: int = None, common_random_numbers: bool = True,
+                 antithetic: bool = False, control_variate: bool = True, num_sets: int = NUM_SETS,
+                 first_index: int = 0) -> dict:
+    """Runs both arms and returns {'a': estimate_arm, 'b': estimate_arm, 'difference': estimate_difference}.
+
+    With common_random_numbers both arms replay the same selection and match streams; otherwise arm B
+    gets streams from an unrelated root seed. Units use stream indices from first_index on, so
+    comparisons sharing a root seed can take separate blocks (as test_batch's pairings do).
+    """
+    streams_a = StreamFactory(root_seed)
+    streams_b = streams_a if common_random_numbers else StreamFactory()
+    sample_a = sample_arm(arm_a, units, streams_a, antithetic, control_variate, num_sets, first_index)
+    sample_b = sample_arm(arm_b, units, streams_b, antithetic, control_variate, num_sets, first_index)
+    return {
+        'a': estimate_arm(sample_a, antithetic),
+        'b': estimate_arm(sample_b, antithetic),
+        'difference': estimate_difference(sample_a, sample_b, antithetic, common_random_numbers),
+    }
+
+
+def describe_comparison(res: dict, label_a: str, label_b: str) -> list[str]:
+    """Report lines for a compare_arms result: each arm's estimate, then the difference."""
+    lines = []
+    for key, label in (('a', label_a), ('b', label_b)):
+        arm = res[key]
+        lines.append(f"- {label}: P1 win {arm['win_rate']:.4f} ± {arm['std_err']:.4f} over {arm['matches']} "
+                     f"matches | antithetic x{arm['antithetic_factor']:.2f}, "
+                     f"control variate x{arm['control_variate_factor']:.2f}, total x{arm['total_factor']:.2f}")
+    diff = res['difference']
+    lines.append(f"- Difference (A - B): {diff['difference']:+.4f} ± {diff['std_err']:.4f} | "
+                 f"CRN x{diff['crn_factor']:.2f}, total variance reduction x{diff['total_factor']:.2f}")
+    lines.append(f"  (plain independent sampling would need ~{diff['total_factor'] * res['a']['matches']:,.0f} "
+                 f"matches per arm for the same precision)")
+    return lines
+
+
+def main():
+    """Compares the current config with ARM_B_OVERRIDES on random 80 vs. 80-82 OVR pairings."""
+    import roster_loader
+
+    all_players = roster_loader.load_players(win_probability.PLAYER_DATA_FILE).players
+    base = [p for p in all_players if p.overall == 80]
+    opponents = [p for p in all_players if 80 <= p.overall <= 82]
+    pairings = [(p1, p2) for p1 in base for p2 in opponents if p1 is not p2]
+    if not pairings:
+        print("Not enough 80-82 OVR players in players.csv.")
+        return
+
+    arm_b = Arm(f"Overrides {ARM_B_OVERRIDES}", pairings, SimParams(ARM_B_OVERRIDES))
+    res = compare_arms(Arm("Current config", pairings), arm_b,
+                       COMPARISON_MATCHES, ROOT_SEED, COMMON_RANDOM_NUMBERS, ANTITHETIC, CONTROL_VARIATE)
+
+    print("=======================================================")
+    print("|            VARIANCE-REDUCED COMPARISON              |")
+    print("=======================================================")
+    print("\n".join(describe_comparison(res, "Current config", f"Overrides {ARM_B_OVERRIDES}")))
+
+
+if __name__ == '__main__':
+    main()
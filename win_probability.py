@@ -0,0 +1,356 @@
+# win_probability.py
+import math
+import random
+import os
+from functools import lru_cache
+
+import simulation
+from players import Player
+from sim_params import SimParams, DEFAULT_PARAMS
+from configs.simulation_config import MAX_RALLY_LENGTH
+
+# --- VALIDATION CONFIGURATION ---
+PLAYER_DATA_FILE = os.path.join("data", "players.csv")
+VALIDATION_PAIRINGS = 10  # Random player pairings compared against the simulator
+VALIDATION_MATCHES = 2000  # Simulated matches per pairing
+NUM_SETS = 3
+# --- END CONFIGURATION ---
+
+
+# ----------------------------------------------------------------------
+# Point Level: exact outcome distribution of simulation.simulate_point
+# ----------------------------------------------------------------------
+
+def _normal_cdf(x: float) -> float:
+    return 0.5 * (1.0 + math.erf(x / math.sqrt(2.0)))
+
+
+def _normal_pdf(x: float) -> float:
+    return math.exp(-0.5 * x * x) / math.sqrt(2.0 * math.pi)
+
+
+def _expected_clipped_normal(mu: float, sigma: float, lo: float, hi: float) -> float:
+    """E[clip(X, lo, hi)] for X ~ N(mu, sigma)."""
+    if lo >= hi:
+        return lo
+    a, b = (lo - mu) / sigma, (hi - mu) / sigma
+    cdf_a, cdf_b = _normal_cdf(a), _normal_cdf(b)
+    return (lo * cdf_a + hi * (1.0 - cdf_b) + mu * (cdf_b - cdf_a)
+            + sigma * (_normal_pdf(a) - _normal_pdf(b)))
+
+
+def _expected_return_chance(quality_mean: float, defense: float, params: SimParams) -> float:
+    """Mean of rally_success_check's success chance against a shot drawn like calculate_*_quality."""
+    ceiling, threshold = params.shot_quality_ceiling, params.rally_success_threshold
+    # The chance is linear in the shot quality between the two points where it hits 0.99 and 0.01, so
+    # clipping the chance equals clipping the (already clipped) quality to that band.
+    band_lo = defense + ceiling * (threshold - 0.99)
+    band_hi = defense + ceiling * (threshold - 0.01)
+    if band_hi < 1.0:
+        lo = hi = band_hi
+    elif band_lo > ceiling:
+        lo = hi = band_lo
+    else:
+        lo, hi = max(1.0, band_lo), min(ceiling, band_hi)
+    quality = _expected_clipped_normal(quality_mean, params.variance_sigma_point, lo, hi)
+    return threshold - (quality - defense) / ceiling
+
+
+def _rally_distribution(serve_mean: float, server: Player, receiver: Player, server_fatigue: float,
+                        receiver_fatigue: float, params: SimParams) -> list[tuple[float, bool, int]]:
+    """Returns [(probability, server_won, rally_length)] for a rally that starts from a serve in play."""
+    returners = []
+    for player, fatigue in ((receiver, receiver_fatigue), (server, server_fatigue)):
+        gs, ref = player.get_skill('groundstroke', fatigue, params), player.get_skill('reflex', fatigue, params)
+        defense = (gs * params.weighting_rally_gs_defense) + (ref * params.weighting_ref_defense)
+        offense = (gs * params.weighting_rally_gs_offense) + (player.strength * params.weighting_str_offense)
+        penalty_per_shot = (params.rally_fatigue_scalar - player.stamina) / params.rally_fatigue_divisor
+        returners.append((defense, offense, penalty_per_shot))
+
+    # The server plays shot 1 off its own serve (see simulate_point), so it returns on odd shots.
+    outcomes = []
+    reach, quality_mean = 1.0, serve_mean
+    for shot in range(1, MAX_RALLY_LENGTH + 1):
+        is_server = shot % 2 == 1
+        defense, offense, penalty_per_shot = returners[1 if is_server else 0]
+        success = _expected_return_chance(quality_mean, defense, params)
+        outcomes.append((reach * (1.0 - success), not is_server, shot))
+        reach *= success
+        quality_mean = offense * (1.0 - min(0.3, shot * penalty_per_shot))
+    # Rally length cap: the last successful returner wins, i.e. the server when the cap is odd
+    outcomes.append((reach, MAX_RALLY_LENGTH % 2 == 1, MAX_RALLY_LENGTH))
+    return outcomes
+
+
+def point_distribution(server: Player, receiver: Player, server_fatigue: float = 0.0,
+                       receiver_fatigue: float = 0.0,
+                       params: SimParams = DEFAULT_PARAMS) -> list[tuple[float, bool, str, int, bool]]:
+    """Exact outcome distribution of simulate_point at the given fatigue levels, under params.
+
+    Returns [(probability, server_won, outcome, rally_length, first_serve_fault)]. Every rally shot
+    quality is an independent clipped gauss draw, so each shot's success chance has a closed form.
+    """
+    sp = server.get_skill('serve_power', server_fatigue, params)
+    sa = server.get_skill('serve_accuracy', server_fatigue, params)
+    ref = receiver.get_skill('reflex', receiver_fatigue, params)
+
+    # serve_ace_check
+    server_attack_score = ((sp + sa) / 200.0) ** 2 * 100
+    ace_chance = server_attack_score * max(params.min_def_floor, (100.0 - ref) / 100.0) * params.ace_ceiling_factor
+    p_ace_first = min(1.0, max(0.001, ace_chance) / 100.0)
+    p_ace_second = min(1.0, max(0.001, ace_chance / 5.0) / 100.0)
+
+    # serve_fault_check: simulate_point moves to the second serve when this check returns False
+    base_success_chance = max(1, min(99, params.fssr_baseline_floor + (sa * params.fssr_sa_weight)
+                                     - (sp - params.power_threshold) * params.power_penalty_rate))
+    p_second_serve = _expected_clipped_normal(base_success_chance, params.variance_sigma_fault, 0.0, 100.0) / 100.0
+
+    # second_serve_df_check
+    max_df_rate = params.max_df_rate(sa)
+    df_rate_final = max(params.min_df_rate,
+                        min(99.0, max_df_rate - (server.clutch - 50) * params.clutch_modifier_rate))
+    p_double_fault = df_rate_final / 100.0
+
+    serve_mean = (sp * params.weighting_serve_sp) + (sa * params.weighting_serve_sa)
+    p_first_rally = (1.0 - p_ace_first) * (1.0 - p_second_serve)
+    p_second_reach = (1.0 - p_ace_first) * p_second_serve
+
+    dist = [
+        (p_ace_first, True, 'Ace', 0, False),
+        (p_second_reach * p_double_fault, False, 'Double Fault', 0, True),
+        (p_second_reach * (1.0 - p_double_fault) * p_ace_second, True, 'Ace', 0, True),
+    ]
+    for fault, reach, mean in ((False, p_first_rally, serve_mean),
+                               (True, p_second_reach * (1.0 - p_double_fault) * (1.0 - p_ace_second),
+                                serve_mean * 0.80)):
+        for prob, server_won, rally_length in _rally_distribution(mean, server, receiver, server_fatigue,
+                                                                  receiver_fatigue, params):
+            dist.append((reach * prob, server_won, 'Forced Error', rally_length, fault))
+    return dist
+
+
+def serve_point_summary(server: Player, receiver: Player, server_fatigue: float = 0.0,
+                        receiver_fatigue: float = 0.0, params: SimParams = DEFAULT_PARAMS) -> tuple[float, float]:
+    """Returns (P(server wins the point), expected rally length) at the given fatigue levels."""
+    p_win = expected_rally = 0.0
+    for prob, server_won, _, rally_length, _ in point_distribution(server, receiver, server_fatigue,
+                                                                   receiver_fatigue, params):
+        if server_won:
+            p_win += prob
+        expected_rally += prob * rally_length
+    return p_win, expected_rally
+
+
+# ----------------------------------------------------------------------
+# Game, Tiebreak and Set Level (memoized recursion over the scoring states)
+# ----------------------------------------------------------------------
+
+@lru_cache(maxsize=1 << 16)
+def _game_state(p: float, s: int, r: int) -> tuple[float, float]:
+    """(P(server wins), expected remaining points) of a simulate_game from score s-r."""
+    if s >= 4 and s >= r + 2:
+        return 1.0, 0.0
+    if r >= 4 and r >= s + 2:
+        return 0.0, 0.0
+    if s >= 3 and s == r:  # Deuce: closed form of the win-by-two chain
+        decided = p * p + (1.0 - p) * (1.0 - p)
+        return p * p / decided, 2.0 / decided
+    win_s, len_s = _game_state(p, s + 1, r)
+    win_r, len_r = _game_state(p, s, r + 1)
+    return p * win_s + (1.0 - p) * win_r, 1.0 + p * len_s + (1.0 - p) * len_r
+
+
+def game_win_probability(p: float) -> float:
+    """P(server holds) when the server wins each point with probability p."""
+    return _game_state(p, 0, 0)[0]
+
+
+def game_summary(p: float) -> tuple[float, float]:
+    """(P(server holds), expected points in the game) when the server wins each point with probability p."""
+    return _game_state(p, 0, 0)
+
+
+@lru_cache(maxsize=1 << 16)
+def _tiebreak_state(pa: float, pb: float, a: int, b: int) -> tuple[float, float]:
+    """(P(A wins), expected remaining points) of a simulate_tiebreak where A served first, from a-b.
+
+    pa/pb are the probabilities that A/B win a point on their own serve.
+    """
+    if a >= 7 and a >= b + 2:
+        return 1.0, 0.0
+    if b >= 7 and b >= a + 2:
+        return 0.0, 0.0
+    if a >= 6 and a == b:
+        # Every pair of points from a tie has one serve each, so the win-by-two chain has a closed form
+        a_pair, b_pair = pa * (1.0 - pb), (1.0 - pa) * pb
+        return a_pair / (a_pair + b_pair), 2.0 / (a_pair + b_pair)
+    point_num = a + b + 1
+    a_serves = point_num == 1 or (point_num - 2) % 4 >= 2
+    p_a = pa if a_serves else 1.0 - pb
+    win_a, len_a = _tiebreak_state(pa, pb, a + 1, b)
+    win_b, len_b = _tiebreak_state(pa, pb, a, b + 1)
+    return p_a * win_a + (1.0 - p_a) * win_b, 1.0 + p_a * len_a + (1.0 - p_a) * len_b
+
+
+def tiebreak_win_probability(pa: float, pb: float) -> float:
+    """P(A wins a tiebreak that A serves first)."""
+    return _tiebreak_state(pa, pb, 0, 0)[0]
+
+
+def tiebreak_summary(pa: float, pb: float) -> tuple[float, float]:
+    """(P(A wins), expected points) of a tiebreak that A serves first."""
+    return _tiebreak_state(pa, pb, 0, 0)
+
+
+@lru_cache(maxsize=1 << 16)
+def _set_state(pa: float, pb: float, ga: int, gb: int, server: int) -> tuple[float, float]:
+    """(P(A wins), expected remaining points) of a simulate_set from games ga-gb; server 0 = A, 1 = B."""
+    if ga >= 6 and ga >= gb + 2:
+        return 1.0, 0.0
+    if gb >= 6 and gb >= ga + 2:
+        return 0.0, 0.0
+    if ga == 6 and gb == 6:
+        if server == 0:
+            return _tiebreak_state(pa, pb, 0, 0)
+        win_b, length = _tiebreak_state(pb, pa, 0, 0)
+        return 1.0 - win_b, length
+    if server == 0:
+        hold, game_len = _game_state(pa, 0, 0)
+        p_a = hold
+    else:
+        hold, game_len = _game_state(pb, 0, 0)
+        p_a = 1.0 - hold
+    win_a, len_a = _set_state(pa, pb, ga + 1, gb, 1 - server)
+    win_b, len_b = _set_state(pa, pb, ga, gb + 1, 1 - server)
+    return p_a * win_a + (1.0 - p_a) * win_b, game_len + p_a * len_a + (1.0 - p_a) * len_b
+
+
+def set_win_probability(pa: float, pb: float, initial_server: int = 0) -> float:
+    """P(A wins a set) with A/B point-on-serve probabilities pa/pb; initial_server 0 = A, 1 = B."""
+    return _set_state(pa, pb, 0, 0, initial_server)[0]
+
+
+def _match_from_sets(set_probs: list[float], sets_to_win: int, a: int = 0, b: int = 0) -> float:
+    """P(A wins the match) given P(A wins set k) for each set index k."""
+    if a == sets_to_win:
+        return 1.0
+    if b == sets_to_win:
+        return 0.0
+    p = set_probs[a + b]
+    return p * _match_from_sets(set_probs, sets_to_win, a + 1, b) + \
+        (1.0 - p) * _match_from_sets(set_probs, sets_to_win, a, b + 1)
+
+
+def match_win_probability_from_points(pa: float, pb: float, num_sets: int = 3) -> float:
+    """P(A wins a best-of-num_sets match) with constant point-on-serve probabilities; A serves first."""
+    set_probs = [set_win_probability(pa, pb, k % 2) for k in range(num_sets)]
+    return _match_from_sets(set_probs, (num_sets // 2) + 1)
+
+
+# ----------------------------------------------------------------------
+# Match Level for two Players (with the fatigue approximation)
+# ----------------------------------------------------------------------
+
+def match_win_probability(player1: Player, player2: Player, num_sets: int = 3, model_fatigue: bool = True,
+                          params: SimParams = DEFAULT_PARAMS) -> dict:
+    """Analytic equivalent of simulation.simulate_match for two fresh players (player1 serves first), under params.
+
+    Fatigue approximation: both players accrue the same fatigue (the sum of rally lengths), so each
+    set is solved with point probabilities taken at the expected fatigue half-way through that set,
+    where the expected fatigue is rolled forward from the expected points per set and the expected
+    rally length. 'match_lower'/'match_upper' re-solve every set at its start- and end-of-set fatigue
+    instead and keep the least/most favourable set probabilities; because P(match) is monotone in each
+    set probability, the true value lies in that band as long as each set's win probability moves
+    monotonically with fatigue and the fatigue path stays near its expectation. 'fatigue_error' is the
+    half-width of the band and is 0 when model_fatigue is False (no fatigue at all).
+    """
+    sets_to_win = (num_sets // 2) + 1
+
+    def set_at(k: int, fatigue: float) -> tuple[float, float, float, float, float]:
+        pa, rally_a = serve_point_summary(player1, player2, fatigue, fatigue, params)
+        pb, rally_b = serve_point_summary(player2, player1, fatigue, fatigue, params)
+        win, points = _set_state(pa, pb, 0, 0, k % 2)
+        return win, points, (rally_a + rally_b) / 2.0, pa, pb
+
+    set_probs, lower, upper = [], [], []
+    fatigue = 0.0
+    for k in range(num_sets):
+        win_start, points, rally, pa, pb = set_at(k, fatigue)
+        if k == 0:
+            first_pa, first_pb = pa, pb
+        if not model_fatigue:
+            set_probs.append(win_start)
+            lower.append(win_start)
+            upper.append(win_start)
+            continue
+        end_fatigue = fatigue + points * rally
+        win_mid, points_mid, rally_mid, _, _ = set_at(k, (fatigue + end_fatigue) / 2.0)
+        win_end = set_at(k, end_fatigue)[0]
+        set_probs.append(win_mid)
+        lower.append(min(win_start, win_mid, win_end))
+        upper.append(max(win_start, win_mid, win_end))
+        fatigue += points_mid * rally_mid
+
+    match = _match_from_sets(set_probs, sets_to_win)
+    match_lower = _match_from_sets(lower, sets_to_win)
+    match_upper = _match_from_sets(upper, sets_to_win)
+    return {
+        'p1_serve_point': first_pa,
+        'p2_serve_point': first_pb,
+        'p1_hold': game_win_probability(first_pa),
+        'p2_hold': game_win_probability(first_pb),
+        'p1_tiebreak': tiebreak_win_probability(first_pa, first_pb),
+        'p1_set': set_probs[0],
+        'p1_match': match,
+        'match_lower': match_lower,
+        'match_upper': match_upper,
+        'fatigue_error': (match_upper - match_lower) / 2.0,
+    }
+
+
+# ----------------------------------------------------------------------
+# Validation Mode: analytic solver vs. the point-by-point simulator
+# ----------------------------------------------------------------------
+
+def validate(pairings: list[tuple[Player, Player]], matches: int, num_sets: int = 3) -> list[dict]:
+    """Compares match_win_probability against simulate_match for each pairing."""
+    results = []
+    for p1, p2 in pairings:
+        analytic = match_win_probability(p1, p2, num_sets=num_sets)
+        wins = 0
+        for _ in range(matches):
+            winner, _ = simulation.simulate_match_result(p1, p2, num_sets=num_sets)
+            wins += winner is p1
+        simulated = wins / matches
+        # Standard error under the analytic value, floored so near-certain pairings don't divide by ~0
+        p = analytic['p1_match']
+        std_err = math.sqrt(max(p * (1.0 - p), 1.0 / matches) / matches)
+        results.append({
+            'pairing': f"{p1.name} ({p1.overall}) vs. {p2.name} ({p2.overall})",
+            'analytic': analytic['p1_match'],
+            'fatigue_error': analytic['fatigue_error'],
+            'simulated': simulated,
+            'z_score': (simulated - analytic['p1_match']) / std_err,
+        })
+    return results
+
+
+def main():
+    """Validates the analytic solver against the simulator on random pairings from players.csv."""
+    import roster_loader
+
+    all_players = roster_loader.load_players(PLAYER_DATA_FILE).players
+    if len(all_players) < 2:
+        return
+    pairings = [tuple(random.sample(all_players, 2)) for _ in range(VALIDATION_PAIRINGS)]
+
+    print("=======================================================")
+    print(f"|  VALIDATING ANALYTIC SOLVER ({VALIDATION_MATCHES} SIMS PER PAIRING)  |")
+    print("=======================================================")
+    for res in validate(pairings, VALIDATION_MATCHES, NUM_SETS):
+        print(f"- {res['pairing']:<50}: analytic {res['analytic']:.3f} (±{res['fatigue_error']:.3f}) | "
+              f"simulated {res['simulated']:.3f} | z = {res['z_score']:+.2f}")
+
+
+if __name__ == '__main__':
+    main()